@@ -0,0 +1,296 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+from typing import Optional
+
+from langchain.globals import get_llm_cache, set_llm_cache
+from langchain_core.caches import InMemoryCache
+from langchain_community.cache import SQLiteCache
+
+from readmate.readmate_agent import ReadMateAgent
+from review_and_check import Reviewandcheck
+from readmate.modules.python_analyzer import ANALYSIS_CACHE
+from readmate.utils.logger import set_logger
+from readmate.utils.general_utils import (
+    copy_project_folder,
+    unzip_project_folder,
+    is_zip_file,
+    clean_project,
+)
+from readmate.utils.run_budget import RunBudget
+from readmate.utils.run_journal import RunJournal
+from readmate.utils.section_cache import project_cache_path
+from readmate.utils.token_callback_tracker import TokenUsageTracker
+from readmate.utils.utils_tools import load_pipeline_config, model_initialization
+
+_logger = set_logger()
+
+
+def prepare_project(
+    input_dir: str,
+    workspace_folder: str,
+    logger=_logger,
+    budget: Optional[RunBudget] = None,
+):
+    """
+    Copies or unzips a project into its workspace, cleans it and checks it can be
+    documented.
+
+    Args:
+        input_dir (str): Folder or zip file of the project.
+        workspace_folder (str): Workspace of the run, the project is copied inside it.
+        logger (logging.Logger, optional): Logger of the run.
+        budget (RunBudget, optional): Budget of the run, pipeline.toml [budget] if not
+            provided. Projects over the size limits of the checks are accepted when the
+            budget has a limit, the budget then decides how much of them is analyzed.
+
+    Returns:
+        tuple: Path of the project copy, whether it passed the checks and the run journal.
+    """
+    # Check if the input directory is a zip file and log the result
+    if is_zip_file(input_dir):
+        logger.info(f"The input directory {input_dir} is a zip file.")
+
+        # Call the function to unzip if the input is not a folder
+        final_dst = unzip_project_folder(input_dir, workspace_folder, logger)
+        logger.info(final_dst)
+    else:
+        logger.info(f"The input directory {input_dir} is a folder.")
+
+        # Call the function to copy the folder
+        final_dst = copy_project_folder(input_dir, workspace_folder, logger)
+
+    if final_dst is None:
+        raise RuntimeError(f"{input_dir} could not be copied to {workspace_folder}")
+
+    clean_project(directory=final_dst, logger=logger)
+
+    # Remember the project copy, so the run can be resumed on this workspace
+    journal = RunJournal(workspace_folder)
+    journal.record("run", "project_path", final_dst)
+
+    budget = budget or RunBudget.from_config()
+    rac = Reviewandcheck(
+        folder_path=final_dst,
+        project_extensions_path="readmate/configs/include_extensions.toml",
+        enforce_size_limits=not budget.limited,
+    )
+    status, _ = rac.read_all_files_in_folder()
+
+    return final_dst, status, journal
+
+
+def collect_projects(source: str) -> list:
+    """
+    Lists the projects of a batch.
+
+    Args:
+        source (str): Folder whose subfolders and zip files are the projects, or manifest
+            file with one project path per line (blank lines and # comments are skipped,
+            relative paths are resolved against the manifest folder).
+
+    Returns:
+        list: Paths of the project folders and zip files.
+    """
+    if os.path.isdir(source):
+        return [
+            entry.path
+            for entry in sorted(os.scandir(source), key=lambda entry: entry.name)
+            if not entry.name.startswith(".")
+            and (entry.is_dir() or is_zip_file(entry.path))
+        ]
+
+    manifest_folder = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as file:
+        lines = [line.strip() for line in file]
+    return [
+        os.path.join(manifest_folder, line)
+        for line in lines
+        if line and not line.startswith("#")
+    ]
+
+
+def setup_response_cache(response_cache: str, output_dir: str) -> str:
+    """
+    Installs the LLM response cache shared by the projects of a batch, so identical
+    prompts (shared files, templates, boilerplate modules) are answered once.
+
+    Args:
+        response_cache (str): "memory" for a cache living as long as the batch, a file
+            name for a SQLite cache kept across batches (relative names are placed in the
+            output folder) or "" to disable it.
+        output_dir (str): Folder where the batch folders are created.
+
+    Returns:
+        str: Description of the cache in use, for the batch summary.
+    """
+    if not response_cache:
+        return "disabled"
+    if response_cache == "memory":
+        set_llm_cache(InMemoryCache())
+        return "memory"
+
+    database_path = os.path.join(output_dir, response_cache)
+    set_llm_cache(SQLiteCache(database_path=database_path))
+    return database_path
+
+
+class BatchRunner:
+    """
+    Documents many projects in one process. The projects run concurrently in a single
+    event loop and share the chat model client, the LLM concurrency limit, the response
+    cache, the tokenizer and the Python analysis cache, instead of setting them up again
+    for every project.
+    """
+
+    BATCH_SUMMARY_JSON = "batch_summary.json"
+
+    def __init__(
+        self,
+        projects: list,
+        output_dir: str,
+        max_projects: Optional[int] = None,
+        llm_selection=None,
+        history_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            projects (list): Paths of the project folders and zip files.
+            output_dir (str): Folder where the batch folder is created.
+            max_projects (int, optional): Projects documented at the same time, the
+                [batch] projects setting of pipeline.toml if not provided.
+            llm_selection (optional): Chat model shared by every project, initialized
+                from the environment if not provided.
+            history_path (str, optional): SQLite run history each project run is
+                appended to.
+        """
+        self.batch_config = load_pipeline_config()["batch"]
+        self.projects = projects
+        self.max_projects = max_projects or self.batch_config["projects"]
+        self.output_dir = output_dir
+        self.batch_folder = os.path.join(output_dir, f"batch_{uuid.uuid4()}")
+        self._llm_selection = llm_selection
+        self.history_path = history_path
+        self.token_tracker = TokenUsageTracker()
+
+    def project_workspaces(self) -> list:
+        """Workspace folder of each project, named after the project."""
+        workspaces, used_names = [], set()
+        for project in self.projects:
+            name = os.path.splitext(os.path.basename(os.path.normpath(project)))[0]
+            unique_name, suffix = name, 2
+            while unique_name in used_names:
+                unique_name, suffix = f"{name}_{suffix}", suffix + 1
+            used_names.add(unique_name)
+            workspaces.append(os.path.join(self.batch_folder, unique_name))
+        return workspaces
+
+    async def run_project(
+        self, project: str, workspace_folder: str, semaphore: asyncio.Semaphore
+    ) -> dict:
+        """
+        Documents one project. Its failure is reported in its summary entry instead of
+        stopping the batch.
+        """
+        summary = {
+            "project": project,
+            "workspace": workspace_folder,
+            "status": "pending",
+        }
+        async with semaphore:
+            started = time.perf_counter()
+            # Tokens of the LLM calls made from here on are attributed to this workspace
+            with self.token_tracker.scope(workspace_folder):
+                try:
+                    os.makedirs(os.path.join(workspace_folder, "logs"), exist_ok=True)
+                    final_dst, status, journal = await asyncio.to_thread(
+                        prepare_project, project, workspace_folder
+                    )
+                    summary["prepare_seconds"] = round(time.perf_counter() - started, 2)
+
+                    if status:
+                        maa = ReadMateAgent(
+                            input_path=final_dst,
+                            workspace_path=workspace_folder,
+                            output_path=workspace_folder,
+                            llm_selection=self._llm_selection,
+                            journal=journal,
+                            history_path=self.history_path,
+                            section_cache_path=project_cache_path(
+                                self.output_dir, project
+                            ),
+                        )
+                        summary["readme"] = await maa.arun()
+                        summary["status"] = "completed"
+                    else:
+                        summary["status"] = "skipped"
+                except Exception as e:
+                    _logger.error(f"Batch project {project} failed: {e}")
+                    summary["status"] = "failed"
+                    summary["error"] = str(e)
+
+            summary["seconds"] = round(time.perf_counter() - started, 2)
+            summary.update(self.token_tracker.get_scope_usage(workspace_folder))
+            _logger.info(
+                f"Batch project {project} {summary['status']} in {summary['seconds']}s, "
+                f"{summary['tokens']} tokens"
+            )
+        return summary
+
+    async def arun(self) -> dict:
+        os.makedirs(self.batch_folder, exist_ok=True)
+        if self._llm_selection is None:
+            self._llm_selection = model_initialization()
+
+        _logger.info(
+            f"Batch of {len(self.projects)} projects in {self.batch_folder}, "
+            f"{self.max_projects} at a time"
+        )
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_projects)
+        # The response cache is process wide in LangChain, the previous one is restored
+        previous_cache = get_llm_cache()
+        response_cache = setup_response_cache(
+            self.batch_config["response_cache"], self.output_dir
+        )
+        try:
+            project_summaries = await asyncio.gather(
+                *[
+                    self.run_project(project, workspace_folder, semaphore)
+                    for project, workspace_folder in zip(
+                        self.projects, self.project_workspaces()
+                    )
+                ]
+            )
+        finally:
+            set_llm_cache(previous_cache)
+
+        statuses = [summary["status"] for summary in project_summaries]
+        summary = {
+            "batch_folder": self.batch_folder,
+            "projects": project_summaries,
+            "totals": {
+                "projects": len(project_summaries),
+                "completed": statuses.count("completed"),
+                "skipped": statuses.count("skipped"),
+                "failed": statuses.count("failed"),
+                "seconds": round(time.perf_counter() - started, 2),
+                "tokens": sum(summary["tokens"] for summary in project_summaries),
+                "cost": sum(summary["cost"] for summary in project_summaries),
+            },
+            "caches": {
+                "responses": response_cache,
+                "python_analysis": ANALYSIS_CACHE.stats(),
+            },
+        }
+
+        summary_path = os.path.join(self.batch_folder, self.BATCH_SUMMARY_JSON)
+        with open(summary_path, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=4)
+        _logger.info(f"Batch summary written to {summary_path}: {summary['totals']}")
+        return summary
+
+    def run(self) -> dict:
+        return asyncio.run(self.arun())
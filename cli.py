@@ -1,25 +1,32 @@
 import os
+import time
 import typer
 import uuid
+import socket
+import asyncio
+from typing import Optional
 from readmate.readmate_agent import ReadMateAgent
-from review_and_check import Reviewandcheck
+from batch_runner import BatchRunner, collect_projects, prepare_project
+from run_planner import PLAN_JSON, plan_project
+from distributed_runner import enqueue_project, open_task_queue, run_worker
 from readmate.utils.logger import setup_logs_folder, set_logger
-from readmate.utils.general_utils import (
-    copy_project_folder,
-    unzip_project_folder,
-    is_zip_file,
-    check_required_files,
-    clean_project,
-)
+from readmate.utils.general_utils import check_required_files
 from readmate.utils.setup_env import load_environment_variables
+from readmate.utils.run_journal import RunJournal
+from readmate.utils.run_budget import RunBudget
+from readmate.utils.run_history import RunHistory
+from readmate.utils.section_cache import project_cache_path
+from readmate.utils.analysis_store import export_analyses
+from readmate.utils.utils_tools import load_pipeline_config
 
 app = typer.Typer()
 
 load_environment_variables()
 
 
-@app.command()
+@app.callback(invoke_without_command=True)
 def main(
+    ctx: typer.Context,
     output_dir: str = typer.Option(
         "readmate/json_output",
         "--output-dir",
@@ -38,7 +45,45 @@ def main(
         "-ro",
         help="Flag to generate the readme from the input_dir",
     ),
+    resume: str = typer.Option(
+        "",
+        "--resume",
+        "-r",
+        help="Workspace of an interrupted run to resume, skipping the work it completed",
+    ),
+    max_tokens: int = typer.Option(
+        0,
+        "--max-tokens",
+        help="Tokens the run may spend, the budget max_tokens setting of pipeline.toml by default",
+    ),
+    max_cost: float = typer.Option(
+        0.0,
+        "--max-cost",
+        help="Dollars the run may spend, the budget max_cost setting of pipeline.toml by default",
+    ),
+    max_seconds: float = typer.Option(
+        0.0,
+        "--max-seconds",
+        help="Wall time of the run in seconds, the budget max_seconds setting of pipeline.toml by default",
+    ),
+    plan: bool = typer.Option(
+        False,
+        "--plan",
+        help="Dry run: estimate the model calls, tokens, cost and wall time of the run without calling the model",
+    ),
 ):
+    # Subcommands (batch) have their own options
+    if ctx.invoked_subcommand is not None:
+        return
+
+    budget = RunBudget.from_config(
+        max_tokens=max_tokens, max_cost=max_cost, max_seconds=max_seconds
+    )
+
+    if resume:
+        resume_run(resume, readme_only, budget)
+        return
+
     if input_dir == "":
         typer.echo(
             "Please provide a directory to document with the --input-dir or -id option."
@@ -58,32 +103,26 @@ def main(
     setup_logs_folder(unique_dir=workspace_folder)
     _logger = set_logger()
 
-    # Check if the input directory is a zip file and log the result
-    if is_zip_file(input_dir):
-        _logger.info(f"The input directory {input_dir} is a zip file.")
+    if plan:
+        echo_plan(plan_project(input_dir, workspace_folder), workspace_folder)
+        return
 
-        # Call the function to unzip if the input is not a folder
-        final_dst = unzip_project_folder(input_dir, workspace_folder, _logger)
-        _logger.info(final_dst)
-    else:
-        _logger.info(f"The input directory {input_dir} is a folder.")
-
-        # Call the function to copy the folder
-        final_dst = copy_project_folder(input_dir, workspace_folder, _logger)
-
-    clean_project(directory=final_dst, logger=_logger)
-
-    rac = Reviewandcheck(
-        folder_path=final_dst,
-        project_extensions_path="readmate/configs/include_extensions.toml",
+    final_dst, status, journal = prepare_project(
+        input_dir, workspace_folder, _logger, budget
     )
-    status, _ = rac.read_all_files_in_folder()
 
     if status:
         maa = ReadMateAgent(
             input_path=final_dst,
             workspace_path=workspace_folder,
             output_path=workspace_folder,
+            journal=journal,
+            budget=budget,
+            history_path=load_pipeline_config()["history"]["path"],
+            # Readme-only runs reuse the sections of the workspace they read instead
+            section_cache_path=(
+                None if readme_only else project_cache_path(output_dir, input_dir)
+            ),
         )
 
         if readme_only:
@@ -92,5 +131,217 @@ def main(
             maa.run()
 
 
+def echo_plan(plan: dict, workspace_folder: str):
+    cost = f"${plan['cost']}" if plan["cost"] is not None else "unknown cost"
+    typer.echo(
+        f"{plan['calls']} model calls, {plan['input_tokens']} input and {plan['output_tokens']} output tokens, {cost} with {plan['model']}, about {plan['seconds']}s of wall time"
+    )
+    for prompt_type, group in plan["prompt_types"].items():
+        typer.echo(
+            f"  {prompt_type}: {group['calls']} calls, {group['input_tokens']} + {group['output_tokens']} tokens"
+        )
+    if not plan["review_checks"]:
+        typer.echo("The project does not pass the review checks, the run would stop.")
+    typer.echo(f"Plan saved in {os.path.join(workspace_folder, PLAN_JSON)}")
+
+
+def resume_run(
+    workspace_folder: str, readme_only: bool, budget: Optional[RunBudget] = None
+):
+    """
+    Resumes an interrupted run on its own workspace: the project copy is reused and the
+    files, folders, stages and sections journaled as completed are not processed again.
+    """
+    journal = RunJournal(workspace_folder)
+    final_dst = journal.get("run", "project_path")
+    if not final_dst or not os.path.isdir(final_dst):
+        typer.echo(
+            f"{workspace_folder} has no journaled project copy to resume. Please start a new run with --input-dir."
+        )
+        raise typer.Abort()
+
+    setup_logs_folder(unique_dir=workspace_folder)
+    _logger = set_logger()
+    _logger.info(f"Resuming the run in {workspace_folder} on {final_dst}")
+
+    maa = ReadMateAgent(
+        input_path=final_dst,
+        workspace_path=workspace_folder,
+        output_path=workspace_folder,
+        journal=journal,
+        budget=budget,
+        history_path=load_pipeline_config()["history"]["path"],
+    )
+    if readme_only:
+        maa.readme_generator()
+    else:
+        maa.run()
+
+
+@app.command()
+def batch(
+    source: str = typer.Argument(
+        ...,
+        help="Folder whose subfolders and zip files are the projects, or manifest file with one project path per line",
+    ),
+    output_dir: str = typer.Option(
+        "readmate/json_output",
+        "--output-dir",
+        "-o",
+        help="The path of the directory where we save the experiments",
+    ),
+    projects: int = typer.Option(
+        0,
+        "--projects",
+        "-p",
+        help="Projects documented at the same time, the batch projects setting of pipeline.toml by default",
+    ),
+):
+    """
+    Documents many projects in one process, sharing the model client and the caches, and
+    writes a batch_summary.json with the timing and token usage of each project.
+    """
+    project_paths = collect_projects(source)
+    if not project_paths:
+        typer.echo(f"No projects found in {source}.")
+        raise typer.Abort()
+
+    runner = BatchRunner(
+        project_paths,
+        output_dir,
+        max_projects=projects or None,
+        history_path=load_pipeline_config()["history"]["path"],
+    )
+    os.makedirs(runner.batch_folder, exist_ok=True)
+    setup_logs_folder(unique_dir=runner.batch_folder)
+    set_logger()
+
+    summary = runner.run()
+    typer.echo(
+        f"{summary['totals']['completed']}/{summary['totals']['projects']} projects documented in {summary['totals']['seconds']}s, summary in {runner.batch_folder}"
+    )
+
+
+@app.command()
+def history(
+    project: str = typer.Option(
+        "", "--project", "-p", help="Only the runs of this project"
+    ),
+    limit: int = typer.Option(20, "--limit", "-n", help="Number of runs listed"),
+    prompts: bool = typer.Option(
+        False,
+        "--prompts",
+        help="Tokens and latency by model and prompt type instead of the runs",
+    ),
+):
+    """
+    Lists the runs recorded in the run history, or compares the prompt types across
+    models and prompt changes.
+    """
+    history_path = load_pipeline_config()["history"]["path"]
+    if not history_path or not os.path.isfile(history_path):
+        typer.echo("No run history recorded yet.")
+        raise typer.Abort()
+
+    run_history = RunHistory(history_path)
+    try:
+        if prompts:
+            for row in run_history.prompt_report():
+                typer.echo(
+                    f"{row['model'] or 'unknown'} {row['prompt_type']}: {row['calls']} calls, {row['input_tokens']:.0f} input and {row['output_tokens']:.0f} output tokens per call, {row['seconds']:.2f}s mean, {row['p95_seconds']:.2f}s p95"
+                )
+            return
+
+        for run in run_history.runs(project or None, limit):
+            started = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started"]))
+            typer.echo(
+                f"{started} {run['project']} {run['status']} in {run['seconds']:.0f}s: {run['calls']} calls, {run['input_tokens']} + {run['output_tokens']} tokens, ${run['cost']:.4f}, {run['files']} files, {run['bytes']} bytes"
+            )
+        for stage, seconds in run_history.stage_averages(project or None).items():
+            typer.echo(f"  {stage}: {seconds:.1f}s on average")
+    finally:
+        run_history.close()
+
+
+@app.command()
+def export(
+    workspace: str = typer.Argument(..., help="Workspace of a run"),
+    artifact_format: str = typer.Option(
+        "",
+        "--format",
+        "-f",
+        help="json for indented files, jsonl for compact JSON lines, the artifacts format setting of pipeline.toml by default",
+    ),
+):
+    """
+    Exports the analyses of a workspace, stored in its analysis.db, as the info_*.json
+    files (or their compact info_*.jsonl version) next to it.
+    """
+    db_path = os.path.join(workspace, ReadMateAgent.ANALYSIS_DB)
+    if not os.path.isfile(db_path):
+        typer.echo(f"No analysis store in {workspace}.")
+        raise typer.Abort()
+    artifact_format = artifact_format or load_pipeline_config()["artifacts"]["format"]
+    for path in export_analyses(db_path, workspace, artifact_format):
+        typer.echo(path)
+
+
+@app.command()
+def enqueue(
+    input_dir: str = typer.Option(
+        ...,
+        "--input-dir",
+        "-id",
+        help="The path of the folder or zip file where the project is located",
+    ),
+    output_dir: str = typer.Option(
+        "readmate/json_output",
+        "--output-dir",
+        "-o",
+        help="The path of the directory where we save the experiments",
+    ),
+):
+    """
+    Prepares the workspace of a project and fills its task queue, to be processed by
+    one or more `worker` processes sharing the workspace.
+    """
+    workspace_folder = enqueue_project(input_dir, output_dir)
+    if workspace_folder is None:
+        typer.echo(f"{input_dir} did not pass the review checks.")
+        raise typer.Abort()
+    typer.echo(workspace_folder)
+
+
+@app.command()
+def worker(
+    workspace: str = typer.Argument(..., help="Workspace filled by `enqueue`"),
+    concurrency: int = typer.Option(
+        0,
+        "--concurrency",
+        "-c",
+        help="Tasks run at the same time, the task_queue concurrency setting of pipeline.toml by default",
+    ),
+    worker_id: str = typer.Option(
+        "", "--worker-id", "-w", help="Name of the worker, host:pid by default"
+    ),
+):
+    """
+    Runs the tasks of a workspace queue until none is left. The last tasks merge the
+    analyses into the info_*.json files and write the README.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    setup_logs_folder(
+        unique_dir=os.path.join(workspace, "workers", worker_id.replace(":", "_"))
+    )
+    set_logger()
+
+    completed = asyncio.run(
+        run_worker(workspace, worker_id=worker_id, concurrency=concurrency or None)
+    )
+    queue = open_task_queue(workspace)
+    typer.echo(f"{completed} tasks completed by {worker_id}, queue: {queue.counts()}")
+    queue.close()
+
+
 if __name__ == "__main__":
     app()
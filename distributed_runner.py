@@ -0,0 +1,316 @@
+import os
+import uuid
+import socket
+import asyncio
+from typing import Any, Optional
+
+from batch_runner import prepare_project
+from readmate.readmate_agent import ReadMateAgent
+from readmate.generators.markdown import BaseReadmeGenerator
+from readmate.toolkit import low_level_analysis, search_engines, top_level_analysis
+from readmate.utils.concurrency import run_dag
+from readmate.utils.logger import set_logger
+from readmate.utils.run_journal import RunJournal
+from readmate.utils.section_cache import SectionCache
+from readmate.utils.task_queue import Task, TaskQueue
+from readmate.utils.token_callback_tracker import TokenUsageTracker
+from readmate.utils.utils_tools import (
+    iter_folders,
+    load_json_from_path,
+    load_pipeline_config,
+)
+
+_logger = set_logger()
+
+TASK_QUEUE_DB = "tasks.db"
+
+# Task kind -> journal stage its results are merged into
+ANALYSIS_STAGES = {
+    "root_file": "root_files",
+    "root_file_low_level": "root_files_low_level",
+    "module": "modules",
+    "folder_files": "modules_low_level",
+}
+
+
+def open_task_queue(workspace_folder: str) -> TaskQueue:
+    return TaskQueue(
+        os.path.join(workspace_folder, TASK_QUEUE_DB),
+        max_attempts=load_pipeline_config()["task_queue"]["max_attempts"],
+    )
+
+
+def section_names() -> list:
+    """README sections generated by the model, in an order where dependencies come first."""
+    json_structure = load_json_from_path(
+        "readmate/configs/readme_section_completion.json"
+    )
+    return ["overview", "features"] + list(json_structure)
+
+
+def plan_tasks(queue: TaskQueue, input_path: str):
+    """
+    Adds the tasks documenting a project:
+
+    - root_file and module: top-level analysis of each root file and each folder;
+    - root_file_low_level and folder_files: low-level analysis of the same units, once
+      their top-level analysis is done;
+    - merge: assembles the analysis store from the results of the analysis tasks;
+    - section: each README section written by the model, from the merged analyses;
+    - readme: the README, reusing the generated sections.
+    """
+    analysis_ids = []
+    for file_info in search_engines.list_files_outside_folders(input_path)["files"]:
+        top_level_id = queue.add("root_file", file_info["filename"], file_info)
+        analysis_ids += [
+            top_level_id,
+            queue.add(
+                "root_file_low_level", file_info["filename"], deps=[top_level_id]
+            ),
+        ]
+
+    tree = search_engines.recursive_directory_search(input_path)
+    for folder_info in iter_folders(tree):
+        # The tasks only need the names of the subfolders, not their contents
+        folder = dict(folder_info)
+        folder["subfolders"] = {name: {} for name in folder_info["subfolders"]}
+        top_level_id = queue.add(
+            "module",
+            folder["current_folder"],
+            {"folder": folder, "is_root": folder_info is tree},
+        )
+        analysis_ids += [
+            top_level_id,
+            queue.add("folder_files", folder["current_folder"], deps=[top_level_id]),
+        ]
+
+    merge_id = queue.add("merge", "analysis", deps=analysis_ids)
+    section_ids = {}
+    for section in section_names():
+        deps = [merge_id] + [
+            section_ids[dependency]
+            for dependency in BaseReadmeGenerator.SECTION_DEPENDENCIES.get(section, [])
+        ]
+        section_ids[section] = queue.add("section", section, deps=deps)
+    queue.add("readme", "readme", deps=[merge_id, *section_ids.values()])
+
+
+def enqueue_project(input_dir: str, output_dir: str) -> Optional[str]:
+    """
+    Prepares the workspace of a project and fills its task queue.
+
+    Returns:
+        str: The workspace folder, to pass to the workers, or None if the project did not
+            pass the review checks.
+    """
+    workspace_folder = os.path.join(output_dir, str(uuid.uuid4()))
+    os.makedirs(os.path.join(workspace_folder, "logs"), exist_ok=True)
+    final_dst, status, journal = prepare_project(input_dir, workspace_folder)
+    if not status:
+        return None
+
+    agent = ReadMateAgent(
+        final_dst, workspace_folder, workspace_folder, journal=journal
+    )
+    queue = open_task_queue(workspace_folder)
+    try:
+        plan_tasks(queue, agent.input_path)
+        _logger.info(f"Task queue of {workspace_folder}: {queue.counts()}")
+    finally:
+        queue.close()
+    return workspace_folder
+
+
+class TaskExecutor:
+    """Runs the tasks of a workspace queue with the functions of the regular pipeline."""
+
+    def __init__(self, workspace_folder: str, queue: TaskQueue, llm_selection=None):
+        self.workspace_folder = workspace_folder
+        self.queue = queue
+        self.llm_selection = llm_selection
+        self.journal = RunJournal(workspace_folder)
+        self._agent = None
+
+    def build_agent(self, journal: RunJournal) -> ReadMateAgent:
+        agent = ReadMateAgent(
+            input_path=self.journal.get("run", "project_path"),
+            workspace_path=self.workspace_folder,
+            output_path=self.workspace_folder,
+            llm_selection=self.llm_selection,
+            journal=journal,
+        )
+        # Shared by the tasks of this worker instead of one client per task
+        self.llm_selection = agent.llm_selection
+        return agent
+
+    @property
+    def agent(self) -> ReadMateAgent:
+        """Agent of the worker, for the paths, the scan index and the model client."""
+        if self._agent is None:
+            self._agent = self.build_agent(self.journal)
+        return self._agent
+
+    async def run(self, task: Task) -> Any:
+        return await getattr(self, f"run_{task.kind}")(task)
+
+    async def run_root_file(self, task: Task) -> dict:
+        agent = self.agent
+        output_dict = {}
+        await top_level_analysis.process_file(
+            task.payload, output_dict, agent.llm_selection
+        )
+        return output_dict[task.unit]
+
+    async def run_root_file_low_level(self, task: Task) -> Optional[dict]:
+        agent = self.agent
+        root_file = self.queue.result("root_file", task.unit)
+        output_dict = await low_level_analysis.analyze_internal_files(
+            {task.unit: root_file}, agent.input_path, agent.llm_selection
+        )
+        # None for the file types the low-level analysis does not read
+        return output_dict.get(task.unit)
+
+    async def run_module(self, task: Task) -> dict:
+        agent = self.agent
+        return await top_level_analysis.analyze_module_folder(
+            task.payload["folder"], task.payload["is_root"], agent.llm_selection
+        )
+
+    async def run_folder_files(self, task: Task) -> Any:
+        agent = self.agent
+        folder_dict = dict(self.queue.payload("module", task.unit)["folder"])
+        folder_dict.update(self.queue.result("module", task.unit))
+        await low_level_analysis.analyze_utility(
+            folder_dict, agent.input_path, agent.llm_selection
+        )
+        return folder_dict["files"]
+
+    async def run_merge(self, task: Task) -> dict:
+        """
+        Journals the results of the analysis tasks and runs the analysis stages over that
+        journal: every unit is restored instead of analyzed, and the stages write the
+        analysis store exactly as a single process run would.
+        """
+        journal = RunJournal(self.workspace_folder)
+        for kind, stage in ANALYSIS_STAGES.items():
+            for unit, result in self.queue.results(kind).items():
+                if result is not None and not journal.done(stage, unit):
+                    journal.record(stage, unit, result)
+
+        agent = self.build_agent(journal)
+        await asyncio.gather(agent.aroot_files_analysis(), agent.amodules_analysis())
+        agent.copy_extended_info_to_logs()
+        return {"analysis_store": agent.analysis_db}
+
+    async def run_section(self, task: Task) -> dict:
+        """
+        Generates one README section, in a section cache of its own seeded with the
+        sections it depends on. Returns the cache entries it added.
+        """
+        agent = self.agent
+        readme_generator = agent.build_readme_generator(
+            section_cache_path=os.path.join(
+                self.workspace_folder, "sections", f"{task.unit}.json"
+            )
+        )
+        os.makedirs(os.path.join(self.workspace_folder, "sections"), exist_ok=True)
+        graph = readme_generator.section_graph()
+
+        needed, pending = [], [task.unit]
+        while pending:
+            section = pending.pop()
+            if section not in needed:
+                needed.append(section)
+                pending += graph[section][1]
+        for section in needed:
+            if section != task.unit:
+                readme_generator.section_cache.sections.update(
+                    self.queue.result("section", section)
+                )
+
+        previous_entries = dict(readme_generator.section_cache.sections)
+        await run_dag({section: graph[section] for section in needed})
+        return {
+            name: entry
+            for name, entry in readme_generator.section_cache.sections.items()
+            if previous_entries.get(name) != entry
+        }
+
+    async def run_readme(self, task: Task) -> str:
+        """Writes the README, its model sections coming from the section tasks."""
+        agent = self.agent
+        section_cache = SectionCache(agent.readme_sections)
+        for entries in self.queue.results("section").values():
+            section_cache.sections.update(entries)
+        section_cache.save()
+
+        await agent.areadme_generator()
+        TokenUsageTracker().log_serialization_report()
+        return agent.readme_md
+
+
+async def run_worker(
+    workspace_folder: str,
+    worker_id: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    llm_selection=None,
+) -> int:
+    """
+    Claims and runs the tasks of a workspace queue until it is drained. Several workers,
+    in other processes or on other machines sharing the workspace, can run at once.
+
+    Args:
+        workspace_folder (str): Workspace filled by enqueue_project.
+        worker_id (str, optional): Lease owner name, host and process id by default.
+        concurrency (int, optional): Tasks run at the same time by this worker, the
+            [task_queue] concurrency setting of pipeline.toml if not provided.
+        llm_selection (optional): Chat model of the worker, initialized from the
+            environment if not provided.
+
+    Returns:
+        int: Number of tasks this worker completed.
+    """
+    config = load_pipeline_config()["task_queue"]
+    owner = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    lease_seconds = config["lease_seconds"]
+    queue = open_task_queue(workspace_folder)
+    executor = TaskExecutor(workspace_folder, queue, llm_selection)
+    completed = 0
+
+    async def keep_lease(task: Task):
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            if not queue.renew(task, owner, lease_seconds):
+                return
+
+    async def worker_slot():
+        nonlocal completed
+        while True:
+            task = queue.claim(owner, lease_seconds)
+            if task is None:
+                if queue.drained():
+                    return
+                # Waiting for dependencies being worked on by other slots or workers
+                await asyncio.sleep(config["poll_seconds"])
+                continue
+
+            _logger.info(f"Worker {owner} running {task}")
+            lease = asyncio.create_task(keep_lease(task))
+            try:
+                result = await executor.run(task)
+                if queue.complete(task, owner, result):
+                    completed += 1
+            except Exception as e:
+                _logger.error(f"Worker {owner} failed {task}: {e}")
+                queue.fail(task, owner, str(e))
+            finally:
+                lease.cancel()
+
+    try:
+        await asyncio.gather(
+            *[worker_slot() for _ in range(concurrency or config["concurrency"])]
+        )
+    finally:
+        queue.close()
+    _logger.info(f"Worker {owner} done, {completed} tasks completed")
+    return completed
@@ -0,0 +1,269 @@
+import os
+import re
+import time
+import shutil
+import uuid
+import asyncio
+from typing import Optional
+
+from langchain.globals import get_llm_cache, set_llm_cache
+
+from batch_runner import prepare_project, setup_response_cache
+from readmate.readmate_agent import ReadMateAgent
+from readmate.utils.logger import set_logger
+from readmate.utils.token_callback_tracker import TokenUsageTracker
+from readmate.utils.utils_tools import load_pipeline_config, model_initialization
+
+_logger = set_logger()
+
+
+class Job:
+    """A project uploaded to the service, with the progress events of its run."""
+
+    FINISHED = ("completed", "skipped", "failed")
+
+    def __init__(self, job_id: str, workspace_folder: str, project_name: str):
+        self.id = job_id
+        self.workspace_folder = workspace_folder
+        self.upload_path = os.path.join(workspace_folder, f"{project_name}.zip")
+        self.status = "queued"
+        self.created = time.time()
+        self.finished_at = None
+        self.seconds = None
+        self.error = None
+        self.readme_path = None
+        self.usage = {"tokens": 0, "cost": 0}
+        self.events = []
+        self._updated = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in self.FINISHED
+
+    def add_event(self, event: dict):
+        """Stores a progress event and wakes up the clients following the job."""
+        self.events.append({"time": round(time.time(), 3), **event})
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    def set_status(self, status: str, **details):
+        self.status = status
+        if self.finished:
+            self.finished_at = time.time()
+        self.add_event({"stage": "job", "status": status, **details})
+
+    async def iter_events(self):
+        """Yields the past events of the job, then the new ones until it finishes."""
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.finished:
+                return
+            await self._updated.wait()
+
+    def artifacts(self) -> dict:
+        """
+        README and analysis store written by the run, and the info_* files exported from
+        the store, by file name.
+        """
+        names = [ReadMateAgent.README, ReadMateAgent.ANALYSIS_DB]
+        if os.path.isdir(self.workspace_folder):
+            names += [
+                name
+                for name in sorted(os.listdir(self.workspace_folder))
+                if name.startswith("info_")
+            ]
+        return {
+            name: os.path.join(self.workspace_folder, name)
+            for name in names
+            if os.path.isfile(os.path.join(self.workspace_folder, name))
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created": self.created,
+            "seconds": self.seconds,
+            "error": self.error,
+            **self.usage,
+            "stage": self.events[-1] if self.events else None,
+            "artifacts": sorted(self.artifacts()),
+        }
+
+
+class JobManager:
+    """
+    Runs the uploaded projects on a bounded pool of workers living as long as the
+    service, in its event loop. The chat model client, the LLM concurrency limit and the
+    response and Python analysis caches stay warm from one job to the next.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        llm_selection=None,
+        history_path: Optional[str] = None,
+        job_retention_seconds: Optional[float] = None,
+        max_finished_jobs: Optional[int] = None,
+    ):
+        """
+        Args:
+            output_dir (str): Folder where a workspace is created for each job.
+            workers (int, optional): Jobs run at the same time, [service] workers of
+                pipeline.toml if not provided.
+            queue_size (int, optional): Jobs waiting for a worker before new uploads are
+                refused, [service] queue_size of pipeline.toml if not provided.
+            llm_selection (optional): Chat model shared by every job, initialized from
+                the environment if not provided.
+            history_path (str, optional): SQLite run history each job run is appended
+                to.
+            job_retention_seconds (float, optional): Seconds a finished job and its
+                workspace are kept, [service] job_retention_seconds of pipeline.toml if
+                not provided.
+            max_finished_jobs (int, optional): Finished jobs kept at most, the oldest
+                ones are dropped first, [service] max_finished_jobs of pipeline.toml if
+                not provided.
+        """
+        self.service_config = load_pipeline_config()["service"]
+        self.jobs_folder = os.path.join(output_dir, "jobs")
+        self.workers = workers or self.service_config["workers"]
+        self.queue_size = queue_size or self.service_config["queue_size"]
+        self.job_retention_seconds = (
+            job_retention_seconds or self.service_config["job_retention_seconds"]
+        )
+        self.max_finished_jobs = (
+            max_finished_jobs or self.service_config["max_finished_jobs"]
+        )
+        self.jobs = {}
+        self._llm_selection = llm_selection
+        self.history_path = history_path
+        self._queue = None
+        self._worker_tasks = []
+        self._previous_cache = None
+        self.token_tracker = TokenUsageTracker()
+
+    async def start(self):
+        os.makedirs(self.jobs_folder, exist_ok=True)
+        if self._llm_selection is None:
+            self._llm_selection = model_initialization()
+        self._previous_cache = get_llm_cache()
+        setup_response_cache(self.service_config["response_cache"], self.jobs_folder)
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        _logger.info(
+            f"Job manager started with {self.workers} workers in {self.jobs_folder}"
+        )
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        set_llm_cache(self._previous_cache)
+
+    def is_full(self) -> bool:
+        return self._queue.full()
+
+    def create_job(self, filename: str = "") -> Job:
+        """
+        Registers a job and creates its workspace, the caller then writes the uploaded
+        zip file to job.upload_path and submits the job.
+        """
+        self.evict_finished_jobs()
+        job_id = str(uuid.uuid4())
+        # The zip name becomes the project folder name, keep it a plain file name
+        project_name = os.path.splitext(os.path.basename(filename))[0]
+        project_name = re.sub(r"[^\w.-]", "_", project_name).strip("._") or "project"
+
+        workspace_folder = os.path.join(self.jobs_folder, job_id)
+        os.makedirs(os.path.join(workspace_folder, "logs"), exist_ok=True)
+        job = Job(job_id, workspace_folder, project_name)
+        self.jobs[job_id] = job
+        return job
+
+    def submit(self, job: Job):
+        """
+        Queues a job for the workers.
+
+        Raises:
+            asyncio.QueueFull: When the queue is full.
+        """
+        self._queue.put_nowait(job)
+        job.set_status("queued", position=self._queue.qsize())
+
+    def discard(self, job: Job):
+        """Forgets an unsubmitted or finished job, along with its workspace."""
+        self.jobs.pop(job.id, None)
+        shutil.rmtree(job.workspace_folder, ignore_errors=True)
+
+    def evict_finished_jobs(self):
+        """
+        Forgets the finished jobs older than the retention period and the oldest ones
+        beyond max_finished_jobs, along with their workspaces.
+        """
+        expired = time.time() - self.job_retention_seconds
+        finished = []
+        for job in list(self.jobs.values()):
+            if job.finished_at is None:
+                continue
+            if job.finished_at < expired:
+                self.discard(job)
+            else:
+                finished.append(job)
+        finished.sort(key=lambda job: job.finished_at)
+        for job in finished[: max(len(finished) - self.max_finished_jobs, 0)]:
+            self.discard(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self.run_job(job)
+            finally:
+                self._queue.task_done()
+
+    async def run_job(self, job: Job):
+        """Documents the uploaded project of a job. Failures are stored in the job."""
+        started = time.perf_counter()
+        job.set_status("running")
+        # Tokens of the LLM calls made from here on are attributed to this job
+        with self.token_tracker.scope(job.id):
+            try:
+                final_dst, status, journal = await asyncio.to_thread(
+                    prepare_project, job.upload_path, job.workspace_folder
+                )
+                if status:
+                    maa = ReadMateAgent(
+                        input_path=final_dst,
+                        workspace_path=job.workspace_folder,
+                        output_path=job.workspace_folder,
+                        llm_selection=self._llm_selection,
+                        journal=journal,
+                        progress_callback=job.add_event,
+                        history_path=self.history_path,
+                    )
+                    job.readme_path = await maa.arun()
+                    final_status = "completed"
+                else:
+                    job.error = "The project did not pass the review checks"
+                    final_status = "skipped"
+            except Exception as e:
+                _logger.error(f"Job {job.id} failed: {e}")
+                job.error = str(e)
+                final_status = "failed"
+
+        job.seconds = round(time.perf_counter() - started, 2)
+        job.usage = self.token_tracker.get_scope_usage(job.id)
+        job.set_status(final_status)
+        _logger.info(f"Job {job.id} {final_status} in {job.seconds}s")
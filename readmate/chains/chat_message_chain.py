@@ -19,16 +19,49 @@ from langchain_community.callbacks import get_openai_callback
 
 
 from readmate.utils.logger import set_logger
+from readmate.utils.concurrency import get_llm_semaphore
+from readmate.utils.prompt_serializer import serialize_prompt_value
+from readmate.utils.run_budget import current_budget
+from readmate.utils.run_history import current_stats
+from readmate.utils.token_estimator import TOKEN_ESTIMATOR
 
 from readmate.utils.utils_tools import (
     log_retry,
+    load_pipeline_config,
 )
 
 import tiktoken
 import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 _logger = set_logger()
 
+# Prompt types of the calls answered with the default response (failed or skipped by
+# the budget), one list per enclosing unanswered_calls block, shared with the tasks
+# started inside the blocks
+_unanswered_calls: ContextVar = ContextVar("unanswered_calls", default=())
+
+
+@contextmanager
+def unanswered_calls():
+    """
+    Collects the calls made inside the block, and in the tasks created inside it, that
+    got the default response instead of an answer of the model. A unit of work or a stage
+    with such calls is not journaled, so a resumed run makes them again. Blocks can be
+    nested, a call is reported to every enclosing block.
+
+    Yields:
+        list: Prompt types of the unanswered calls, filled as they happen.
+    """
+    calls = []
+    token = _unanswered_calls.set(_unanswered_calls.get() + (calls,))
+    try:
+        yield calls
+    finally:
+        _unanswered_calls.reset(token)
+
 
 class ChatMessageChain:
     def __init__(
@@ -39,6 +72,7 @@ class ChatMessageChain:
         llm_selection: AzureChatOpenAI,
         msg_values: List[str],
         base_model=None,
+        prompt_type: Optional[str] = None,
     ) -> None:
         self.base_model: Optional[BaseModel] = base_model
         self.HUMAN_PROMPT: str = human_prompt
@@ -46,11 +80,19 @@ class ChatMessageChain:
         self.input_variables: list = input_variables
         self.llm_selection: AzureChatOpenAI = llm_selection
         self.msg_values: list = msg_values
+        # Name under which the serialization savings are reported
+        self.prompt_type: str = prompt_type or "+".join(input_variables)
         self.chain = None
 
         self.max_input_tokens = 10000
 
         self.token_tracker_inst = TokenUsageTracker()
+        # Tokens held in the run budget while the call runs, whether the budget refused
+        # the call and whether it failed after its retries (the default response was
+        # returned instead in both cases)
+        self.reserved_tokens = 0
+        self.skipped = False
+        self.failed = False
 
         self.warning_tenacity = (
             "(Tenacity) Error after # 3 attemps during chain invoke operation: {}"
@@ -78,6 +120,37 @@ class ChatMessageChain:
 
         return human_message_prompt
 
+    def build_msg_text(self) -> dict:
+        """
+        Maps the input variables to their values, with dicts and lists written in the compact
+        format of pipeline.toml [serialization] instead of their Python repr.
+
+        Returns:
+            dict: The values passed to the prompt template.
+        """
+        serialization = load_pipeline_config()["serialization"]
+        msg_text = {
+            variable: serialize_prompt_value(value, serialization["format"])
+            for variable, value in zip(self.input_variables, self.msg_values)
+        }
+
+        if serialization["report_savings"]:
+            encoding = tiktoken.get_encoding(encoding_name="cl100k_base")
+            repr_tokens = compact_tokens = 0
+            for variable, value in zip(self.input_variables, self.msg_values):
+                if isinstance(value, (dict, list)):
+                    repr_tokens += len(
+                        encoding.encode(str(value), disallowed_special=())
+                    )
+                    compact_tokens += len(
+                        encoding.encode(msg_text[variable], disallowed_special=())
+                    )
+            if repr_tokens:
+                self.token_tracker_inst.log_serialization(
+                    self.prompt_type, repr_tokens, compact_tokens
+                )
+        return msg_text
+
     # Function to remove text between specific substrings including those substrings
     @staticmethod
     def remove_text_between(s, start, end):
@@ -143,39 +216,155 @@ class ChatMessageChain:
         else:
             self.chain = chat_prompt | self.llm_selection
 
+    def estimate_tokens(self) -> int:
+        """
+        Estimates the prompt tokens of the call, before building the chain input: the
+        prompts and the serialized values, capped by the truncation limit.
+
+        Returns:
+            int: Estimated prompt tokens.
+        """
+        encoding = tiktoken.get_encoding(encoding_name="cl100k_base")
+        serialization_format = load_pipeline_config()["serialization"]["format"]
+        values_tokens = sum(
+            len(
+                encoding.encode(
+                    str(serialize_prompt_value(value, serialization_format)),
+                    disallowed_special=(),
+                )
+            )
+            for value in self.msg_values
+        )
+        prompts_tokens = len(
+            encoding.encode(
+                self.SYSTEM_PROMPT + self.HUMAN_PROMPT, disallowed_special=()
+            )
+        )
+        return prompts_tokens + min(values_tokens, self.max_input_tokens)
+
+    def reserve_budget(self) -> bool:
+        """
+        Reserves the estimated tokens of the call in the budget of the run, if any.
+
+        Returns:
+            bool: False if the call does not fit in the budget and must be skipped.
+        """
+        budget = current_budget()
+        if budget is None or not budget.limited:
+            return True
+
+        estimate = self.estimate_tokens() + budget.output_tokens
+        if budget.reserve(estimate):
+            self.reserved_tokens = estimate
+            return True
+        self.skipped = True
+        self.note_unanswered()
+        _logger.warning(
+            f"Run budget: skipping the {self.prompt_type} call, {budget.report()}"
+        )
+        return False
+
+    def release_budget(self):
+        budget = current_budget()
+        if budget is not None and self.reserved_tokens:
+            budget.release(self.reserved_tokens)
+            self.reserved_tokens = 0
+
+    def account_call(self, cb, seconds: float):
+        """
+        Charges the tokens and cost counted by the OpenAI callback to the run budget, and
+        records the call in the measurements of the run. A call answered by the response
+        cache reaches no provider, so it is counted as a cache hit and kept out of the
+        latency and token averages that calibrate the dry run.
+        """
+        budget = current_budget()
+        if budget is not None:
+            budget.charge(tokens=cb.total_tokens, cost=cb.total_cost)
+        stats = current_stats()
+        if stats is not None:
+            cached = cb.successful_requests == 0
+            stats.count_cache("responses", hit=cached)
+            if cached:
+                return
+            stats.record_call(
+                self.prompt_type,
+                self.response_model,
+                seconds,
+                cb.prompt_tokens,
+                cb.completion_tokens,
+            )
+
+    @property
+    def response_model(self) -> str:
+        return self.base_model.__name__ if self.base_model else "text"
+
+    def run_config(self) -> dict:
+        """Metadata of the call, seen by the callbacks and the chat model run manager."""
+        return {
+            "metadata": {
+                "prompt_type": self.prompt_type,
+                "response_model": self.response_model,
+            }
+        }
+
+    @property
+    def answered(self) -> bool:
+        """True when the response comes from the model, not the default response."""
+        return not (self.skipped or self.failed)
+
+    def note_unanswered(self):
+        for calls in _unanswered_calls.get():
+            calls.append(self.prompt_type)
+
+    def default_response(self):
+        return self.base_model.default_dict() if self.base_model else ""
+
     async def run_chain_json_retry(self):
         """
         Attempts to run the current message chain and handles exceptions by retrying up to three times.
-        On failure, returns a default response based on the base model, or an empty string if no base model is provided.
+        On failure, or when the run budget cannot afford the call, returns a default response based on
+        the base model, or an empty string if no base model is provided.
 
         Returns:
             str or dict: Default response from the base model or an empty string if an error persists.
         """
-        try:
-            response = await self.run_current_chain()
-        except Exception as e:
-            _logger.warning(self.warning_tenacity.format(e.last_attempt._exception))
-            # TODO: Fix the dict before the error : JSON FIXER
-            if self.base_model:
-                response = self.base_model.default_dict()
-            else:
-                response = ""
+        async with get_llm_semaphore():
+            # Reserved once a slot is free, so only the calls in flight hold budget
+            if not self.reserve_budget():
+                return self.default_response()
+            try:
+                response = await self.run_current_chain()
+            except Exception as e:
+                _logger.warning(self.warning_tenacity.format(e.last_attempt._exception))
+                # TODO: Fix the dict before the error : JSON FIXER
+                self.failed = True
+                self.note_unanswered()
+                response = self.default_response()
+            finally:
+                self.release_budget()
         return response
 
     def run_chain_json_retry_non_async(self):
         """
         Synchronously attempts to run the current message chain, handling exceptions by retrying up to three times.
 
-        Returns a default dictionary response from the base model in case of exceptions.
+        Returns a default dictionary response from the base model in case of exceptions or when the run
+        budget cannot afford the call.
 
         Returns:
             dict: Default response from the base model.
         """
+        if not self.reserve_budget():
+            return self.base_model.default_dict()
         try:
             response = self.run_current_chain_non_async()
         except Exception as e:
             _logger.warning(self.warning_tenacity.format(e.last_attempt._exception))
+            self.failed = True
+            self.note_unanswered()
             response = self.base_model.default_dict()
+        finally:
+            self.release_budget()
 
         return response
 
@@ -199,22 +388,21 @@ class ChatMessageChain:
             dict: Returns the response from the message chain as a dictionary, possibly modified to meet API constraints.
         """
         try:
-            msg_text = dict(zip(self.input_variables, self.msg_values))
+            msg_text = self.build_msg_text()
 
-            # msg_text max tokens should be 10k
-            encoding = tiktoken.get_encoding(encoding_name="cl100k_base")
+            # msg_text max tokens should be 10k, encoded only when close to the limit
             json_str = json.dumps(msg_text)
-            num_tokens = len(encoding.encode(json_str))
-
-            if num_tokens > self.max_input_tokens:
+            if TOKEN_ESTIMATOR.exceeds(json_str, self.max_input_tokens):
                 truncation = True
 
             if truncation:
                 msg_text = self.truncate_strings_in_dict(data=msg_text)
             with get_openai_callback() as cb:
-                response = await self.chain.ainvoke(msg_text)
+                started = time.perf_counter()
+                response = await self.chain.ainvoke(msg_text, config=self.run_config())
                 self.token_tracker_inst.log_cost(cost=cb.total_cost)
                 self.token_tracker_inst.log_token_usage(tokens_used=cb.total_tokens)
+                self.account_call(cb, time.perf_counter() - started)
 
             if self.base_model:
                 response = response.dict()
@@ -248,11 +436,13 @@ class ChatMessageChain:
         Returns:
             dict: Returns the response from the chain processed into a dictionary format.
         """
-        msg_text = dict(zip(self.input_variables, self.msg_values))
+        msg_text = self.build_msg_text()
         with get_openai_callback() as cb:
-            response = self.chain.invoke(msg_text)
+            started = time.perf_counter()
+            response = self.chain.invoke(msg_text, config=self.run_config())
             self.token_tracker_inst.log_cost(cost=cb.total_cost)
             self.token_tracker_inst.log_token_usage(tokens_used=cb.total_tokens)
+            self.account_call(cb, time.perf_counter() - started)
         response = response.dict()
 
         return response
@@ -1,5 +1,7 @@
+import os
 import sys
 import asyncio
+import functools
 import toml
 
 
@@ -8,15 +10,19 @@ from typing import Optional
 from readmate.utils.logger import set_logger
 from readmate.utils.utils_tools import (
     model_initialization,
-    filter_keys_recursively,
     load_json_from_path,
+    load_pipeline_config,
 )
+from readmate.utils.run_budget import current_budget
+from readmate.utils.analysis_store import AnalysisStore
 from readmate.utils.basemodel_modules import BadgesGeneration
+from readmate.utils.scan_index import ScanIndex
+from readmate.utils.concurrency import run_dag
+from readmate.utils.section_cache import SectionCache
 
 from readmate.prompts.md import (
     SYSTEM_MESSAGE_AGENT_V2,
     INTRODUCTION_PROMPT,
-    PROJECT_TREE_PROMPT,
     FEATURES_PROMPT,
     BADGES_PROMPT_V2,
     SYSTEM_MESSAGE_AGENT_CUSTOM,
@@ -26,7 +32,9 @@ from readmate.prompts.md import (
     CONFIGURATION_PROMPT,
 )
 from readmate.chains.chat_message_chain import ChatMessageChain
+from readmate.generators.tree import IgnoreRules, TreeGenerator
 from readmate.modules.project_inspector import ProjectInspector
+from readmate.modules.license_analyzer import license_badge_key
 
 
 if sys.platform.startswith("win"):
@@ -53,37 +61,19 @@ def convert_to_variable(name):
         return f"{name} not found"
 
 
-def json_to_minimal_text(data, indent=0):
-    text = ""
-    indent_str = " " * indent
-
-    if isinstance(data, dict):
-        for key, value in data.items():
-            text += f"{indent_str}{key}: "  # No newline after key
-            if isinstance(value, (dict, list)):
-                text += "\n" + json_to_minimal_text(value, indent + 2)
-            else:
-                text += f"{value}\n"
-    elif isinstance(data, list):
-        for item in data:
-            if isinstance(item, dict):
-                text += json_to_minimal_text(item, indent)
-            else:
-                text += f"{indent_str}{item}\n"
-    else:
-        text += f"{indent_str}{data}\n"
-
-    return text.strip()
-
-
 class BaseReadmeGenerator:
+    # Sections generated from the output of other sections, see section_graph
+    SECTION_DEPENDENCIES = {"features": ["overview"]}
+
     def __init__(
         self,
         project_name: str,
         introduction: str,
-        off_module_path,
-        in_module_path,
+        analysis_store: AnalysisStore,
         input_project_path,
+        scan_index: Optional[ScanIndex] = None,
+        section_cache_path: Optional[str] = None,
+        llm_selection=None,
     ):
         """
         Initializes the BaseReadmeGenerator with project details and analysis.
@@ -91,16 +81,25 @@ class BaseReadmeGenerator:
         Args:
             project_name (str): The name of the project.
             introduction (str): Introduction or description of the project.
-            off_module_path: Path to the JSON file for off-module analysis.
-            in_module_path: Path to the JSON file for in-module analysis.
+            analysis_store: AnalysisStore with the off-module (root files) and in-module analyses.
             input_project_path: Path to the input project for which the README is generated.
+            scan_index (optional): Shared ScanIndex of the input project, built here if not provided.
+            section_cache_path (optional): JSON file with the sections of the previous run,
+                next to the analysis store by default.
+            llm_selection (optional): Chat model shared with the analysis stages, initialized here if not provided.
         """
         # self.project_name = project_name.capitalize()
         self.project_name = "Project Readme"
         self.introduction = introduction
-        self.off_module_path = off_module_path
-        self.in_module_path = in_module_path
+        self.analysis_store = analysis_store
         self.input_project_path = input_project_path
+        self.scan_index = scan_index or ScanIndex(input_project_path)
+        self.section_cache = SectionCache(
+            section_cache_path
+            or os.path.join(
+                os.path.dirname(analysis_store.db_path), "readme_sections.json"
+            )
+        )
 
         # Initialize placeholders for sections
 
@@ -118,18 +117,15 @@ class BaseReadmeGenerator:
 
         self._load_json_files()
 
-        self.llm_selection = model_initialization()
+        self.llm_selection = llm_selection or model_initialization()
 
     def _load_json_files(self):
         """
         Loads JSON configuration files from specified paths and processes section details.
-        This method populates off-module and in-module data and updates json_structure with dynamic content based on the current context.
+        This method updates json_structure with dynamic content based on the current context,
+        the off-module and in-module analyses are queried from the analysis store per section.
         """
 
-        self.off_module = load_json_from_path(file_path=self.off_module_path)
-
-        self.in_module = load_json_from_path(file_path=self.in_module_path)
-
         self.json_structure = load_json_from_path(
             file_path=self.json_structure_markdown
         )
@@ -148,6 +144,7 @@ class BaseReadmeGenerator:
         msg_values: list,
         system_prompt: str,
         base_model=None,
+        cache_section: Optional[str] = None,
     ):
         """
         Invokes a chain of operations to generate content based on dynamic prompts and input variables.
@@ -158,10 +155,29 @@ class BaseReadmeGenerator:
             msg_values (list): Values corresponding to the input variables.
             system_prompt (str): System-specific prompt for processing.
             base_model (optional): The base model for additional processing, can be None.
+            cache_section (optional): Section name under which the response is cached. When its
+                inputs match the previous run, the cached response is returned without a model call.
 
         Returns:
             str or dict: The processed response from the message chain, which could be a string or dictionary depending on the base model.
+                None when the run budget does not allow the call, the section is then written without the model.
         """
+        if cache_section:
+            digest = SectionCache.digest(
+                dict(zip(input_variables, msg_values)),
+                selected_prompt,
+                system_prompt,
+                base_model.__name__ if base_model else None,
+                self.model_signature(),
+            )
+            cached = self.section_cache.get(cache_section, digest)
+            if cached is not None:
+                return cached
+
+        budget = current_budget()
+        if budget is not None and budget.level() >= budget.DETERMINISTIC:
+            return None
+
         cmc = ChatMessageChain(
             input_variables=input_variables,
             human_prompt=selected_prompt,
@@ -169,13 +185,27 @@ class BaseReadmeGenerator:
             llm_selection=self.llm_selection,
             msg_values=msg_values,
             base_model=base_model,
+            prompt_type=cache_section,
         )
         cmc.setup_chain()
         response = await cmc.run_chain_json_retry()
-
-        if base_model or isinstance(response, str):
-            return response
-        return response.content
+        if cmc.skipped:
+            # Not cached, the next run with a larger budget generates it
+            return None
+
+        if not (base_model or isinstance(response, str)):
+            response = response.content
+        if cache_section:
+            self.section_cache.put(cache_section, digest, response)
+        return response
+
+    def model_signature(self) -> dict:
+        """Model settings that change the generated text, part of the section cache key."""
+        return {
+            "model": getattr(self.llm_selection, "model_name", None)
+            or getattr(self.llm_selection, "deployment_name", None),
+            "temperature": getattr(self.llm_selection, "temperature", None),
+        }
 
 
 class ReadmeGenerator(BaseReadmeGenerator):
@@ -222,37 +252,15 @@ class ReadmeGenerator(BaseReadmeGenerator):
         extra_variables: Optional[list] = None,
         extra_msg_values: Optional[list] = None,
         base_model=None,
+        section: Optional[str] = None,
     ):
-        file_descriptions = filter_keys_recursively(
-            self.off_module, description_keys_file, crucial_keys=self.crucial_keys
+        file_descriptions = self.analysis_store.project(
+            "files", description_keys_file, crucial_keys=self.crucial_keys
         )
-        module_descriptions = filter_keys_recursively(
-            self.in_module, description_keys_module, crucial_keys=self.crucial_keys
+        module_descriptions = self.analysis_store.project(
+            "modules", description_keys_module, crucial_keys=self.crucial_keys
         )
 
-        def remove_empty_values(data):
-            """
-            Recursively remove key-value pairs from a dictionary where the value is empty.
-            An empty value is defined as None, an empty string, list, or dictionary.
-            """
-            if isinstance(data, dict):
-                return {
-                    key: remove_empty_values(value)
-                    for key, value in data.items()
-                    if value or isinstance(value, (int, float))
-                }
-            elif isinstance(data, list):
-                return [
-                    remove_empty_values(item)
-                    for item in data
-                    if item or isinstance(item, (int, float))
-                ]
-            else:
-                return data
-
-        file_descriptions = remove_empty_values(data=file_descriptions)
-        module_descriptions = remove_empty_values(data=module_descriptions)
-
         _logger.info(log_generation)
         text_gen = await self.chain_invoker(
             input_variables=["file_descriptions", "module_descriptions"]
@@ -262,9 +270,41 @@ class ReadmeGenerator(BaseReadmeGenerator):
             + (extra_msg_values if extra_msg_values else []),
             system_prompt=SYSTEM_MESSAGE_AGENT_V2,
             base_model=base_model,
+            cache_section=section,
         )
+        if text_gen is None:
+            text_gen = self.deterministic_section(section)
         return text_gen
 
+    def deterministic_section(self, section: Optional[str]) -> str:
+        """
+        Text of a section written from the module analysis alone, when the run budget does
+        not allow its model call.
+
+        Args:
+            section (str): Name of the section.
+
+        Returns:
+            str: The root module description for the overview, a table of the module
+                descriptions for the features, a notice for the other sections or when
+                the analysis has no descriptions either.
+        """
+        # Breadth first, the project root first
+        folders = self.analysis_store.folders() or [{}]
+        if section == "overview":
+            return folders[0].get("Description") or self.introduction
+        if section == "features":
+            rows = [
+                f"| {folder_dict['current_folder']} | {folder_dict['Description']} |"
+                for folder_dict in folders[1:]
+                if folder_dict.get("Description")
+            ]
+            if rows:
+                return self.features_table + "\n".join(rows)
+        return (
+            f"Not generated, the run budget was exhausted before the {section} section"
+        )
+
     def join_readme(self):
         # Ensure that the table of contents is up to date
         self.generate_table_of_contents()
@@ -277,26 +317,28 @@ class ReadmeGenerator(BaseReadmeGenerator):
             readme_structure += f"{section_content}\n\n"
         return readme_structure
 
-    async def completion_llm_badges(self, content):
-        self.badges = await self.chain_invoker(
-            input_variables=["file_info"],
-            selected_prompt=BADGES_PROMPT_V2,
-            msg_values=[content],
-            system_prompt=SYSTEM_MESSAGE_AGENT_V2,
-            base_model=BadgesGeneration,
-        )
-
+    def complete_badges(self, badges: list):
         badges_addition = ""
         badges_addition += (
             "\n".join(
                 badge if badge.endswith(".svg)") else badge.replace(")", ".svg)")
-                for badge in self.badges["Badges"]
+                for badge in badges
             )
             + "\n\n"
         )
 
         self.fill_section("badges", badges_addition)
 
+    async def completion_llm_badges(self, content):
+        self.badges = await self.chain_invoker(
+            input_variables=["file_info"],
+            selected_prompt=BADGES_PROMPT_V2,
+            msg_values=[content],
+            system_prompt=SYSTEM_MESSAGE_AGENT_V2,
+            base_model=BadgesGeneration,
+            cache_section="badges",
+        ) or {"Badges": []}
+
     async def completion_llm_overview(self):
         keys_shared = ["Description"]
         self.introduction = await self.completion_llm_section(
@@ -304,18 +346,26 @@ class ReadmeGenerator(BaseReadmeGenerator):
             description_keys_module=keys_shared,
             log_generation="Generating I - Project Overview",
             prompt=INTRODUCTION_PROMPT,
+            section="overview",
         )
 
     async def completion_project_tree(self):
-        keys_shared = ["current_folder"]
-        self.project_tree = await self.completion_llm_section(
-            description_keys_file=keys_shared,
-            description_keys_module=keys_shared,
-            log_generation="Generating III - Project Tree",
-            prompt=PROJECT_TREE_PROMPT,
-        )
+        # Rendered locally from the scan index: exact and without a model call
+        _logger.info("Generating III - Project Tree")
+        tree_config = load_pipeline_config()["project_tree"]
+        self.project_tree = TreeGenerator(
+            root_dir=self.input_project_path,
+            max_depth=tree_config["max_depth"],
+            max_children=tree_config["max_children"],
+            scan_index=self.scan_index,
+            ignore_rules=IgnoreRules.from_gitignore(
+                self.input_project_path, tree_config["ignore"]
+            ),
+        ).tree()
 
-        self.fill_section("project_tree", f"## Project Tree\n\n {self.project_tree}")
+        self.fill_section(
+            "project_tree", f"## Project Tree\n\n```\n{self.project_tree}\n```"
+        )
 
     async def completion_llm_features(self):
         keys_shared = ["Description"]
@@ -326,6 +376,7 @@ class ReadmeGenerator(BaseReadmeGenerator):
             extra_variables=["project_overview"],
             extra_msg_values=[self.introduction],
             prompt=FEATURES_PROMPT,
+            section="features",
         )
 
         self.fill_section("features", f"## Features\n\n {self.features_table}")
@@ -334,18 +385,19 @@ class ReadmeGenerator(BaseReadmeGenerator):
         self, section: str, section_params: dict, iter_n: int
     ):
         section_params["log_msg"] = section_params["log_msg"].format(iter_n, section)
-        self.llm_text = await self.completion_llm_section(
+        llm_text = await self.completion_llm_section(
             description_keys_file=section_params["desc_keys_files"],
             description_keys_module=section_params["desc_keys_modules"],
             log_generation=section_params["log_msg"],
             extra_variables=section_params.get("extra_variables"),
             extra_msg_values=section_params.get("extra_msg"),
             prompt=section_params["prompt"],
+            section=section,
         )
 
         self.fill_section(
             section,
-            f"## {section.capitalize()}\n\n> {self.llm_text}",
+            f"## {section.capitalize()}\n\n> {llm_text}",
         )
 
     def complete_generic_section(self, section: str, llm_text: Optional[str] = None):
@@ -357,26 +409,40 @@ class ReadmeGenerator(BaseReadmeGenerator):
             f"## {section.capitalize()}\n\n> {llm_text}",
         )
 
-    async def generate_llm_sections(self):
-        await self.completion_llm_overview()
-        await self.completion_project_tree()
-        await self.completion_llm_features()
+    def section_graph(self) -> dict:
+        """
+        Declares every README section with the sections it needs as input, so that
+        gen_readme can run them as a DAG. Only the features table depends on another
+        section (the project overview); everything else starts right away.
 
-    async def complete_template_sections(self, template_sections):
-        tasks = [
-            self.complete_llm_section(ss, details, iteration_count)
-            for iteration_count, (ss, details) in enumerate(
-                self.json_structure.items(), 1
+        Returns:
+            dict: Section name -> (coroutine function, list of dependencies).
+        """
+        graph = {
+            "overview": (self.completion_llm_overview, []),
+            "project_tree": (self.completion_project_tree, []),
+            "features": (
+                self.completion_llm_features,
+                self.SECTION_DEPENDENCIES["features"],
+            ),
+            "inspector": (self.inspect_and_complete_project, []),
+        }
+        for iteration_count, (ss, details) in enumerate(self.json_structure.items(), 1):
+            graph[ss] = (
+                functools.partial(
+                    self.complete_llm_section, ss, details, iteration_count
+                ),
+                [],
             )
-        ]
-        await asyncio.gather(*tasks)
-
-        for ss in template_sections:
-            self.complete_generic_section(ss)
+        return graph
 
     async def inspect_and_complete_project(self):
         # INSPECTOR
-        inspector = ProjectInspector(directory_path=self.input_project_path)
+        inspector = ProjectInspector(
+            directory_path=self.input_project_path,
+            scan_index=self.scan_index,
+            llm_selection=self.llm_selection,
+        )
         extended_sections = await inspector.run()
         LLM_EXCEPTION_TEXT = "No details were found relating {}"
         sections = ["requirements", "deployment", "license"]
@@ -389,8 +455,24 @@ class ReadmeGenerator(BaseReadmeGenerator):
             )
             self.complete_generic_section(section=section, llm_text=text)
 
+        license_badge = self.license_badges.get(
+            license_badge_key(extended_sections["license_id"])
+        )
+
         # BUG: Badges should be seen in lines, not vertically
-        await self.completion_llm_badges(content=extended_sections["requirements"])
+        if extended_sections["badges"]:
+            # Badges parsed from the requirement files, no LLM call needed
+            self.badges = {"Badges": extended_sections["badges"]}
+        elif extended_sections["requirements"]:
+            await self.completion_llm_badges(content=extended_sections["requirements"])
+        else:
+            self.badges = {"Badges": []}
+
+        # A new list: the badges may be the output stored in the section cache
+        badges = list(self.badges["Badges"])
+        if license_badge:
+            badges.append(license_badge)
+        self.complete_badges(badges)
 
     async def gen_readme(self):
         # Adding dynamic code percentage badges
@@ -402,14 +484,13 @@ class ReadmeGenerator(BaseReadmeGenerator):
             "examples": "",
             "testing": "",
         }
-        # Generate dynamic sections based on LLM analysis
-        await self.generate_llm_sections()
-
-        # Complete template sections based on JSON structure
-        await self.complete_template_sections(template_sections)
+        for ss in template_sections:
+            self.complete_generic_section(ss)
 
-        # Inspect project and complete sections like requirements, deployment, license
-        await self.inspect_and_complete_project()
+        # LLM sections and the project inspector (requirements, deployment, license,
+        # badges) run concurrently, following their dependencies
+        await run_dag(self.section_graph())
+        self.section_cache.save()
 
         self.content_md = self.join_readme()
 
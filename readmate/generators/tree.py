@@ -1,53 +1,206 @@
 """Generates a directory tree structure for a code repository."""
 
+import os
+import re
+import fnmatch
 from pathlib import Path
+from typing import Iterator, Optional
+
+from readmate.utils.scan_index import ScanIndex
+
+
+class IgnoreRules:
+    """
+    Names and paths left out of the project tree. Patterns without a slash are matched
+    against entry names, the others against paths relative to the project root, with
+    the fnmatch syntax used by .gitignore files (negations are not supported).
+    """
+
+    DEFAULT_PATTERNS = [
+        ".git",
+        "__pycache__",
+        ".venv",
+        "venv",
+        "node_modules",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".tox",
+        ".idea",
+        ".vscode",
+        ".DS_Store",
+        "*.egg-info",
+        "*.pyc",
+    ]
+
+    def __init__(self, patterns: Optional[list] = None):
+        patterns = self.DEFAULT_PATTERNS if patterns is None else patterns
+        self.names = set()
+        name_globs, path_globs = [], []
+        for pattern in patterns:
+            pattern = pattern.strip().rstrip("/")
+            if not pattern:
+                continue
+            if "/" in pattern:
+                path_globs.append(fnmatch.translate(pattern.lstrip("/")))
+            elif any(char in pattern for char in "*?["):
+                name_globs.append(fnmatch.translate(pattern))
+            else:
+                self.names.add(pattern)
+        # One compiled alternation per kind instead of an fnmatch call per pattern
+        self.name_regex = re.compile("|".join(name_globs)) if name_globs else None
+        self.path_regex = re.compile("|".join(path_globs)) if path_globs else None
+
+    @classmethod
+    def from_gitignore(cls, root_dir: str, extra_patterns: Optional[list] = None):
+        """Default patterns, plus the extra ones and those in the root .gitignore."""
+        patterns = cls.DEFAULT_PATTERNS + (extra_patterns or [])
+        gitignore_path = os.path.join(root_dir, ".gitignore")
+        if os.path.isfile(gitignore_path):
+            with open(gitignore_path, "r", encoding="utf-8", errors="ignore") as file:
+                patterns += [
+                    line.strip()
+                    for line in file
+                    if line.strip() and not line.startswith(("#", "!"))
+                ]
+        return cls(patterns)
+
+    def ignored(self, name: str, relative_path: str) -> bool:
+        if name in self.names:
+            return True
+        if self.name_regex and self.name_regex.match(name):
+            return True
+        return bool(self.path_regex and self.path_regex.match(relative_path))
 
 
 class TreeGenerator:
     """Generates a directory tree structure for a code repository."""
 
-    def __init__(self, root_dir: Path, max_depth: int):
+    def __init__(
+        self,
+        root_dir: Path,
+        max_depth: int,
+        max_children: Optional[int] = None,
+        scan_index: Optional[ScanIndex] = None,
+        ignore_rules: Optional[IgnoreRules] = None,
+    ):
+        """
+        Args:
+            root_dir (Path): Root folder of the tree.
+            max_depth (int): Deepest level rendered, the root being level 0.
+            max_children (int, optional): Entries listed per folder before collapsing the
+                rest into a single "… N more files" line.
+            scan_index (ScanIndex, optional): When given, the tree is built from the
+                indexed paths instead of listing the folders again.
+            ignore_rules (IgnoreRules, optional): Entries left out of the tree, the
+                IgnoreRules defaults when not provided.
+        """
         self.root_dir = Path(root_dir)
         self.max_depth = max_depth
+        self.max_children = max_children
+        self.ignore_rules = ignore_rules or IgnoreRules()
+        self.children_map = None
+        if scan_index is not None:
+            self.children_map = self._index_children(scan_index)
+            self.root_path = os.path.dirname(os.path.join(scan_index.root_path, "_"))
+        else:
+            self.root_path = str(self.root_dir)
 
-    def _build_tree(
-        self,
-        directory: Path,
-        prefix: str = "",
-        is_last: bool = True,
-        depth: int = 0,
-    ) -> str:
-        """Generates a tree structure for a given directory."""
-        if depth > self.max_depth:
-            return ""
+    @staticmethod
+    def _index_children(scan_index: ScanIndex) -> dict:
+        """
+        Groups the indexed folders and files by parent folder as (name, path, is_dir)
+        entries. Plain string operations keep this fast on very large indexes.
+        """
+        children_map = {path: [] for path in scan_index.dir_paths}
+        for paths, is_dir in [
+            (scan_index.dir_paths, True),
+            (scan_index.file_paths, False),
+        ]:
+            for path in paths:
+                parent, name = os.path.split(path)
+                children_map.setdefault(parent, []).append((name, path, is_dir))
+        return children_map
 
-        children = sorted(directory.iterdir()) if directory.is_dir() else []
-        children = [child for child in children]
+    def _entries(self, directory: str, relative_dir: str) -> list:
+        """Visible entries of a folder as (name, path, is_dir, relative_path), sorted by name."""
+        if self.children_map is not None:
+            raw_entries = self.children_map.get(directory, [])
+        else:
+            try:
+                with os.scandir(directory) as iterator:
+                    # DirEntry caches its type, so no extra stat call per entry
+                    raw_entries = [
+                        (entry.name, entry.path, entry.is_dir(follow_symlinks=False))
+                        for entry in iterator
+                    ]
+            except OSError:
+                return []
 
-        if not children and directory.is_dir():
-            return ""
+        entries = []
+        for name, path, is_dir in raw_entries:
+            relative_path = f"{relative_dir}/{name}" if relative_dir else name
+            if not self.ignore_rules.ignored(name, relative_path):
+                entries.append((name, path, is_dir, relative_path))
+        entries.sort()
+        return entries
 
-        """
-        dir_name = directory.name
-        if depth == 2 and directory.is_dir():
-            dir_name += "               ► summary of directory"
-        parts = [f"{prefix}{'└── ' if is_last else '├── '}{dir_name}"]
-        """
-        parts = [f"{prefix}{'└── ' if is_last else '├── '}{directory.name}"]
+    def _has_entries(self, directory: str, relative_dir: str) -> bool:
+        return bool(self._entries(directory, relative_dir))
+
+    @staticmethod
+    def _collapsed_line(hidden_dirs: int, hidden_files: int) -> str:
+        parts = []
+        if hidden_dirs:
+            parts.append(f"{hidden_dirs} more folder{'s' if hidden_dirs > 1 else ''}")
+        if hidden_files:
+            parts.append(f"{hidden_files} more file{'s' if hidden_files > 1 else ''}")
+        return "… " + ", ".join(parts)
+
+    def _iter_children(self, entries: list, prefix: str, depth: int) -> Iterator[str]:
+        if depth > self.max_depth:
+            return
+
+        # Keep up to max_children visible entries, empty folders are left out. Folders
+        # are listed once here and their entries passed down to the next level.
+        shown = []
+        hidden_dirs = hidden_files = 0
+        for name, path, is_dir, relative_path in entries:
+            if self.max_children is not None and len(shown) >= self.max_children:
+                if is_dir:
+                    hidden_dirs += 1
+                else:
+                    hidden_files += 1
+                continue
+            if not is_dir:
+                shown.append((name, None))
+            elif depth == self.max_depth:
+                if self._has_entries(path, relative_path):
+                    shown.append((name, []))
+            else:
+                child_entries = self._entries(path, relative_path)
+                if child_entries:
+                    shown.append((name, child_entries))
 
-        for index, child in enumerate(children):
-            child_prefix = prefix + ("    " if is_last else "│   ")
-            child_tree = self._build_tree(
-                child, child_prefix, index == len(children) - 1, depth + 1
-            )
+        hidden = hidden_dirs + hidden_files
+        for index, (name, child_entries) in enumerate(shown):
+            is_last = index == len(shown) - 1 and not hidden
+            yield f"{prefix}{'└── ' if is_last else '├── '}{name}"
+            if child_entries:
+                yield from self._iter_children(
+                    child_entries, prefix + ("    " if is_last else "│   "), depth + 1
+                )
 
-            if child_tree:
-                parts.append(child_tree)
+        if hidden:
+            yield f"{prefix}└── {self._collapsed_line(hidden_dirs, hidden_files)}"
 
-        return "\n".join(parts)
+    def iter_lines(self) -> Iterator[str]:
+        """Yields the lines of the tree one by one, listing each folder at most once."""
+        entries = self._entries(self.root_path, "")
+        if not entries:
+            return
+        yield f"└── {self.root_dir.name}"
+        yield from self._iter_children(entries, "    ", 1)
 
     def tree(self) -> str:
         """Generates and formats a tree structure."""
-        md_tree = self._build_tree(self.root_dir)
-        print(md_tree)
-        return md_tree
+        return "\n".join(self.iter_lines())
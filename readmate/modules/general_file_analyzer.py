@@ -80,17 +80,119 @@ class TOMLAnalyzer(FileAnalyzer):
 
 
 class DockerfileAnalyzer(FileAnalyzer):
+    def instructions(self):
+        # Join the lines continued with a backslash and drop comments
+        instruction = ""
+        for line in self.content.split("\n"):
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            if stripped.endswith("\\"):
+                instruction += stripped[:-1].strip() + " "
+                continue
+            yield instruction + stripped
+            instruction = ""
+        if instruction:
+            yield instruction.strip()
+
     def analyze(self):
-        instructions = self.content.split("\n")
-        analysis_result = {"FROM": [], "RUN": []}
-        for instruction in instructions:
-            if instruction.startswith("FROM"):
+        analysis_result = {
+            "FROM": [],
+            "RUN": [],
+            "base_images": [],
+            "exposed_ports": [],
+            "entrypoint": [],
+            "cmd": [],
+            "workdir": [],
+        }
+        for instruction in self.instructions():
+            keyword, _, arguments = instruction.partition(" ")
+            keyword = keyword.upper()
+            arguments = arguments.strip()
+            if keyword == "FROM":
                 analysis_result["FROM"].append(instruction)
-            elif instruction.startswith("RUN"):
+                # FROM [--platform=...] image [AS stage]
+                image = [arg for arg in arguments.split() if not arg.startswith("--")]
+                if image:
+                    analysis_result["base_images"].append(image[0])
+            elif keyword == "RUN":
                 analysis_result["RUN"].append(instruction)
+            elif keyword == "EXPOSE":
+                analysis_result["exposed_ports"].extend(arguments.split())
+            elif keyword == "ENTRYPOINT":
+                analysis_result["entrypoint"] = [arguments]
+            elif keyword == "CMD":
+                analysis_result["cmd"] = [arguments]
+            elif keyword == "WORKDIR":
+                analysis_result["workdir"].append(arguments)
         return analysis_result
 
 
+class ComposeAnalyzer(YAMLAnalyzer):
+    def analyze(self):
+        services = {}
+        for name, service in ((self.content or {}).get("services") or {}).items():
+            service = service or {}
+            build = service.get("build")
+            services[name] = {
+                "image": service.get("image", ""),
+                "build": (
+                    build.get("context", ".") if isinstance(build, dict) else build
+                ),
+                "ports": [str(port) for port in service.get("ports", [])],
+                "depends_on": list(service.get("depends_on", [])),
+                "command": service.get("command", ""),
+            }
+        return {"services": services}
+
+
+class KubernetesManifestAnalyzer(FileAnalyzer):
+    def read_file(self):
+        # Overriding to parse every YAML document of the manifest
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            return [doc for doc in yaml.safe_load_all(file) if isinstance(doc, dict)]
+
+    @staticmethod
+    def _pod_spec(resource: dict) -> dict:
+        spec = resource.get("spec") or {}
+        if resource.get("kind") == "CronJob":
+            spec = spec.get("jobTemplate", {}).get("spec", {})
+        if "template" in spec:
+            spec = spec["template"].get("spec") or {}
+        return spec
+
+    def analyze(self):
+        resources = []
+        for resource in self.content:
+            spec = resource.get("spec") or {}
+            containers = self._pod_spec(resource).get("containers", [])
+            ports = [
+                str(port.get("containerPort"))
+                for container in containers
+                for port in container.get("ports", [])
+                if port.get("containerPort")
+            ] + [
+                str(port.get("port"))
+                for port in spec.get("ports", [])
+                if port.get("port")
+            ]
+            resources.append(
+                {
+                    "kind": resource.get("kind", ""),
+                    "name": (resource.get("metadata") or {}).get("name", ""),
+                    "replicas": spec.get("replicas"),
+                    "images": [c.get("image", "") for c in containers],
+                    "ports": ports,
+                    "service_type": (
+                        spec.get("type", "")
+                        if resource.get("kind") == "Service"
+                        else ""
+                    ),
+                }
+            )
+        return {"resources": resources}
+
+
 class ENVAnalyzer(FileAnalyzer):
     def analyze(self):
         variables = [
@@ -115,6 +217,18 @@ class JSONFileAnalyzer(FileAnalyzer):
         return list(data.keys())
 
 
+def get_deployment_analyzer(file_path):
+    file_name = os.path.basename(file_path).lower()
+    if file_name.startswith("dockerfile") or file_name.endswith(".dockerfile"):
+        return DockerfileAnalyzer(file_path)
+    elif "compose" in file_name:
+        return ComposeAnalyzer(file_path)
+    elif file_name.endswith((".yaml", ".yml")):
+        return KubernetesManifestAnalyzer(file_path)
+    else:
+        raise ValueError(f"No deployment analyzer found for the file: {file_path}")
+
+
 def get_file_analyzer(file_path):
     extension_to_analyzer = {
         ".md": MarkdownAnalyzer,
@@ -0,0 +1,106 @@
+import re
+from typing import Optional
+
+from readmate.utils.utils_tools import load_toml
+
+
+SPDX_IDENTIFIER = re.compile(r"SPDX-License-Identifier:\s*([A-Za-z0-9.+-]+)")
+# GPL-family identifiers name the version range, the fingerprints only the version
+SPDX_VERSION_SUFFIX = re.compile(r"-(only|or-later)$", re.IGNORECASE)
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_license_text(text: str) -> list:
+    """
+    Lowercases the text and keeps only its words, so punctuation, numbering,
+    line wrapping and markdown decorations do not affect the comparison.
+    """
+    return WORD.findall(text.lower())
+
+
+def shingles(words: list, size: int) -> set:
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+class LicenseMatcher:
+    """
+    Identifies license files offline by comparing them against the SPDX fingerprints
+    bundled in readmate/configs/license_fingerprints.toml.
+    """
+
+    def __init__(
+        self,
+        fingerprints_path: str = "readmate/configs/license_fingerprints.toml",
+        shingle_size: int = 4,
+        threshold: float = 0.75,
+    ):
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.licenses = load_toml(fingerprints_path)["licenses"]
+        self.fingerprints = {
+            spdx: shingles(normalize_license_text(details["text"]), shingle_size)
+            for spdx, details in self.licenses.items()
+        }
+
+    def _result(self, spdx: str, similarity: float) -> dict:
+        return {
+            "spdx": spdx,
+            "name": self.licenses[spdx]["name"],
+            "summary": self.licenses[spdx]["summary"],
+            "similarity": round(similarity, 3),
+        }
+
+    def identify(self, text: str) -> Optional[dict]:
+        """
+        Returns the best matching license, or None when no fingerprint is similar enough.
+
+        The similarity is the share of a fingerprint's shingles found in the text. Among the
+        licenses above the threshold, the one explaining more of the text wins, so a
+        BSD-3-Clause file is not reported as BSD-2-Clause.
+        """
+        identifier = SPDX_IDENTIFIER.search(text)
+        if identifier:
+            # An exact match only, so MIT-0 is not reported as MIT
+            declared = SPDX_VERSION_SUFFIX.sub("", identifier.group(1)).lower()
+            for spdx in self.licenses:
+                if declared == spdx.lower():
+                    return self._result(spdx, 1.0)
+
+        document = shingles(normalize_license_text(text), self.shingle_size)
+        if not document:
+            return None
+
+        best = None
+        for spdx, fingerprint in self.fingerprints.items():
+            matched = len(fingerprint & document)
+            similarity = matched / len(fingerprint)
+            if similarity < self.threshold:
+                continue
+            if best is None or (matched, similarity) > best[1:]:
+                best = (spdx, matched, similarity)
+
+        if best is None:
+            return None
+        return self._result(best[0], best[2])
+
+
+_matcher = None
+
+
+def identify_license(text: str) -> Optional[dict]:
+    global _matcher
+    if _matcher is None:
+        _matcher = LicenseMatcher()
+    return _matcher.identify(text)
+
+
+def license_to_markdown(license_info: dict) -> str:
+    return (
+        f"This project is released under the **{license_info['name']}** "
+        f"(SPDX: `{license_info['spdx']}`).\n\n{license_info['summary']}\n"
+    )
+
+
+def license_badge_key(spdx: str) -> str:
+    """Maps an SPDX identifier to its key in the [license_badges] table of readme_structure.toml."""
+    return spdx.replace("-", "_").replace(".", "_")
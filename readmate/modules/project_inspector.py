@@ -1,28 +1,118 @@
 import os
+import re
 import sys
 import uuid
-import tiktoken
 import asyncio
 from typing import Optional
 from datetime import datetime
 from readmate.chains.chat_message_chain import ChatMessageChain
 from readmate.utils.logger import set_logger
+from readmate.utils.scan_index import ScanIndex
+from readmate.utils.token_estimator import DEFAULT_KIND, TOKEN_ESTIMATOR
 from readmate.utils.utils_tools import (
     model_initialization,
 )
+from readmate.modules.requirements_analyzer import (
+    get_requirements_analyzer,
+    generate_requirements_badges,
+    requirements_to_markdown,
+)
+from readmate.modules.license_analyzer import identify_license, license_to_markdown
+from readmate.modules.general_file_analyzer import get_deployment_analyzer
 from readmate.prompts.inspector import (
     SYSTEM_MESSAGE_INSPECTOR,
     REQUIREMENTS_PROMPT,
     DEPLOYMENT_PROMPT,
+    DEPLOYMENT_FACTS_PROMPT,
     LICENSE_PROMPT,
     README_PROMPT,
 )
 
 
+# Upper bound of characters per token, used to read only the prefix of a file that fits a token budget
+MAX_CHARS_PER_TOKEN = 8
+
+
 if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
+class FileClassifier:
+    """
+    Puts each file path into every inspector category in a single pass, with hash lookups
+    on the lowercase basename and precompiled regexes for the prefix/suffix patterns.
+    """
+
+    REQUIREMENT_MANAGERS = ["requirements", "pipenv", "poetry", "conda"]
+    DEPLOYMENT_MANAGERS = ["docker", "kubernetes", "azure_pipelines"]
+
+    # Lowercase basename -> (category, manager)
+    BASENAME_RULES = {
+        "requirements.txt": ("requirements", "requirements"),
+        "pipfile": ("requirements", "pipenv"),
+        # Assuming poetry uses pyproject.toml and conda uses environment.yml
+        "pyproject.toml": ("requirements", "poetry"),
+        "environment.yml": ("requirements", "conda"),
+        # TODO: Access to setup.py for Docker
+        "dockerfile": ("deployments", "docker"),
+        "docker-compose.yml": ("deployments", "docker"),
+        "docker-compose.yaml": ("deployments", "docker"),
+        "compose.yml": ("deployments", "docker"),
+        "compose.yaml": ("deployments", "docker"),
+        "deployment.yaml": ("deployments", "kubernetes"),
+        "service.yaml": ("deployments", "kubernetes"),
+        "ingress.yaml": ("deployments", "kubernetes"),
+        # TODO: Implement something to analyze PIPELINES
+        # "azure-pipelines.yml": ("deployments", "azure_pipelines"),
+        "readme.md": ("readme", None),
+    }
+
+    # License names are matched case-insensitively, test naming conventions are not.
+    # The two checks are independent, a file can be both (license_test.py)
+    LICENSE_PATTERN = re.compile(r"^(?:license|copying)", re.IGNORECASE)
+    TESTING_PATTERN = re.compile(r"^test_|_test\.py$")
+
+    def classify(self, file_paths: list) -> dict:
+        requirements = {manager: [] for manager in self.REQUIREMENT_MANAGERS}
+        deployments = {manager: [] for manager in self.DEPLOYMENT_MANAGERS}
+        license_files = []
+        readme_files = []
+        other_markdown = []
+        testing = {}
+
+        for file_path in file_paths:
+            file_name = os.path.basename(file_path)
+            file_name_lower = file_name.lower()
+
+            rule = self.BASENAME_RULES.get(file_name_lower)
+            if rule is not None:
+                category, manager = rule
+                if category == "requirements":
+                    requirements[manager].append(file_path)
+                elif category == "deployments":
+                    deployments[manager].append(file_path)
+                elif not readme_files:
+                    readme_files.append(file_path)
+            elif file_name_lower.endswith(".md"):
+                other_markdown.append(file_path)
+
+            if not license_files and self.LICENSE_PATTERN.match(file_name):
+                license_files.append(file_path)
+            if self.TESTING_PATTERN.search(file_name):
+                folder_name = os.path.dirname(file_path)
+                testing[folder_name] = testing.get(folder_name, 0) + 1
+
+        return {
+            # Filter out empty entries if there are no files of that type
+            "requirements": {m: files for m, files in requirements.items() if files},
+            "deployments": {m: files for m, files in deployments.items() if files},
+            "license": license_files,
+            "readme": readme_files,
+            "other_markdown": other_markdown,
+            "testing": testing,
+        }
+
+
 # BUG: V2: can we do with the current readme?
 # BUG: V2: Examples/Testing Module
 
@@ -31,25 +121,40 @@ class ProjectInspector:
     SYSTEM_MESSAGE_INSPECTOR = SYSTEM_MESSAGE_INSPECTOR
     REQUIREMENT_PROMPT = REQUIREMENTS_PROMPT
     DEPLOYMENT_PROMPT = DEPLOYMENT_PROMPT
+    DEPLOYMENT_FACTS_PROMPT = DEPLOYMENT_FACTS_PROMPT
     LICENSE_PROMPT = LICENSE_PROMPT
     README_PROMPT = README_PROMPT
 
-    def __init__(self, directory_path):
+    FILE_CLASSIFIER = FileClassifier()
+
+    def __init__(
+        self, directory_path, scan_index: Optional[ScanIndex] = None, llm_selection=None
+    ):
         """
         Initialize the ProjectInspector with a path to the directory to inspect.
         :param directory_path: String representing the path to the project directory.
+        :param scan_index: Shared ScanIndex of the project, built here if not provided.
+        :param llm_selection: Shared chat model, initialized here if not provided.
         """
-        self.file_paths = self._gather_file_paths(directory_path)
+        self.scan_index = scan_index or ScanIndex(directory_path)
+        self.file_paths = self.scan_index.file_paths
+        self._classification = None
         self._logger = set_logger()
-        self.llm_selection = model_initialization()
+        self.llm_selection = llm_selection or model_initialization()
 
         self.requirements_text: str = ""
         self.deployment_text: str = ""
         self.readme_text: str = ""
         self.license_text: str = ""
+        self.badges: list = []
+        self.license_id: str = ""
 
         self.max_category_tokens: int = 1500
         self.max_category_files: int = 3
+        # Files of small categories are only capped by the chain input limit
+        self.max_file_tokens: int = 10000
+        # Requirements are parsed natively; the LLM is only asked for extra prose when enabled
+        self.requirements_prose: bool = False
 
     def dict_to_markdown_text(self, data_dict, level=0):
         """
@@ -92,15 +197,9 @@ class ProjectInspector:
                 plain_text += f"{heading} {key.capitalize()}\n\n{formatted_value}\n\n"
         return plain_text
 
-    def content_truncation(self, content, encoding_name="cl100k_base"):
-        encoding = tiktoken.get_encoding(encoding_name=encoding_name)
-
-        def truncate_string(s):
-            tokens = encoding.encode(s)
-            truncated_tokens = tokens[: self.max_category_tokens]
-            return encoding.decode(truncated_tokens)
-
-        return truncate_string(content)
+    def content_truncation(self, content, kind=DEFAULT_KIND):
+        # Contents surely under the limit are kept as they are, without encoding them
+        return TOKEN_ESTIMATOR.truncate(content, self.max_category_tokens, kind)
 
     def generate_readme_with_uuid(self, save_path):
         """
@@ -169,98 +268,264 @@ class ProjectInspector:
         )
         return text_gen
 
-    def _gather_file_paths(self, directory_path):
+    def read_bounded(self, file_path: str, max_tokens: int) -> str:
         """
-        Traverse the directory to collect file paths.
-        :param directory_path: Path to the directory to traverse.
-        :return: A list of file paths found within the directory.
+        Reads only the prefix of the file that can fit in max_tokens, instead of the whole file.
         """
-        file_paths = []
-        for root, _, files in os.walk(directory_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_paths.append(file_path)
-        return file_paths
+        with open(file_path, "r", encoding="utf-8") as file:
+            return file.read(max_tokens * MAX_CHARS_PER_TOKEN)
+
+    async def process_file(
+        self, file_path: str, category: str, prompt: str, truncation: bool
+    ):
+        self._logger.info(f"File Path: {file_path}")
+        max_tokens = self.max_category_tokens if truncation else self.max_file_tokens
+        content = await asyncio.to_thread(self.read_bounded, file_path, max_tokens)
+        if truncation:
+            content = self.content_truncation(
+                content=content, kind=TOKEN_ESTIMATOR.kind_of(file_path)
+            )
+        text_gen = await self.complete_information(
+            file_info=content,
+            prompt=prompt,
+            expert_mode=f"files that come from {category}",
+        )
+
+        self._logger.info(
+            f"Information obtained succesfully for {file_path} of category {category}"
+        )
+        return {os.path.basename(file_path).lower(): text_gen}
 
     async def process_dict_of_files(self, file_dict: dict, prompt: str):
         """
         Processes a dictionary where each key is a file category and the value is a list of file paths.
+        The files of a category are processed concurrently, under the shared LLM concurrency limit.
 
         Args:
         file_dict (dict): A dictionary where the keys are categories and the values are lists of file paths.
 
         Returns:
-        None: Outputs are printed.
+        dict: The generated text of each file, grouped by category.
         """
-        truncation: bool = False
-        text_gen_dict = {}
+        categories = []
+        tasks = []
         for category, file_paths in file_dict.items():
             self._logger.info(f"Category: {category}")
+            truncation: bool = False
             if len(file_paths) >= self.max_category_files:
                 file_paths = file_paths[: self.max_category_files]
                 truncation = True
 
             for file_path in file_paths:
-                self._logger.info(f"File Path: {file_path}")
-                with open(file_path, "r", encoding="utf-8") as file:
-                    content = file.read()
-                    if truncation:
-                        content = self.content_truncation(content=content)
-                    text_gen = await self.complete_information(
-                        file_info=content,
-                        prompt=prompt,
+                categories.append(category)
+                tasks.append(self.process_file(file_path, category, prompt, truncation))
+
+        text_gen_dict = {}
+        for category, text_gen in zip(categories, await asyncio.gather(*tasks)):
+            text_gen_dict.setdefault(category, []).append(text_gen)
+
+        return text_gen_dict
+
+    async def process_requirements_files(self, file_dict: dict):
+        """
+        Parses the requirement files of each dependency manager without calling the LLM.
+        Files that cannot be parsed fall back to the REQUIREMENTS_PROMPT completion.
+
+        Args:
+        file_dict (dict): A dictionary where the keys are managers and the values are lists of file paths.
+
+        Returns:
+        dict: Same structure as process_dict_of_files, with the rendered markdown per file.
+        """
+        text_gen_dict = {}
+        fallback_files = {}
+        analyses = []
+        for category, file_paths in file_dict.items():
+            for file_path in file_paths[: self.max_category_files]:
+                try:
+                    analysis = get_requirements_analyzer(file_path).analyze()
+                except Exception as e:
+                    self._logger.warning(
+                        f"Requirements of {file_path} could not be parsed ({e}), using the LLM instead"
+                    )
+                    fallback_files.setdefault(category, []).append(file_path)
+                    continue
+
+                analyses.append(analysis)
+                text_gen = requirements_to_markdown(analysis)
+                if self.requirements_prose:
+                    text_gen += await self.complete_information(
+                        file_info=text_gen,
+                        prompt=self.REQUIREMENT_PROMPT,
                         expert_mode=f"files that come from {category}",
                     )
 
-                    if category not in text_gen_dict:
-                        text_gen_dict[
-                            category
-                        ] = []  # Ensure the entry for this category is a list
-                    text_gen_dict[category].append(
-                        {os.path.basename(file_path).lower(): text_gen}
-                    )
+                text_gen_dict.setdefault(category, []).append(
+                    {os.path.basename(file_path).lower(): text_gen}
+                )
+                self._logger.info(
+                    f"Requirements parsed succesfully for {file_path} of category {category}"
+                )
 
+        self.badges = generate_requirements_badges(analyses)
+
+        if fallback_files:
+            llm_dict = await self.process_dict_of_files(
+                fallback_files, self.REQUIREMENT_PROMPT
+            )
+            for category, texts in llm_dict.items():
+                text_gen_dict.setdefault(category, []).extend(texts)
+
+        return text_gen_dict
+
+    async def process_license_files(self, file_dict: dict):
+        """
+        Identifies the license by SPDX text fingerprinting, without calling the LLM.
+        Unknown licenses fall back to the LICENSE_PROMPT completion.
+
+        Args:
+        file_dict (dict): A dictionary where the keys are categories and the values are lists of file paths.
+
+        Returns:
+        dict: Same structure as process_dict_of_files, with the license description per file.
+        """
+        text_gen_dict = {}
+        fallback_files = {}
+        for category, file_paths in file_dict.items():
+            for file_path in file_paths[: self.max_category_files]:
+                with open(file_path, "r", encoding="utf-8", errors="ignore") as file:
+                    license_info = identify_license(file.read())
+
+                if license_info is None:
                     self._logger.info(
-                        f"Information obtained succesfully for {file_path} of category {category}"
+                        f"License of {file_path} not identified offline, using the LLM instead"
                     )
+                    fallback_files.setdefault(category, []).append(file_path)
+                    continue
+
+                self.license_id = self.license_id or license_info["spdx"]
+                text_gen_dict.setdefault(category, []).append(
+                    {
+                        os.path.basename(file_path).lower(): license_to_markdown(
+                            license_info
+                        )
+                    }
+                )
+                self._logger.info(
+                    f"License identified for {file_path}: {license_info['spdx']} (similarity {license_info['similarity']})"
+                )
+
+        if fallback_files:
+            llm_dict = await self.process_dict_of_files(
+                fallback_files, self.LICENSE_PROMPT
+            )
+            for category, texts in llm_dict.items():
+                text_gen_dict.setdefault(category, []).extend(texts)
 
         return text_gen_dict
 
-    def detect_requirements_files(self):
+    @staticmethod
+    def deployment_facts_to_text(file_name: str, analysis: dict) -> str:
         """
-        Detects requirement files in the project and categorizes them by their dependency manager.
-        :return: A dictionary where keys are types of dependency managers and values are lists of file paths.
+        Renders the structured output of a deployment analyzer as short indented lines,
+        leaving out the raw RUN/FROM instructions and the empty values.
         """
-        requirement_files = {
-            "requirements": [],  # For requirements.txt
-            "pipenv": [],  # For Pipfile
-            "poetry": [],  # For pyproject.toml managed by poetry
-            "conda": [],  # For conda environment files, e.g., environment.yml
-        }
+        text = f"{file_name}:\n"
+        if "services" in analysis:
+            for service, details in analysis["services"].items():
+                text += f"  service {service}:\n"
+                for key, value in details.items():
+                    if value:
+                        text += f"    {key}: {value}\n"
+        elif "resources" in analysis:
+            for resource in analysis["resources"]:
+                text += f"  {resource['kind']} {resource['name']}:\n"
+                for key in ["replicas", "images", "ports", "service_type"]:
+                    if resource[key]:
+                        text += f"    {key}: {resource[key]}\n"
+        else:
+            for key, value in analysis.items():
+                if key in ("FROM", "RUN"):
+                    continue
+                if value:
+                    text += f"  {key}: {', '.join(value)}\n"
+            text += f"  build steps: {len(analysis['RUN'])}\n"
+        return text
+
+    async def process_deployment_files(self, file_dict: dict):
+        """
+        Extracts base images, ports, entrypoints, compose services and Kubernetes resources
+        statically and sends a single DEPLOYMENT_FACTS_PROMPT per category with them,
+        instead of one full-file prompt per deployment file.
 
-        # Map file identifiers to the correct category in requirement_files
-        file_to_manager = {
-            "requirements.txt": "requirements",
-            "Pipfile": "pipenv",
-            "pyproject.toml": "poetry",  # Assuming poetry uses pyproject.toml
-            "environment.yml": "conda",  # Assuming conda uses environment.yml
-        }
+        Args:
+        file_dict (dict): A dictionary where the keys are categories and the values are lists of file paths.
 
-        for file_path in self.file_paths:
-            file_name = os.path.basename(
-                file_path
-            ).lower()  # Get the basename of the file and make it case-insensitive
+        Returns:
+        dict: Same structure as process_dict_of_files, with one entry per category.
+        """
+        text_gen_dict = {}
+        fallback_files = {}
+        categories = []
+        tasks = []
+        for category, file_paths in file_dict.items():
+            facts = []
+            file_names = []
+            for file_path in file_paths:
+                try:
+                    analysis = get_deployment_analyzer(file_path).analyze()
+                except Exception as e:
+                    self._logger.warning(
+                        f"Deployment file {file_path} could not be parsed ({e}), using the LLM instead"
+                    )
+                    fallback_files.setdefault(category, []).append(file_path)
+                    continue
+                file_name = os.path.basename(file_path).lower()
+                file_names.append(file_name)
+                facts.append(self.deployment_facts_to_text(file_name, analysis))
+
+            if not facts:
+                continue
+
+            self._logger.info(f"Deployment facts extracted for category {category}")
+            categories.append((category, ", ".join(file_names)))
+            tasks.append(
+                self.complete_information(
+                    file_info="\n".join(facts),
+                    prompt=self.DEPLOYMENT_FACTS_PROMPT,
+                    expert_mode=f"files that come from {category}",
+                )
+            )
+
+        for (category, file_names), text_gen in zip(
+            categories, await asyncio.gather(*tasks)
+        ):
+            text_gen_dict[category] = [{file_names: text_gen}]
+
+        if fallback_files:
+            llm_dict = await self.process_dict_of_files(
+                fallback_files, self.DEPLOYMENT_PROMPT
+            )
+            for category, texts in llm_dict.items():
+                text_gen_dict.setdefault(category, []).extend(texts)
 
-            for identifier, manager in file_to_manager.items():
-                if file_name == identifier.lower():  # Match files case-insensitively
-                    requirement_files[manager].append(file_path)
-                    break  # Stop checking once the file is identified and added
+        return text_gen_dict
 
-        # Filter out empty entries if there are no files of that type
-        self.requirements = {
-            manager: files for manager, files in requirement_files.items() if files
-        }
+    def classify_files(self):
+        """
+        Classifies every file of the scan index in a single pass, caching the result.
+        :return: The FileClassifier output with all the categories.
+        """
+        if self._classification is None:
+            self._classification = self.FILE_CLASSIFIER.classify(self.file_paths)
+        return self._classification
 
+    def detect_requirements_files(self):
+        """
+        Detects requirement files in the project and categorizes them by their dependency manager.
+        :return: A dictionary where keys are types of dependency managers and values are lists of file paths.
+        """
+        self.requirements = self.classify_files()["requirements"]
         return self.requirements
 
     def detect_deployment_files(self):
@@ -268,39 +533,7 @@ class ProjectInspector:
         Detects deployment-related files in the project and categorizes them by their deployment technology.
         :return: A dictionary where keys are types of deployment technologies and values are lists of file paths.
         """
-        self.deployments = {
-            "docker": [],  # For Dockerfiles and docker-compose files
-            "kubernetes": [],  # For Kubernetes config files
-            "azure_pipelines": [],  # For Azure Pipelines CICD
-        }
-
-        # Map file identifiers to the correct category in self.deployments
-        # TODO: Access to setup.py for Docker
-        file_to_manager = {
-            "Dockerfile": "docker",
-            "docker-compose.yml": "docker",
-            "Deployment.yaml": "kubernetes",
-            "Service.yaml": "kubernetes",
-            "Ingress.yaml": "kubernetes",
-            # TODO: Implement something to analyze PIPELINES
-            # "azure-pipelines.yml": "azure_pipelines",
-        }
-
-        for file_path in self.file_paths:
-            file_name = os.path.basename(
-                file_path
-            ).lower()  # Get the basename of the file and make it case-insensitive
-
-            # Check for specific docker files
-            for identifier, manager in file_to_manager.items():
-                if file_name == identifier.lower():
-                    self.deployments[manager].append(file_path)
-
-        # Filter out empty entries if there are no files of that type
-        self.deployments = {
-            manager: files for manager, files in self.deployments.items() if files
-        }
-
+        self.deployments = self.classify_files()["deployments"]
         return self.deployments
 
     def detect_license_file(self):
@@ -308,17 +541,7 @@ class ProjectInspector:
         Detects the license file in the project based on common naming conventions.
         :return: Dict with Path to the license file if found, otherwise EmptyDict.
         """
-
-        self.license_file = {"project_license": []}
-        license_patterns = ["license", "license.md", "license.txt", "copying"]
-        for file_path in self.file_paths:
-            file_name = os.path.basename(
-                file_path
-            ).lower()  # Extract filename and convert to lowercase
-            if any(file_name.startswith(pattern) for pattern in license_patterns):
-                self.license_file["project_license"].append(file_path)
-                return self.license_file
-
+        self.license_file = {"project_license": self.classify_files()["license"]}
         return self.license_file
 
     def detect_readme_file(self):
@@ -326,14 +549,7 @@ class ProjectInspector:
         Detects the README.md file in the main project folder.
         :return: Dict with Path to the README.md file if found, otherwise EmptyDict.
         """
-        self.readme_file = {"main_readme": []}
-        for file_path in self.file_paths:
-            file_name = os.path.basename(
-                file_path
-            ).lower()  # Extract filename and convert to lowercase
-            if file_name == "readme.md":
-                self.readme_file["main_readme"].append(file_path)
-                return self.readme_file
+        self.readme_file = {"main_readme": self.classify_files()["readme"]}
         return self.readme_file
 
     def detect_other_markdown_files(self):
@@ -341,13 +557,9 @@ class ProjectInspector:
         Detects other markdown files (*.md) in the project, allowing for a recursive search.
         :return: A list of paths to detected markdown files other than README.md.
         """
-        self.readme_files = {"other_readme_files": []}
-        for file_path in self.file_paths:
-            file_name = os.path.basename(
-                file_path
-            ).lower()  # Extract filename and convert to lowercase
-            if file_name.endswith(".md") and file_name != "readme.md":
-                self.readme_files["other_readme_files"].append(file_path)
+        self.readme_files = {
+            "other_readme_files": self.classify_files()["other_markdown"]
+        }
         return self.readme_files
 
     def detect_testing_files(self):
@@ -355,39 +567,31 @@ class ProjectInspector:
         Detects Python test files in the project based on common naming conventions, and groups them by folder.
         :return: A dictionary where keys are folder names and values are counts of testing files within those folders.
         """
-        test_file_counts = {}
-        for file_path in self.file_paths:
-            file_name = os.path.basename(file_path)  # Extract just the file name
-            # Check if the file name follows common Python test file patterns
-            if file_name.startswith("test_") or file_name.endswith("_test.py"):
-                folder_name = os.path.dirname(file_path)  # Extract the folder path
-                if folder_name in test_file_counts:
-                    test_file_counts[folder_name] += 1
-                else:
-                    test_file_counts[folder_name] = 1
-
-        return test_file_counts
+        return self.classify_files()["testing"]
 
     async def detection_phase(self):
-        requirement_files = await asyncio.to_thread(self.detect_requirements_files)
+        # One pass over the scan index fills every category
+        await asyncio.to_thread(self.classify_files)
+
+        requirement_files = self.detect_requirements_files()
         self._logger.info(f"Requirement Files: {requirement_files}")
 
-        deployment_files = await asyncio.to_thread(self.detect_deployment_files)
+        deployment_files = self.detect_deployment_files()
         self._logger.info(f"Deployment Files: {deployment_files}")
 
-        license_files = await asyncio.to_thread(self.detect_license_file)
+        license_files = self.detect_license_file()
         self._logger.info(f"License Files: {license_files}")
 
-        readme_file = await asyncio.to_thread(self.detect_readme_file)
+        readme_file = self.detect_readme_file()
         self._logger.info(f"Main readme file: {readme_file}")
 
     async def workflow_generation_phase(self):
         # Launch asynchronous tasks to process each category of files simultaneously.
         self.readme_text = ""
         tasks = [
-            self.process_dict_of_files(self.requirements, self.REQUIREMENT_PROMPT),
-            self.process_dict_of_files(self.deployments, self.DEPLOYMENT_PROMPT),
-            self.process_dict_of_files(self.license_file, self.LICENSE_PROMPT),
+            self.process_requirements_files(self.requirements),
+            self.process_deployment_files(self.deployments),
+            self.process_license_files(self.license_file),
             # self.process_dict_of_files(self.readme_file, self.README_PROMPT) if self.readme_file else asyncio.sleep(0)
         ]
         results = await asyncio.gather(*tasks)
@@ -410,4 +614,6 @@ class ProjectInspector:
             "deployment": self.dict_to_markdown_text(self.deployment_text),
             "readme": self.dict_to_markdown_text(self.readme_text),
             "license": self.dict_to_markdown_text(self.license_text),
+            "badges": self.badges,
+            "license_id": self.license_id,
         }
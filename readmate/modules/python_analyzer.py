@@ -1,5 +1,9 @@
 import ast
+import copy
+import hashlib
+import threading
 import tiktoken
+from collections import OrderedDict
 from readmate.utils.logger import set_logger
 from readmate.utils.general_utils import num_tokens_from_string
 
@@ -14,16 +18,18 @@ _logger = set_logger()
 
 
 class PythonFileAnalyzer(ast.NodeVisitor):
-    def __init__(self, file_path):
+    def __init__(self, file_path, content=None):
         self.file_path = file_path
-        with open(file_path, "r", encoding="utf-8-sig") as file:
-            self.content = file.read()
-            try:
-                self.node = ast.parse(self.content, file_path)
-            except SyntaxError as e:
-                _logger.error(f"Syntax error while parsing {file_path}: {e}")
-                # BUG: Change it to run the normal mode ( general file analyzer)
-                self.node = ast.Module(body=[], type_ignores=[])
+        if content is None:
+            with open(file_path, "r", encoding="utf-8-sig") as file:
+                content = file.read()
+        self.content = content
+        try:
+            self.node = ast.parse(self.content, file_path)
+        except SyntaxError as e:
+            _logger.error(f"Syntax error while parsing {file_path}: {e}")
+            # BUG: Change it to run the normal mode ( general file analyzer)
+            self.node = ast.Module(body=[], type_ignores=[])
         self.analysis = {
             "imports": [],
             "functions": {},
@@ -131,3 +137,47 @@ class PythonFileAnalyzer(ast.NodeVisitor):
         self.analysis["total_funcs_token_count"] = sum(
             info["token_count"] for info in self.analysis["functions"].values()
         )
+
+
+class AnalysisCache:
+    """
+    Analyses of Python files by content hash, so a file shared by several projects or
+    copied across folders (vendored code, templates, generated files) is parsed once.
+    Least recently used entries are dropped beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # ANALYSIS_CACHE is shared by every project of the process (batch runner, job
+        # manager) and may be called from threads other than the event loop's, such as
+        # asyncio.to_thread callers and agents run synchronously from their own thread
+        self._lock = threading.Lock()
+
+    def analyze(self, file_path: str) -> dict:
+        with open(file_path, "r", encoding="utf-8-sig") as file:
+            content = file.read()
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            analysis = self.entries.get(digest)
+            if analysis is not None:
+                self.entries.move_to_end(digest)
+                self.hits += 1
+        if analysis is None:
+            analysis = PythonFileAnalyzer(file_path, content).analyze()
+            with self._lock:
+                self.misses += 1
+                self.entries[digest] = analysis
+                if len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        # Callers extend the analysis they get back, the cached one stays untouched
+        return copy.deepcopy(analysis)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+
+ANALYSIS_CACHE = AnalysisCache()
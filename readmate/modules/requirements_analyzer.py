@@ -0,0 +1,271 @@
+import os
+import re
+import zlib
+import toml
+import yaml
+
+from readmate.modules.general_file_analyzer import FileAnalyzer
+
+# PEP 508 name, optional extras and the version specifier that follows it
+REQUIREMENT_LINE = re.compile(
+    r"^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*(?P<version>[^;#]*)"
+)
+CONDA_SPEC = re.compile(r"^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*(?P<version>.*)$")
+
+BADGE_COLORS = [
+    "green",
+    "brightgreen",
+    "yellow",
+    "orange",
+    "red",
+    "purple",
+    "pink",
+    "brown",
+    "darkgreen",
+    "blueviolet",
+]
+
+INSTALL_COMMANDS = {
+    "requirements": "pip install -r requirements.txt",
+    "pipenv": "pipenv install",
+    "poetry": "poetry install",
+    "pip": "pip install .",
+    "conda": "conda env create -f environment.yml",
+}
+
+
+def _dependency(name, version):
+    version = version.strip() if isinstance(version, str) else ""
+    return {"name": name.strip(), "version": "" if version == "*" else version}
+
+
+class RequirementsFileAnalyzer(FileAnalyzer):
+    """Base class for the dependency manifests parsed without the LLM."""
+
+    manager = ""
+
+    def analyze(self):
+        return {
+            "manager": self.manager,
+            "python_version": self.python_version(),
+            "dependencies": self.dependencies(),
+        }
+
+    def python_version(self):
+        return ""
+
+    def dependencies(self):
+        raise NotImplementedError("Subclass must implement abstract method")
+
+
+class RequirementsTxtAnalyzer(RequirementsFileAnalyzer):
+    manager = "requirements"
+
+    def dependencies(self):
+        dependencies = []
+        for line in self.content.splitlines():
+            line = line.strip()
+            # Skip comments, pip options (-r, -e, --index-url...) and direct URLs
+            if not line or line.startswith(("#", "-")) or "://" in line:
+                continue
+            match = REQUIREMENT_LINE.match(line)
+            if match:
+                dependencies.append(
+                    _dependency(match.group("name"), match.group("version"))
+                )
+        return dependencies
+
+
+class PipfileAnalyzer(RequirementsFileAnalyzer):
+    manager = "pipenv"
+
+    def read_file(self):
+        # Overriding to parse TOML directly
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            return toml.load(file)
+
+    def python_version(self):
+        requires = self.content.get("requires", {})
+        return requires.get("python_version") or requires.get("python_full_version", "")
+
+    def dependencies(self):
+        return [
+            _dependency(name, spec if isinstance(spec, str) else spec.get("version"))
+            for name, spec in self.content.get("packages", {}).items()
+        ]
+
+
+class PyprojectAnalyzer(RequirementsFileAnalyzer):
+    def read_file(self):
+        # Overriding to parse TOML directly
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            return toml.load(file)
+
+    @property
+    def manager(self):
+        # PEP 621 projects without a [tool.poetry] table are installed with pip
+        return "poetry" if "poetry" in self.content.get("tool", {}) else "pip"
+
+    def python_version(self):
+        poetry_deps = (
+            self.content.get("tool", {}).get("poetry", {}).get("dependencies", {})
+        )
+        if "python" in poetry_deps:
+            return poetry_deps["python"]
+        return self.content.get("project", {}).get("requires-python", "")
+
+    def dependencies(self):
+        poetry_deps = (
+            self.content.get("tool", {}).get("poetry", {}).get("dependencies", {})
+        )
+        dependencies = [
+            _dependency(name, spec if isinstance(spec, str) else spec.get("version"))
+            for name, spec in poetry_deps.items()
+            if name.lower() != "python"
+        ]
+
+        # PEP 621 projects list their dependencies as PEP 508 strings
+        for requirement in self.content.get("project", {}).get("dependencies", []):
+            match = REQUIREMENT_LINE.match(requirement)
+            if match:
+                dependencies.append(
+                    _dependency(match.group("name"), match.group("version"))
+                )
+        return dependencies
+
+
+class CondaEnvironmentAnalyzer(RequirementsFileAnalyzer):
+    manager = "conda"
+
+    def read_file(self):
+        # Overriding to parse YAML directly
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            return yaml.safe_load(file) or {}
+
+    def _specs(self):
+        for spec in self.content.get("dependencies", []) or []:
+            if isinstance(spec, dict):
+                # Nested pip section: {"pip": ["package==1.0", ...]}
+                for pip_spec in spec.get("pip", []) or []:
+                    match = REQUIREMENT_LINE.match(pip_spec)
+                    if match:
+                        yield match.group("name"), match.group("version")
+            else:
+                match = CONDA_SPEC.match(str(spec))
+                if match:
+                    yield match.group("name"), match.group("version")
+
+    def python_version(self):
+        for name, version in self._specs():
+            if name.lower() == "python":
+                return version.lstrip("=")
+        return ""
+
+    def dependencies(self):
+        return [
+            _dependency(name, version.lstrip("="))
+            for name, version in self._specs()
+            if name.lower() != "python"
+        ]
+
+
+def get_requirements_analyzer(file_path):
+    filename_to_analyzer = {
+        "requirements.txt": RequirementsTxtAnalyzer,
+        "pipfile": PipfileAnalyzer,
+        "pyproject.toml": PyprojectAnalyzer,
+        "environment.yml": CondaEnvironmentAnalyzer,
+        "environment.yaml": CondaEnvironmentAnalyzer,
+    }
+    analyzer_class = filename_to_analyzer.get(os.path.basename(file_path).lower())
+    if analyzer_class:
+        return analyzer_class(file_path)
+    else:
+        raise ValueError(f"No requirements analyzer found for the file: {file_path}")
+
+
+def clean_version(version: str) -> str:
+    """
+    Turns a version specifier into the short form shown in badges and docs.
+    `^3.9`, `~=3.9` and `>=3.9` become `3.9+`, `==0.1.11` becomes `0.1.11`.
+    Ranges keep only their lower bound.
+    """
+    version = version.split(",")[0].strip()
+    match = re.match(r"^(\^|~=|>=|>|~|==|=)?\s*([0-9][0-9A-Za-z.*]*)", version)
+    if not match:
+        return ""
+    operator, number = match.groups()
+    number = number.rstrip(".*")
+    if operator in ("^", "~=", ">=", ">") and number:
+        return f"{number}+"
+    return number
+
+
+def _shields_escape(text: str) -> str:
+    # shields.io uses "-" as separator, so literal dashes and underscores are doubled
+    return (
+        text.replace("-", "--")
+        .replace("_", "__")
+        .replace(" ", "%20")
+        .replace("+", "%2B")
+    )
+
+
+def generate_badge(label: str, version: str, color: str) -> str:
+    if version:
+        path = f"{_shields_escape(label)}-{_shields_escape(version)}-{color}"
+    else:
+        path = f"{_shields_escape(label)}-{color}"
+    return f"![{label}](https://img.shields.io/badge/{path}.svg)"
+
+
+def generate_requirements_badges(analyses: list) -> list:
+    """
+    Builds the badge list for a set of parsed requirement files.
+    The Python badge goes first, then one badge per dependency, deduplicated by name.
+    Colors are picked from a stable hash of the name, so the output is reproducible.
+    """
+    badges = []
+    seen = set()
+
+    python_versions = [a["python_version"] for a in analyses if a["python_version"]]
+    if python_versions:
+        badges.append(
+            generate_badge("Python", clean_version(python_versions[0]), "blue")
+        )
+        seen.add("python")
+
+    for analysis in analyses:
+        for dependency in analysis["dependencies"]:
+            name = dependency["name"]
+            if name.lower() in seen:
+                continue
+            seen.add(name.lower())
+            color = BADGE_COLORS[zlib.crc32(name.lower().encode()) % len(BADGE_COLORS)]
+            badges.append(
+                generate_badge(name, clean_version(dependency["version"]), color)
+            )
+    return badges
+
+
+def requirements_to_markdown(analysis: dict) -> str:
+    """
+    Renders a parsed requirement file as the markdown used in the requirements section.
+    """
+    text = ""
+    if analysis["python_version"]:
+        text += f"**Python Version**: {clean_version(analysis['python_version']) or analysis['python_version']}\n\n"
+
+    if analysis["dependencies"]:
+        text += "**Libraries and Dependencies**:\n\n"
+        for dependency in analysis["dependencies"]:
+            version = (
+                f" (version {dependency['version']})" if dependency["version"] else ""
+            )
+            text += f"- {dependency['name']}{version}\n"
+        text += "\n"
+
+    install_command = INSTALL_COMMANDS.get(analysis["manager"])
+    if install_command:
+        text += f"Install the dependencies with:\n\n```\n{install_command}\n```\n"
+    return text
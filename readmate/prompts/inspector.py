@@ -26,6 +26,16 @@ For this input file: {file_info}:
 - If the file is Docker-related (e.g., `Dockerfile`, `.dockerignore`): Provide step-by-step instructions on how to build and run a Docker container using this file.
 - If the file is Kubernetes configuration files (e.g., `deployment.yaml`, `service.yaml`): Describe the steps to deploy the project in a cluster using this file.
 
+"""
+DEPLOYMENT_FACTS_PROMPT = """
+
+For these facts extracted from the deployment files of the project: {file_info}:
+
+### Instructions Based on the extracted facts
+
+- For Docker files (e.g., `Dockerfile`, `docker-compose.yml`): Provide step-by-step instructions on how to build and run the containers, using the base images, exposed ports, entrypoints and compose services listed.
+- For Kubernetes resources (e.g., `Deployment`, `Service`, `Ingress`): Describe the steps to deploy the project in a cluster, using the resource kinds, images, replicas and ports listed.
+
 """
 # - **Azure DevOps pipeline files (e.g., `azure-pipelines.yml`)**:
 #   Outline the critical components of the pipeline configuration, focusing on triggers, branch specifications, and environment settings, without going into detailed steps.
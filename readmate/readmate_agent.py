@@ -1,8 +1,9 @@
 import os
 import sys
-import json
+import time
 import shutil
 import asyncio
+from typing import Callable, Optional
 
 
 from readmate.toolkit import (
@@ -11,8 +12,25 @@ from readmate.toolkit import (
     low_level_analysis,
 )
 
+from readmate.chains.chat_message_chain import unanswered_calls
 from readmate.utils.logger import set_logger
-from readmate.utils.utils_tools import load_json_from_path
+from readmate.utils.utils_tools import (
+    iter_folders,
+    load_pipeline_config,
+    model_initialization,
+)
+from readmate.utils.scan_index import ScanIndex
+from readmate.utils.token_callback_tracker import TokenUsageTracker
+from readmate.utils.run_journal import RunJournal
+from readmate.utils.run_budget import RunBudget
+from readmate.utils.run_history import RunHistory, RunStats
+from readmate.utils.artifact_store import find_artifact, load_artifact, write_artifact
+from readmate.utils.analysis_store import (
+    ROOT_FILES,
+    ROOT_FILES_LOW_LEVEL,
+    AnalysisStore,
+)
+from readmate.modules.python_analyzer import ANALYSIS_CACHE
 
 from readmate.generators.markdown import ReadmeGenerator
 
@@ -22,9 +40,6 @@ if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
-# TODO: V2: CALLBACK Track the states of the process and stream to frontend
-
-
 def find_main_folder(extraction_path):
     """
     Find the main folder in the given extraction path. Assumes the main folder is the one
@@ -78,15 +93,46 @@ class ReadMateAgent:
     INFO_FILES_JSON = "info_files.json"
     INFO_FILES_EXTENDED_JSON = "info_files_extended.json"
     INFO_MODULES_EXTENDED_JSON = "info_modules_extended.json"
+    README_SECTIONS_JSON = "readme_sections.json"
+    ANALYSIS_DB = "analysis.db"
+    ARTIFACTS_JSON = "artifacts.json"
     README = "readme.md"
-
-    def __init__(self, input_path: str, workspace_path: str, output_path: str):
+    # Stages reading the results of another one, recorded only once that one is
+    STAGE_SOURCES = {
+        "root_files_low_level": "root_files",
+        "modules_low_level": "modules",
+    }
+
+    def __init__(
+        self,
+        input_path: str,
+        workspace_path: str,
+        output_path: str,
+        llm_selection=None,
+        journal: Optional[RunJournal] = None,
+        progress_callback: Optional[Callable[[dict], None]] = None,
+        budget: Optional[RunBudget] = None,
+        history_path: Optional[str] = None,
+        artifact_format: Optional[str] = None,
+        section_cache_path: Optional[str] = None,
+    ):
         """_summary_
 
         Args:
             input_path (str): _description_
             workspace_path (str): _description_
             output_path (str): _description_
+            llm_selection (optional): Chat model shared by every stage, initialized on first use if not provided.
+            journal (optional): RunJournal of the workspace. Work it records as completed is skipped.
+            progress_callback (optional): Called with a {"stage", "status", ...} event when a stage
+                starts, completes or is skipped, and when a folder of the module analysis is done.
+            budget (optional): Token, cost and time limits of the run, pipeline.toml [budget] if not provided.
+            history_path (optional): SQLite run history the measurements of the run are appended to.
+            artifact_format (optional): "json" or "jsonl" for the info_* files exported from the
+                analysis store, pipeline.toml [artifacts] format if not provided.
+            section_cache_path (optional): README sections of the previous runs of the project,
+                reused when their inputs did not change. The workspace readme_sections.json if
+                not provided, so only resumed and readme-only runs reuse them.
         """
         self.workspace_path = workspace_path
         self.output_path = output_path
@@ -95,47 +141,111 @@ class ReadMateAgent:
         self.project_name = os.path.basename(os.path.normpath(self.input_path))
 
         # Construct full paths with class-level filenames
-        self.info_modules = os.path.join(self.workspace_path, self.INFO_MODULES_JSON)
-        self.info_files = os.path.join(self.workspace_path, self.INFO_FILES_JSON)
-        self.info_files_extended = os.path.join(
-            self.workspace_path, self.INFO_FILES_EXTENDED_JSON
-        )
-        self.info_modules_extended = os.path.join(
-            self.workspace_path, self.INFO_MODULES_EXTENDED_JSON
+        self.analysis_db = os.path.join(self.workspace_path, self.ANALYSIS_DB)
+        self.artifact_format = (
+            artifact_format or load_pipeline_config()["artifacts"]["format"]
         )
+        self._store = None
 
         self.readme_md = os.path.join(self.output_path, self.README)
+        self.readme_sections = section_cache_path or os.path.join(
+            self.workspace_path, self.README_SECTIONS_JSON
+        )
+
+        self._scan_index = None
+        self._llm_selection = llm_selection
+        self.journal = journal or RunJournal(self.workspace_path)
+        self.progress_callback = progress_callback
+        self.budget = budget or RunBudget.from_config()
+        self.history_path = history_path
+        self.stats = RunStats()
+        self._stage_estimates = None
+
+    @property
+    def store(self) -> AnalysisStore:
+        """Analysis store of the workspace, the stages exchange their results through it."""
+        if self._store is None:
+            self._store = AnalysisStore(self.analysis_db)
+        return self._store
+
+    def export_artifacts(self, folder: Optional[str] = None) -> list:
+        """Exports the analyses as info_* files, in the workspace by default."""
+        return self.store.export(folder or self.workspace_path, self.artifact_format)
+
+    @property
+    def stage_estimates(self) -> dict:
+        """
+        Average duration of the stages in the run history, for this project if it was
+        documented before, for every project otherwise.
+        """
+        if self._stage_estimates is None:
+            self._stage_estimates = {}
+            if self.history_path and os.path.isfile(self.history_path):
+                try:
+                    history = RunHistory(self.history_path)
+                    try:
+                        self._stage_estimates = (
+                            history.stage_averages(self.project_name)
+                            or history.stage_averages()
+                        )
+                    finally:
+                        history.close()
+                except Exception as e:
+                    _logger.warning(f"Run history {self.history_path} unreadable: {e}")
+        return self._stage_estimates
+
+    @property
+    def scan_index(self):
+        """Single walk of the input project shared by the stages that need its files."""
+        if self._scan_index is None:
+            self._scan_index = ScanIndex(self.input_path)
+        return self._scan_index
+
+    @property
+    def llm_selection(self):
+        """Chat model client shared by every stage instead of one per stage or folder."""
+        if self._llm_selection is None:
+            self._llm_selection = model_initialization()
+        return self._llm_selection
 
     # TESTING FUNCTION TO AVOID RUNNING THE FULL LOOP
     def copy_info_files_to_new_workspace(self, test_folder: str):
         """
-        Copies the info files from the main workspace folder to the new workspace folder.
+        Copies the analysis store from the main workspace folder to the new workspace
+        folder, or fills it from the info files of a former run, in either format.
         """
-
-        # List of files to be copied
-        info_files_to_copy = [
-            self.INFO_MODULES_JSON,
-            self.INFO_FILES_JSON,
-            self.INFO_FILES_EXTENDED_JSON,
-            self.INFO_MODULES_EXTENDED_JSON,
-        ]
-
-        # Copy each file
-        for info_file in info_files_to_copy:
-            src_file_path = os.path.join(test_folder, info_file)
-            dst_file_path = os.path.join(self.workspace_path, info_file)
-            if os.path.exists(src_file_path):
-                shutil.copy(src_file_path, dst_file_path)
-                _logger.info(f"Copied {info_file} to {self.workspace_path}")
-            else:
-                _logger.warning(
-                    f"File {info_file} does not exist in the main workspace folder."
-                )
-
-    def _write_json_doc(self, output_path: str, data: dict):
-        with open(output_path, "w") as json_file:
-            json.dump(data, json_file, indent=4, sort_keys=True)
-        _logger.info("Modules files & folders processed into: {}".format(output_path))
+        src_file_path = os.path.join(test_folder, self.ANALYSIS_DB)
+        if os.path.isfile(src_file_path):
+            if self._store is not None:
+                self._store.close()
+                self._store = None
+            shutil.copy(src_file_path, self.analysis_db)
+            _logger.info(f"Copied {self.ANALYSIS_DB} to {self.workspace_path}")
+        else:
+            # List of files to be imported
+            info_files_to_copy = [
+                self.INFO_MODULES_JSON,
+                self.INFO_FILES_JSON,
+                self.INFO_FILES_EXTENDED_JSON,
+                self.INFO_MODULES_EXTENDED_JSON,
+            ]
+
+            artifacts = {}
+            for info_file in info_files_to_copy:
+                src_file_path = find_artifact(test_folder, info_file)
+                if src_file_path:
+                    artifacts[info_file] = load_artifact(src_file_path)
+                    _logger.info(f"Imported {info_file} into {self.analysis_db}")
+                else:
+                    _logger.warning(
+                        f"File {info_file} does not exist in the main workspace folder."
+                    )
+            self.store.import_artifacts(artifacts)
+
+        # Sections of the previous run, only the changed ones are prompted again
+        src_file_path = os.path.join(test_folder, self.README_SECTIONS_JSON)
+        if os.path.exists(src_file_path):
+            shutil.copy(src_file_path, self.readme_sections)
 
     def _write_md_doc(self, output_path: str, data: str):
         with open(output_path, "w", encoding="utf-8") as file:
@@ -143,115 +253,372 @@ class ReadMateAgent:
 
         _logger.info("Readme saved to {}".format(output_path))
 
-    def top_level_analysis_modules(self):
+    def _run(self, coroutine):
+        """Runs a stage in its own event loop, within the budget of the run."""
+        with self.budget.activate(), self.stats.activate():
+            return asyncio.run(coroutine)
+
+    def _report_progress(self, stage: str, status: str, **details):
+        """Sends a progress event to the progress callback, if any."""
+        self.stats.stage_event(stage, status)
+        if self.progress_callback is None:
+            return
+        if status == "started" and stage in self.stage_estimates:
+            details.setdefault("expected_seconds", self.stage_estimates[stage])
+        try:
+            self.progress_callback({"stage": stage, "status": status, **details})
+        except Exception as e:
+            # Progress reporting must never stop the pipeline
+            _logger.warning(f"Progress callback failed for stage '{stage}': {e}")
+
+    def _stage_completed(self, stage: str) -> bool:
+        """True when a resumed run already completed the stage and stored its outputs."""
+        if self.journal.done("stages", stage) and self.store.stage_done(stage):
+            _logger.info(f"Stage '{stage}' completed in a previous run, skipping it")
+            self._report_progress(stage, "skipped")
+            return True
+        self._report_progress(stage, "started")
+        return False
+
+    def _record_stage(
+        self,
+        stage: str,
+        unanswered: Optional[list] = None,
+        failed_units: Optional[list] = None,
+    ):
+        """
+        Records a completed stage, unless some of its units failed, some of its model
+        calls got the default response or the stage it builds on is not recorded: a
+        resumed run then runs it again, for the units it did not journal.
+        """
+        source = self.STAGE_SOURCES.get(stage)
+        if failed_units:
+            reason = f"failed for {len(failed_units)} units"
+        elif unanswered:
+            reason = f"got the default response for {len(unanswered)} model calls"
+        elif source and not self.journal.done("stages", source):
+            reason = f"builds on the incomplete stage '{source}'"
+        else:
+            reason = None
+        if reason:
+            _logger.warning(
+                f"Stage '{stage}' {reason}, a resumed run will run it again"
+            )
+            self._report_progress(stage, "completed", unanswered=len(unanswered or []))
+            return
+        self.store.record_stage(stage)
+        self.journal.record("stages", stage)
+        self._report_progress(stage, "completed")
+
+    async def atop_level_analysis_modules(self):
+        if self._stage_completed("modules"):
+            return
         _logger.info("Top-Level analysis for modules started")
-        result_recursive_folder_search = search_engines.recursive_directory_search(
-            directory=self.input_path
+        result_recursive_folder_search = await asyncio.to_thread(
+            search_engines.recursive_directory_search, directory=self.input_path
         )
-        info_modules = asyncio.run(
-            top_level_analysis.generate_module_descriptions_and_ratings(
-                result_recursive_folder_search
+        with unanswered_calls() as unanswered:
+            info_modules = (
+                await top_level_analysis.generate_module_descriptions_and_ratings(
+                    result_recursive_folder_search,
+                    llm_selection=self.llm_selection,
+                    journal=self.journal,
+                )
             )
-        )
-        self._write_json_doc(output_path=self.info_modules, data=info_modules)
+        self.store.put_module_tree(info_modules)
+        self._record_stage("modules", unanswered)
 
-    def main_folder_file_analysis(self):
+    def top_level_analysis_modules(self):
+        self._run(self.atop_level_analysis_modules())
+
+    async def amain_folder_file_analysis(self):
+        if self._stage_completed("root_files"):
+            return
         _logger.info("Main folder search for files started")
-        result_outside_folder_search = search_engines.list_files_outside_folders(
-            directory=self.input_path
+        result_outside_folder_search = await asyncio.to_thread(
+            search_engines.list_files_outside_folders, directory=self.input_path
         )
 
-        info_off_modules = asyncio.run(
-            top_level_analysis.generate_file_descriptions_and_ratings(
-                result_outside_folder_search
+        with unanswered_calls() as unanswered:
+            info_off_modules = (
+                await top_level_analysis.generate_file_descriptions_and_ratings(
+                    result_outside_folder_search,
+                    llm_selection=self.llm_selection,
+                    journal=self.journal,
+                )
             )
-        )
-        self._write_json_doc(output_path=self.info_files, data=info_off_modules)
+        self.store.put_root_files(info_off_modules, ROOT_FILES)
+        self._record_stage("root_files", unanswered)
 
-    def low_level_analysis_files(self):
+    def main_folder_file_analysis(self):
+        self._run(self.amain_folder_file_analysis())
+
+    async def alow_level_analysis_files(self):
+        if self._stage_completed("root_files_low_level"):
+            return
         _logger.info("Low-level analysis for files started")
 
-        info_off_modules = asyncio.run(
-            low_level_analysis.analyze_internal_files(self.info_files, self.input_path)
-        )
-        self._write_json_doc(
-            output_path=self.info_files_extended, data=info_off_modules
-        )
+        with unanswered_calls() as unanswered:
+            info_off_modules = await low_level_analysis.analyze_internal_files(
+                self.store.root_files(ROOT_FILES),
+                self.input_path,
+                llm_selection=self.llm_selection,
+                journal=self.journal,
+            )
+        self.store.put_root_files(info_off_modules, ROOT_FILES_LOW_LEVEL)
+        self._record_stage("root_files_low_level", unanswered)
 
-    def low_level_analysis_modules(self):
+    def low_level_analysis_files(self):
+        self._run(self.alow_level_analysis_files())
+
+    async def alow_level_analysis_modules(self):
+        if self._stage_completed("modules_low_level"):
+            return
         _logger.info("Low-level analysis for modules started")
-        info_modules_dict = load_json_from_path(file_path=self.info_modules)
+        info_modules_dict = self.store.module_tree(extended=False)
+
+        with unanswered_calls() as unanswered:
+            final_json_dict = await low_level_analysis.recursive_json_search_agent(
+                info_modules_dict,
+                self.input_path,
+                llm_selection=self.llm_selection,
+                journal=self.journal,
+            )
 
-        final_json_dict = asyncio.run(
-            low_level_analysis.recursive_json_search_agent(
-                info_modules_dict, self.input_path
+        for folder_dict in iter_folders(final_json_dict):
+            self.store.put_folder_files(
+                folder_dict["current_folder"], folder_dict["files"]
             )
-        )
+        self._record_stage("modules_low_level", unanswered)
 
-        self._write_json_doc(
-            output_path=self.info_modules_extended, data=final_json_dict
-        )
+    def low_level_analysis_modules(self):
+        self._run(self.alow_level_analysis_modules())
 
     def save_readme_gen(self, generated_readme):
         self._write_md_doc(
             os.path.join(self.workspace_path, "readme.md"), generated_readme
         )
 
-    def readme_generator(self):
-        _logger.info("Generating readme...")
-        readme_generator = ReadmeGenerator(
+    def build_readme_generator(
+        self, section_cache_path: Optional[str] = None
+    ) -> ReadmeGenerator:
+        """ReadmeGenerator over the extended analyses of the workspace."""
+        return ReadmeGenerator(
             project_name=self.project_name,
             introduction="Filled with the project description.",
-            off_module_path=self.info_files_extended,
-            in_module_path=self.info_modules_extended,
+            analysis_store=self.store,
             input_project_path=self.input_path,
+            scan_index=self.scan_index,
+            section_cache_path=section_cache_path or self.readme_sections,
+            llm_selection=self.llm_selection,
         )
 
+    async def areadme_generator(self):
+        _logger.info("Generating readme...")
+        self._report_progress("readme", "started")
+        readme_generator = self.build_readme_generator()
+
         # Generate the README file
-        generated_readme = asyncio.run(readme_generator.gen_readme())
+        generated_readme = await readme_generator.gen_readme()
+        self.store.put_sections(
+            readme_generator.sections,
+            {
+                name: entry["digest"]
+                for name, entry in readme_generator.section_cache.sections.items()
+            },
+        )
+        self.stats.record_cache(
+            "sections",
+            readme_generator.section_cache.hits,
+            readme_generator.section_cache.misses,
+        )
         # Save the README file
         self.save_readme_gen(generated_readme)
+        self._report_progress("readme", "completed")
+
+    def readme_generator(self):
+        self._run(self.areadme_generator())
 
     def copy_extended_info_to_logs(self):
         """
-        Copies the extended info JSON files to the logs directory.
+        References the analyses from the logs directory: artifacts.json gives the path of
+        the analysis store relative to it, instead of a copy of the largest files of the
+        run. The info_* files are exported from the store on demand.
         """
         try:
-            self.files_logs = os.path.join(
-                self.output_path, "logs", self.INFO_FILES_EXTENDED_JSON
-            )
-            self.modules_logs = os.path.join(
-                self.output_path, "logs", self.INFO_MODULES_EXTENDED_JSON
-            )
-
-            # Copy info_files_extended to files_logs
-            shutil.copy(self.info_files_extended, self.files_logs)
-            _logger.info(f"Copied {self.INFO_FILES_EXTENDED_JSON} to logs directory")
-
-            # Copy info_modules_extended to modules_logs
-            shutil.copy(self.info_modules_extended, self.modules_logs)
-            _logger.info(f"Copied {self.INFO_MODULES_EXTENDED_JSON} to logs directory")
+            logs_folder = os.path.join(self.output_path, "logs")
+            references = {
+                "format": "sqlite",
+                self.ANALYSIS_DB: os.path.relpath(self.analysis_db, logs_folder),
+            }
+            self.artifacts_logs = os.path.join(logs_folder, self.ARTIFACTS_JSON)
+            write_artifact(self.artifacts_logs, references)
+            _logger.info(f"Analysis store referenced in {self.artifacts_logs}")
 
         except Exception as e:
             _logger.error(
-                f"An error occurred while copying extended info files to logs: {e}"
+                f"An error occurred while referencing the analysis store in logs: {e}"
             )
 
     def run_readme_test(self, test_folder: str):
         self.copy_info_files_to_new_workspace(test_folder=test_folder)
         self.readme_generator()
+        TokenUsageTracker().log_serialization_report()
 
-    def run(self):
-        self.main_folder_file_analysis()
-        self.top_level_analysis_modules()
-        self.low_level_analysis_files()
-        self.low_level_analysis_modules()
+    async def aroot_files_analysis(self):
+        await self.amain_folder_file_analysis()
+        await self.alow_level_analysis_files()
 
-        self.copy_extended_info_to_logs()
-        self.readme_generator()
+    async def amodules_analysis(self):
+        """
+        Streams the module tree from the top-level to the low-level analysis: the files of a
+        folder are read as soon as its ModuleAnalysis arrives, through a bounded queue, so
+        both phases overlap across the tree. The files of each folder are stored as soon
+        as they are read, the module tree at the end of the stream.
+        """
+        if self._stage_completed("modules_low_level"):
+            return
+        _logger.info("Streaming module analysis started")
+        self._report_progress("modules", "started")
+        streaming = load_pipeline_config()["streaming"]
+        queue = asyncio.Queue(maxsize=streaming["queue_size"])
+        enqueued = set()
+
+        async def enqueue(folder_dict):
+            if folder_dict["current_folder"] not in enqueued:
+                enqueued.add(folder_dict["current_folder"])
+                # Blocks the top-level analysis while the queue is full
+                await queue.put(folder_dict)
+
+        failed_folders = []
+
+        async def low_level_worker():
+            while True:
+                folder_dict = await queue.get()
+                folder_name = (folder_dict or {}).get("current_folder")
+                try:
+                    if folder_dict is None:
+                        return
+                    # Shallow copy: the top-level tree keeps its list of files
+                    folder_copy = dict(folder_dict)
+                    await low_level_analysis.analyze_folder(
+                        folder_copy, self.input_path, self.llm_selection, self.journal
+                    )
+                    self.store.put_folder_files(folder_name, folder_copy["files"])
+                    self._report_progress(
+                        "modules_low_level", "progress", folder=folder_name
+                    )
+                except Exception as e:
+                    # A failing folder must not stop the worker, or the queue would fill up
+                    _logger.error(f"Low-level analysis failed for {folder_name}: {e}")
+                    failed_folders.append(folder_name)
+                finally:
+                    queue.task_done()
+
+        # The workers inherit the list of the block, the top-level calls have their own
+        with unanswered_calls() as low_level_unanswered:
+            workers = [
+                asyncio.create_task(low_level_worker())
+                for _ in range(streaming["workers"])
+            ]
+        try:
+            result_recursive_folder_search = await asyncio.to_thread(
+                search_engines.recursive_directory_search, directory=self.input_path
+            )
+            with unanswered_calls() as modules_unanswered:
+                info_modules = (
+                    await top_level_analysis.generate_module_descriptions_and_ratings(
+                        result_recursive_folder_search,
+                        llm_selection=self.llm_selection,
+                        on_folder_done=enqueue,
+                        journal=self.journal,
+                    )
+                )
+            # Folders the top-level analysis did not report are read too
+            for folder_dict in iter_folders(info_modules):
+                await enqueue(folder_dict)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+        self.store.put_module_tree(info_modules)
+        self._record_stage("modules", modules_unanswered)
+        self._record_stage(
+            "modules_low_level", low_level_unanswered, failed_units=failed_folders
+        )
+
+    async def arun(self):
+        """
+        Runs the whole pipeline in a single event loop. The root files and the modules are
+        analyzed concurrently, as neither needs the other, sharing the model client and the
+        LLM concurrency limit; the README is generated once both are done.
+
+        The model calls are made within the budget of the run: as it runs out, the analysis
+        gets shallower and the README sections are written without the model, but the
+        README is always written.
+        """
+        started = time.perf_counter()
+        analysis_cache = ANALYSIS_CACHE.stats()
+        status = "failed"
+        try:
+            with self.budget.activate(), self.stats.activate():
+                await asyncio.gather(
+                    self.aroot_files_analysis(), self.amodules_analysis()
+                )
+
+                self.copy_extended_info_to_logs()
+                await self.areadme_generator()
+            status = "completed"
+        finally:
+            # Shared by the projects of a batch, only the lookups of this run count
+            self.stats.record_cache(
+                "python_analysis",
+                ANALYSIS_CACHE.hits - analysis_cache["hits"],
+                ANALYSIS_CACHE.misses - analysis_cache["misses"],
+            )
+            self.record_history(status, time.perf_counter() - started)
+        TokenUsageTracker().log_serialization_report()
+        if self.budget.limited:
+            _logger.info(f"Run budget: {self.budget.report()}")
+            self._report_progress("budget", "completed", **self.budget.report())
 
         return self.readme_md
 
+    def run(self):
+        return self._run(self.arun())
+
+    def record_history(self, status: str, seconds: float):
+        """Appends the run to the run history, if any. A failure is only logged."""
+        if not self.history_path:
+            return
+        try:
+            history = RunHistory(self.history_path)
+            try:
+                history.record(
+                    {
+                        "project": self.project_name,
+                        "model": getattr(self.llm_selection, "model_name", None)
+                        or getattr(self.llm_selection, "deployment_name", None),
+                        "status": status,
+                        "seconds": seconds,
+                        "files": len(self.scan_index),
+                        "folders": len(self.scan_index.dir_paths),
+                        "bytes": sum(
+                            self.scan_index.size(file_path)
+                            for file_path in self.scan_index.file_paths
+                        ),
+                        "cost": self.budget.cost,
+                    },
+                    self.stats,
+                )
+            finally:
+                history.close()
+        except Exception as e:
+            _logger.warning(f"Run not recorded in {self.history_path}: {e}")
+
 
 # TODO: Modular token limit by func and class
 # TODO V2: Detect Runnable Code with Flag (viability prompt) >> INTO LLM >> EXAMPLE AGENT
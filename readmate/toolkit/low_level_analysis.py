@@ -1,10 +1,12 @@
 import os
+import re
 import sys
 import asyncio
 
-from typing import Dict, Union
+from typing import Dict, Optional, Union
 
 from readmate.utils.logger import set_logger
+from readmate.utils.run_budget import current_budget
 from readmate.utils.basemodel_modules import (
     FileAnalyzer,
     PythonAnalysis,
@@ -33,11 +35,12 @@ from readmate.utils.utils_tools import (
     extension_support_analysis,
     read_text_file,
     extension_support_analysis_for_main_folder,
-    load_json_from_path,
 )
 
 
-from readmate.chains.chat_message_chain import ChatMessageChain
+from readmate.chains.chat_message_chain import ChatMessageChain, unanswered_calls
+from readmate.utils.run_journal import RunJournal
+from readmate.utils.artifact_store import load_artifact
 
 
 _logger = set_logger()
@@ -85,17 +88,24 @@ def analyze_reading_viability(
 
 
 # Recursive search - Agent
-async def recursive_json_search_agent(json_module_dict, workspace_path):
+async def recursive_json_search_agent(
+    json_module_dict, workspace_path, llm_selection=None, journal=None
+):
     """
     Recursive function to get all the information of the subfolders
     """
+    # One model client shared by every folder instead of one per folder
+    llm_selection = llm_selection or model_initialization()
+
     _logger.info(f"Current Folder: {json_module_dict['current_folder']}")
-    await analyze_utility(json_module_dict, workspace_path)
+    await analyze_folder(json_module_dict, workspace_path, llm_selection, journal)
 
     if "subfolders" in json_module_dict:
         tasks = [
             asyncio.create_task(
-                recursive_json_search_agent(subfolder_dict, workspace_path)
+                recursive_json_search_agent(
+                    subfolder_dict, workspace_path, llm_selection, journal
+                )
             )
             for _, subfolder_dict in json_module_dict["subfolders"].items()
         ]
@@ -104,7 +114,54 @@ async def recursive_json_search_agent(json_module_dict, workspace_path):
     return json_module_dict
 
 
-async def analyze_utility(folder_dict, workspace_path):
+async def analyze_folder(
+    folder_dict,
+    workspace_path,
+    llm_selection=None,
+    journal: Optional[RunJournal] = None,
+):
+    """
+    analyze_utility with the files of the folder journaled under the "modules_low_level"
+    stage, so a resumed run restores them instead of reading the folder again. Folders
+    with a file call that failed or was skipped by the budget are not journaled.
+    """
+    if journal and journal.done("modules_low_level", folder_dict["current_folder"]):
+        folder_dict["files"] = journal.get(
+            "modules_low_level", folder_dict["current_folder"]
+        )
+        return
+
+    with unanswered_calls() as unanswered:
+        await analyze_utility(folder_dict, workspace_path, llm_selection)
+    if journal and not unanswered:
+        await journal.arecord(
+            "modules_low_level", folder_dict["current_folder"], folder_dict["files"]
+        )
+
+
+def module_rating(folder_dict) -> int:
+    """
+    Rating given to the folder by the top-level analysis, 0 when it has none (its call
+    failed or was skipped) or it is not a number.
+    """
+    match = re.search(r"\d+", str(folder_dict.get("Rating", "")))
+    return int(match.group()) if match else 0
+
+
+def skip_low_rated_module(folder_dict) -> bool:
+    """True when the run budget is short and the folder is not worth reading."""
+    budget = current_budget()
+    if budget is None or budget.level() < budget.SHALLOW:
+        return False
+    if module_rating(folder_dict) >= budget.min_rating:
+        return False
+    _logger.info(
+        f"Run budget: not reading the files of the low-rated module {folder_dict['current_folder']}"
+    )
+    return True
+
+
+async def analyze_utility(folder_dict, workspace_path, llm_selection=None):
     """
     Tool 1: Analyze the utility of the files we see
     """
@@ -123,6 +180,7 @@ async def analyze_utility(folder_dict, workspace_path):
         read_flag, _, _ = analyze_reading_viability(
             folder_dict, supported_files, unsupported_files
         )
+        read_flag = read_flag and not skip_low_rated_module(folder_dict)
 
         # read_flag: if True, folder should be read
         if read_flag:
@@ -144,7 +202,11 @@ async def analyze_utility(folder_dict, workspace_path):
                 )
 
             folder_dict["files"] = await read_viable_files(
-                supported_files, extension_support, folder_dict_copy, workspace_path
+                supported_files,
+                extension_support,
+                folder_dict_copy,
+                workspace_path,
+                llm_selection,
             )
         else:
             return
@@ -159,11 +221,12 @@ async def read_viable_files(
     extension_support: dict,
     extra_info_folder: dict,
     workspace_path: str,
+    llm_selection=None,
 ) -> Dict:
     output_dict = {}
 
     token_count = 200
-    llm_selection = model_initialization()
+    llm_selection = llm_selection or model_initialization()
     tasks = []
     for item_l in file_selection:
         # TODO: V2: (MMMAC): Move extension logic into General_File_Reader + Adapt the prompt to each file
@@ -274,19 +337,29 @@ async def python_llm_ast_analyzer(file_info, llm_selection):
 
 
 async def analyze_internal_files(
-    directory_info: str, workspace_path: str
+    directory_info: Union[str, Dict],
+    workspace_path: str,
+    llm_selection=None,
+    journal: Optional[RunJournal] = None,
 ) -> Dict[str, Union[Dict, int, str]]:
     output_dict = {}
-    llm_selection = model_initialization()
+    llm_selection = llm_selection or model_initialization()
 
-    directory_info = load_json_from_path(file_path=directory_info)
+    # Path of the info_files artefact, or the root files themselves
+    if isinstance(directory_info, str):
+        directory_info = load_artifact(directory_info)
 
     supported_files, _, _ = extension_support_analysis_for_main_folder(
         folder_dict=directory_info
     )
     tasks = []  # Create a list to hold all the tasks
     for filename_key, non_module_file in directory_info.items():
-        if filename_key in supported_files:
+        if journal and journal.done("root_files_low_level", filename_key):
+            # Analyzed before an interruption, restored from the journal
+            output_dict[non_module_file["filename"]] = journal.get(
+                "root_files_low_level", filename_key
+            )
+        elif filename_key in supported_files:
             file_info, file_ext_py = read_text_file(
                 file_path=os.path.join(
                     workspace_path,
@@ -296,11 +369,14 @@ async def analyze_internal_files(
             )
 
             if file_ext_py:
-                task = asyncio.create_task(
-                    python_llm_ast_analyzer(file_info, llm_selection)
-                )
+                # The task inherits the list of the block, which collects the calls
+                # of this file only
+                with unanswered_calls() as unanswered:
+                    task = asyncio.create_task(
+                        python_llm_ast_analyzer(file_info, llm_selection)
+                    )
                 tasks.append(
-                    (task, non_module_file)
+                    (task, non_module_file, unanswered)
                 )  # Append the task with its associated file info
 
                 # response["top_level_script"] = file_info["top_level_script"]
@@ -325,18 +401,26 @@ async def analyze_internal_files(
                 )
 
                 cmc.setup_chain()
-                task = asyncio.create_task(cmc.run_chain_json_retry())
+                with unanswered_calls() as unanswered:
+                    task = asyncio.create_task(cmc.run_chain_json_retry())
                 tasks.append(
-                    (task, non_module_file)
+                    (task, non_module_file, unanswered)
                 )  # Append the task with its associated file info
 
     # Wait for all tasks to complete
-    for task, non_module_file in tasks:
+    for task, non_module_file, unanswered in tasks:
         response = await task
         if "Imports" in file_info:
             response["Imports"] = file_info["imports"]
         output_dict[non_module_file["filename"]] = non_module_file
         output_dict[non_module_file["filename"]].update(response)
+        # A default response is not journaled, a resumed run asks the model again
+        if journal and not unanswered:
+            await journal.arecord(
+                "root_files_low_level",
+                non_module_file["filename"],
+                output_dict[non_module_file["filename"]],
+            )
         _logger.info("{} processed correctly".format(non_module_file["filename"]))
 
     return output_dict
@@ -1,6 +1,6 @@
 import asyncio
 import sys
-from typing import Dict, List, Union, Any
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
 from readmate.prompts.input_prompt import (
     MODULE_WITH_SUBMODULES,
     MODULE_WITHOUT_SUBMODULES,
@@ -9,13 +9,14 @@ from readmate.prompts.input_prompt import (
 )
 
 from readmate.utils.logger import set_logger
-from readmate.utils.utils_tools import model_initialization, json_decoder
+from readmate.utils.utils_tools import model_initialization, json_decoder, iter_folders
 from readmate.utils.basemodel_modules import (
     ModuleAnalysis,
     FileAnalysis,
 )
 
-from readmate.chains.chat_message_chain import ChatMessageChain
+from readmate.chains.chat_message_chain import ChatMessageChain, unanswered_calls
+from readmate.utils.run_journal import RunJournal
 
 _logger = set_logger()
 
@@ -49,124 +50,109 @@ async def process_module(
     return response
 
 
+async def analyze_module_folder(
+    folder_info: Dict[str, Any], is_root: bool, llm_selection
+) -> Dict[str, Any]:
+    """
+    ModuleAnalysis of a single folder. Only the names of its subfolders are used, so the
+    folder dict does not need their contents.
+    """
+    subfolder_names = list(folder_info["subfolders"].keys())
+    input_variables = [
+        "current_module",
+        "num_files",
+        "extensions",
+        "num_lines",
+    ]
+    msg_values = [
+        folder_info["current_folder"],
+        folder_info["num_files"],
+        folder_info["file_extensions"],
+        folder_info["num_lines"],
+    ]
+
+    # The main folder is always described as a module with submodules
+    if subfolder_names or is_root:
+        input_variables.append("submodules")
+        msg_values.append(subfolder_names)
+        human_prompt = MODULE_WITH_SUBMODULES
+    else:
+        human_prompt = MODULE_WITHOUT_SUBMODULES
+
+    return await process_module(
+        folder_info=folder_info,
+        input_vars=input_variables,
+        msg_vals=msg_values,
+        h_prompt=human_prompt,
+        llm_selection=llm_selection,
+    )
+
+
 async def generate_module_descriptions_and_ratings(
     directory_info: str,
+    llm_selection=None,
+    on_folder_done: Optional[Callable[[Dict], Awaitable[None]]] = None,
+    journal: Optional[RunJournal] = None,
 ) -> Dict[str, Union[Dict, int, str]]:
     """
     INPUT: Dictionary
     INPUT TYPE: dict
     Generate descriptions of what each module does
     and a rating of its usefulness for a README file, but only for directories without subdirectories.
-    """
-    # Initialize the language model
-    directory_info = json_decoder(directory_info=directory_info)
-    llm_selection = model_initialization()
-
-    async def process_subfolder(
-        subfolder_info: Dict[str, Union[Dict, int, List[str]]], path: List[str]
-    ):
-        tasks = []
-        # Run a prompt for the main folder before processing subfolders
-        subfolder_names = list(subfolder_info["subfolders"].keys())
-
-        input_variables = [
-            "current_module",
-            "num_files",
-            "extensions",
-            "num_lines",
-            "submodules",
-        ]
 
-        msg_values = [
-            subfolder_info["current_folder"],
-            subfolder_info["num_files"],
-            subfolder_info["file_extensions"],
-            subfolder_info["num_lines"],
-            subfolder_names,
-        ]
+    No prompt needs the summary of the parent folder, so every folder of the tree is scheduled
+    up front, breadth first, and visited exactly once. The calls run concurrently under the
+    global LLM concurrency limit.
 
-        task = asyncio.create_task(
-            process_module(
-                folder_info=subfolder_info,
-                input_vars=input_variables,
-                msg_vals=msg_values,
-                h_prompt=MODULE_WITH_SUBMODULES,
-                llm_selection=llm_selection,
-            )
-        )
-        tasks.append(task)
+    on_folder_done, if given, is awaited with each folder dict as soon as its analysis is merged,
+    so the next stage can start on that folder without waiting for the whole tree.
 
-        # Wait for the main folder task and update info
-        main_folder_response = await tasks[0]
-        subfolder_info.update(main_folder_response)
-
-        for subfolder, details in subfolder_info.get("subfolders", {}).items():
-            # Initialize prompt and response outside the if-else scope
-            subfolder_names = list(details["subfolders"].keys())
-            if subfolder_names:
-                input_variables = [
-                    "current_module",
-                    "num_files",
-                    "extensions",
-                    "num_lines",
-                    "submodules",
-                ]
-                human_prompt = MODULE_WITH_SUBMODULES
-            else:
-                input_variables = [
-                    "current_module",
-                    "num_files",
-                    "extensions",
-                    "num_lines",
-                ]
-                human_prompt = MODULE_WITHOUT_SUBMODULES
-
-            msg_values = [
-                details["current_folder"],
-                details["num_files"],
-                details["file_extensions"],
-                details["num_lines"],
-                subfolder_names if subfolder_names else [],
-            ]
-
-            # Ensure prompt is not empty before invoking the model
-
-            tasks.append(
-                asyncio.create_task(
-                    process_module(
-                        folder_info=details,
-                        input_vars=input_variables,
-                        msg_vals=msg_values,
-                        h_prompt=human_prompt,
-                        llm_selection=llm_selection,
-                    )
+    With a journal, each folder analysis is journaled under the "modules" stage and the folders
+    already journaled by an interrupted run are not sent to the model again. Folders whose
+    call failed or was skipped by the budget are not journaled.
+    """
+    # Initialize the language model
+    directory_info = json_decoder(directory_info=directory_info)
+    llm_selection = llm_selection or model_initialization()
+
+    async def process_folder(folder_info: Dict[str, Any], is_root: bool):
+        if journal and journal.done("modules", folder_info["current_folder"]):
+            response = journal.get("modules", folder_info["current_folder"])
+        else:
+            with unanswered_calls() as unanswered:
+                response = await analyze_module_folder(
+                    folder_info, is_root, llm_selection
+                )
+            # A default response is not journaled, a resumed run asks the model again
+            if journal and not unanswered:
+                await journal.arecord(
+                    "modules", folder_info["current_folder"], response
                 )
-            )
-        responses = await asyncio.gather(
-            *tasks[1:]
-        )  # Skip the first task which is already awaited
-
-        for task, subfolder in zip(responses, subfolder_info["subfolders"]):
-            subfolder_info["subfolders"][subfolder].update(task)
-        # Recurse into subfolders if they exist
-        if subfolder_names:
-            await process_subfolder(details, path + [subfolder])
-
-    await process_subfolder(directory_info, [])
+        folder_info.update(response)
+        if on_folder_done:
+            await on_folder_done(folder_info)
+
+    tasks = [
+        asyncio.create_task(process_folder(folder_info, folder_info is directory_info))
+        for folder_info in iter_folders(directory_info)
+    ]
+    await asyncio.gather(*tasks)
     return directory_info
 
 
 async def generate_file_descriptions_and_ratings(
     directory_info: dict,
+    llm_selection=None,
+    journal: Optional[RunJournal] = None,
 ) -> Dict[str, Union[Dict, int, str]]:
-    llm_selection = model_initialization()
+    llm_selection = llm_selection or model_initialization()
 
     output_dict = {}
     tasks = []
 
     for non_module_file in directory_info["files"]:
         task = asyncio.create_task(
-            process_file(non_module_file, output_dict, llm_selection)
+            process_file(non_module_file, output_dict, llm_selection, journal)
         )
         tasks.append(task)
 
@@ -177,8 +163,17 @@ async def generate_file_descriptions_and_ratings(
 
 
 async def process_file(
-    non_module_file: Dict[str, Any], output_dict: Dict[str, Any], llm_selection
+    non_module_file: Dict[str, Any],
+    output_dict: Dict[str, Any],
+    llm_selection,
+    journal: Optional[RunJournal] = None,
 ) -> None:
+    if journal and journal.done("root_files", non_module_file["filename"]):
+        output_dict[non_module_file["filename"]] = journal.get(
+            "root_files", non_module_file["filename"]
+        )
+        return
+
     # CMC new instance to avoid case of shared mutable object in async enviroment
     cmc = ChatMessageChain(
         input_variables=[
@@ -203,5 +198,11 @@ async def process_file(
     # Since dictionaries are mutable, this modification will reflect in the output_dict in the caller function
     output_dict[non_module_file["filename"]] = non_module_file
     output_dict[non_module_file["filename"]].update(response)
+    if journal and cmc.answered:
+        await journal.arecord(
+            "root_files",
+            non_module_file["filename"],
+            output_dict[non_module_file["filename"]],
+        )
 
     _logger.info(f"Off-module file processed: {non_module_file['filename']}")
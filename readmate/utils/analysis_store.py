@@ -0,0 +1,561 @@
+import os
+import json
+import time
+import sqlite3
+from typing import Optional
+
+from readmate.utils.logger import set_logger
+from readmate.utils.artifact_store import artifact_name, write_artifact
+from readmate.utils.utils_tools import filter_keys_recursively, remove_empty_values
+
+_logger = set_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    parent_id INTEGER REFERENCES folders (id),
+    name TEXT,
+    position INTEGER,
+    data TEXT,
+    files TEXT,
+    files_read INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS folder_keys (
+    folder_id INTEGER NOT NULL REFERENCES folders (id),
+    key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    folder_id INTEGER NOT NULL REFERENCES folders (id),
+    name TEXT NOT NULL,
+    UNIQUE (folder_id, name)
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files (id),
+    stage TEXT NOT NULL,
+    data TEXT NOT NULL,
+    UNIQUE (file_id, stage)
+);
+CREATE TABLE IF NOT EXISTS analysis_keys (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id),
+    key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id),
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    name TEXT PRIMARY KEY,
+    digest TEXT,
+    content TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stages (
+    stage TEXT PRIMARY KEY,
+    completed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS folders_parent ON folders (parent_id);
+CREATE INDEX IF NOT EXISTS folder_keys_key ON folder_keys (key, folder_id);
+CREATE INDEX IF NOT EXISTS folder_keys_folder ON folder_keys (folder_id);
+CREATE INDEX IF NOT EXISTS analyses_stage ON analyses (stage, file_id);
+CREATE INDEX IF NOT EXISTS analysis_keys_key ON analysis_keys (key, analysis_id);
+CREATE INDEX IF NOT EXISTS analysis_keys_analysis ON analysis_keys (analysis_id);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name);
+CREATE INDEX IF NOT EXISTS symbols_analysis ON symbols (analysis_id);
+"""
+
+ROOT_FOLDER = "."
+# Stages of the file analyses: the root files (top-level, then low-level) and the files
+# read in the module folders
+ROOT_FILES = "root_files"
+ROOT_FILES_LOW_LEVEL = "root_files_low_level"
+MODULES_LOW_LEVEL = "modules_low_level"
+# Keys of the file analyses listing code symbols
+SYMBOL_KEYS = ["Functions", "Classes", "CodeExtractions", "Imports"]
+# Keys of the module tree folders stored in tables of their own
+TREE_KEYS = ("files", "subfolders")
+
+
+def _dumps(value) -> str:
+    # Keys stay in insertion order: the prompts and the section digests depend on it
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _folder_attributes(data: str) -> dict:
+    """Attributes of a stored folder, without the placeholders of its tree keys."""
+    return {
+        key: value for key, value in json.loads(data).items() if key not in TREE_KEYS
+    }
+
+
+def collect_keys(node, keys: Optional[set] = None) -> set:
+    """Keys of a dict and of the dicts nested in its values, as explored by the filter."""
+    keys = set() if keys is None else keys
+    if isinstance(node, dict):
+        for key, value in node.items():
+            keys.add(key)
+            collect_keys(value, keys)
+    return keys
+
+
+def collect_symbols(data) -> list:
+    """(kind, name) of the functions, classes, code extractions and imports of a file."""
+    symbols = []
+    if isinstance(data, dict):
+        for kind in SYMBOL_KEYS:
+            value = data.get(kind)
+            if isinstance(value, dict):
+                symbols += [(kind, str(name)) for name in value]
+            elif isinstance(value, list):
+                symbols += [(kind, name) for name in value if isinstance(name, str)]
+    return symbols
+
+
+class AnalysisStore:
+    """
+    Normalized SQLite store of the analyses of a workspace: the folders of the module
+    tree, their files, the analysis of each file by stage, the code symbols found in them
+    and the README sections. The stages write their units (a folder, the files of a
+    folder) in transactions of their own, and the README generator asks for the section
+    context it needs: the keys of every analysis are indexed, so only the folders and
+    files holding a requested key are read.
+
+    The trees of the former info_*.json files are rebuilt on demand, by module_tree,
+    root_files and export.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, timeout=60)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        # Section contexts by (scope, keys, crucial_keys), cleared by every write
+        self._projections: dict = {}
+
+    def close(self):
+        self.connection.close()
+
+    def _folder_id(self, path: str) -> int:
+        self.connection.execute(
+            "INSERT INTO folders (path) VALUES (?) ON CONFLICT (path) DO NOTHING",
+            (path,),
+        )
+        return self.connection.execute(
+            "SELECT id FROM folders WHERE path = ?", (path,)
+        ).fetchone()[0]
+
+    def _file_id(self, folder_id: int, name: str) -> int:
+        self.connection.execute(
+            "INSERT INTO files (folder_id, name) VALUES (?, ?) "
+            "ON CONFLICT (folder_id, name) DO NOTHING",
+            (folder_id, name),
+        )
+        return self.connection.execute(
+            "SELECT id FROM files WHERE folder_id = ? AND name = ?", (folder_id, name)
+        ).fetchone()[0]
+
+    def _put_analysis(self, file_id: int, stage: str, data):
+        old = self.connection.execute(
+            "SELECT id FROM analyses WHERE file_id = ? AND stage = ?", (file_id, stage)
+        ).fetchone()
+        if old:
+            self._delete_analyses([old[0]])
+        analysis_id = self.connection.execute(
+            "INSERT INTO analyses (file_id, stage, data) VALUES (?, ?, ?)",
+            (file_id, stage, _dumps(data)),
+        ).lastrowid
+        self.connection.executemany(
+            "INSERT INTO analysis_keys (analysis_id, key) VALUES (?, ?)",
+            [(analysis_id, key) for key in collect_keys(data)],
+        )
+        self.connection.executemany(
+            "INSERT INTO symbols (analysis_id, kind, name) VALUES (?, ?, ?)",
+            [(analysis_id, kind, name) for kind, name in collect_symbols(data)],
+        )
+
+    def _delete_analyses(self, analysis_ids: list):
+        for table in ["analysis_keys", "symbols"]:
+            self.connection.executemany(
+                f"DELETE FROM {table} WHERE analysis_id = ?",
+                [(analysis_id,) for analysis_id in analysis_ids],
+            )
+        self.connection.executemany(
+            "DELETE FROM analyses WHERE id = ?",
+            [(analysis_id,) for analysis_id in analysis_ids],
+        )
+
+    def put_module_tree(self, tree: dict):
+        """
+        Writes the folders of the top-level module analysis, with the file names found by
+        the scan. The files read by the low-level analysis are kept.
+        """
+        with self.connection:
+            # Folders of a former tree are left out of the rebuilt ones
+            self.connection.execute(
+                "UPDATE folders SET parent_id = NULL, name = NULL, data = NULL, "
+                "files = NULL"
+            )
+            self.connection.execute("DELETE FROM folder_keys")
+            pending = [(tree, None, None, 0)] if tree else []
+            while pending:
+                folder_dict, parent_id, name, position = pending.pop()
+                attributes = {
+                    key: value
+                    for key, value in folder_dict.items()
+                    if key not in TREE_KEYS
+                }
+                # The tree keys are kept as placeholders, for the rebuilt folders to
+                # have their keys in the same order
+                data = {
+                    key: None if key in TREE_KEYS else value
+                    for key, value in folder_dict.items()
+                }
+                folder_id = self._folder_id(folder_dict["current_folder"])
+                self.connection.execute(
+                    "UPDATE folders SET parent_id = ?, name = ?, position = ?, "
+                    "data = ?, files = ? WHERE id = ?",
+                    (
+                        parent_id,
+                        name,
+                        position,
+                        _dumps(data),
+                        # Names only, the analyses of read files are put_folder_files'
+                        _dumps(list(folder_dict.get("files", []))),
+                        folder_id,
+                    ),
+                )
+                self.connection.executemany(
+                    "INSERT INTO folder_keys (folder_id, key) VALUES (?, ?)",
+                    [(folder_id, key) for key in collect_keys(attributes)],
+                )
+                subfolders = folder_dict.get("subfolders", {})
+                for index, (subfolder_name, subfolder_dict) in enumerate(
+                    subfolders.items()
+                ):
+                    pending.append((subfolder_dict, folder_id, subfolder_name, index))
+            self._projections.clear()
+
+    def put_folder_files(self, path: str, files):
+        """
+        Writes the files of a folder read by the low-level analysis, in one transaction.
+        A list of names means the folder was not read, nothing is written.
+        """
+        if not isinstance(files, dict):
+            return
+        with self.connection:
+            folder_id = self._folder_id(path)
+            old = self.connection.execute(
+                "SELECT a.id FROM analyses AS a JOIN files AS f ON f.id = a.file_id "
+                "WHERE f.folder_id = ? AND a.stage = ?",
+                (folder_id, MODULES_LOW_LEVEL),
+            ).fetchall()
+            self._delete_analyses([row[0] for row in old])
+            for name, data in files.items():
+                self._put_analysis(
+                    self._file_id(folder_id, name), MODULES_LOW_LEVEL, data
+                )
+            self.connection.execute(
+                "UPDATE folders SET files_read = 1 WHERE id = ?", (folder_id,)
+            )
+            self._projections.clear()
+
+    def put_root_files(self, files: dict, stage: str):
+        """Writes the analyses of the files of the project root for a stage."""
+        with self.connection:
+            folder_id = self._folder_id(ROOT_FOLDER)
+            for name, data in files.items():
+                self._put_analysis(self._file_id(folder_id, name), stage, data)
+            self._projections.clear()
+
+    def put_sections(self, sections: dict, digests: Optional[dict] = None):
+        """Writes the rendered README sections, with the digest of their inputs if any."""
+        digests = digests or {}
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO sections (name, digest, content) "
+                "VALUES (?, ?, ?)",
+                [
+                    (name, digests.get(name), content)
+                    for name, content in sections.items()
+                ],
+            )
+
+    def sections(self) -> dict:
+        return {
+            row["name"]: row["content"]
+            for row in self.connection.execute("SELECT name, content FROM sections")
+        }
+
+    def record_stage(self, stage: str):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO stages (stage, completed) VALUES (?, ?)",
+                (stage, time.time()),
+            )
+
+    def stage_done(self, stage: str) -> bool:
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM stages WHERE stage = ?", (stage,)
+            ).fetchone()
+            is not None
+        )
+
+    def find_symbol(self, name: str) -> list:
+        """Files whose analysis mentions the symbol, as (folder path, file name, kind)."""
+        rows = self.connection.execute(
+            "SELECT DISTINCT fo.path, f.name, s.kind FROM symbols AS s "
+            "JOIN analyses AS a ON a.id = s.analysis_id "
+            "JOIN files AS f ON f.id = a.file_id "
+            "JOIN folders AS fo ON fo.id = f.folder_id "
+            "WHERE s.name = ? ORDER BY fo.path, f.name",
+            (name,),
+        ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def folder(self, path: str) -> Optional[dict]:
+        """Attributes of a folder, without its files and subfolders."""
+        row = self.connection.execute(
+            "SELECT data FROM folders WHERE path = ?", (path,)
+        ).fetchone()
+        return _folder_attributes(row[0]) if row and row[0] is not None else None
+
+    def folders(self) -> list:
+        """Attributes of every folder of the module tree, breadth first."""
+        rows = self.connection.execute(
+            "SELECT id, parent_id, data FROM folders WHERE data IS NOT NULL "
+            "ORDER BY position"
+        ).fetchall()
+        children = {}
+        for row in rows:
+            children.setdefault(row["parent_id"], []).append(row)
+        ordered, level = [], children.get(None, [])
+        while level:
+            ordered += [_folder_attributes(row["data"]) for row in level]
+            level = [child for row in level for child in children.get(row["id"], [])]
+        return ordered
+
+    def root_files(self, stage: str, names: Optional[set] = None) -> dict:
+        """Analyses of the files of the project root at a stage, by file name."""
+        rows = self.connection.execute(
+            "SELECT f.name, a.data FROM analyses AS a "
+            "JOIN files AS f ON f.id = a.file_id "
+            "JOIN folders AS fo ON fo.id = f.folder_id "
+            "WHERE fo.path = ? AND a.stage = ? ORDER BY f.id",
+            (ROOT_FOLDER, stage),
+        ).fetchall()
+        return {
+            row["name"]: json.loads(row["data"])
+            for row in rows
+            if names is None or row["name"] in names
+        }
+
+    def module_tree(
+        self,
+        extended: bool = True,
+        folder_ids: Optional[set] = None,
+        analysis_ids: Optional[set] = None,
+    ) -> dict:
+        """
+        Rebuilds the module tree, as info_modules_extended.json (with the analyses of the
+        files read) or info_modules.json (with the file names only).
+
+        Args:
+            extended (bool): Replace the file names of the folders read by their analyses.
+            folder_ids (set, optional): Only these folders keep their attributes.
+            analysis_ids (set, optional): Only these file analyses are included, and no
+                file names. The folders are then only there as the path to them.
+
+        Returns:
+            dict: The root folder, {} if no module tree was written.
+        """
+        rows = self.connection.execute(
+            "SELECT id, parent_id, name, path, files, files_read, "
+            + ("data" if folder_ids is None else "NULL AS data")
+            + " FROM folders WHERE files IS NOT NULL ORDER BY position"
+        ).fetchall()
+        if folder_ids is not None:
+            data = self._rows_by_id("folders", "data", folder_ids)
+
+        files_by_folder = {}
+        if extended:
+            query = (
+                "SELECT f.folder_id, f.name, a.id, a.data FROM analyses AS a "
+                "JOIN files AS f ON f.id = a.file_id WHERE a.stage = ? ORDER BY f.id"
+            )
+            for row in self.connection.execute(query, (MODULES_LOW_LEVEL,)):
+                if analysis_ids is None or row[2] in analysis_ids:
+                    files_by_folder.setdefault(row[0], {})[row[1]] = json.loads(row[3])
+
+        folders, root = {}, None
+        for row in rows:
+            folder_data = row["data"] if folder_ids is None else data.get(row["id"])
+            folder_dict = json.loads(folder_data or "{}")
+            if analysis_ids is not None:
+                folder_dict["files"] = files_by_folder.get(row["id"], {})
+            elif extended and row["files_read"]:
+                folder_dict["files"] = files_by_folder.get(row["id"], {})
+            else:
+                folder_dict["files"] = json.loads(row["files"])
+            folder_dict["subfolders"] = {}
+            folders[row["id"]] = (row, folder_dict)
+        for row, folder_dict in folders.values():
+            if row["parent_id"] in folders:
+                folders[row["parent_id"]][1]["subfolders"][row["name"]] = folder_dict
+            elif row["parent_id"] is None:
+                root = folder_dict
+        return root or {}
+
+    def _rows_by_id(self, table: str, column: str, ids: set) -> dict:
+        ids = list(ids)
+        values = {}
+        # Within the bound parameters limit of SQLite
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            values.update(
+                self.connection.execute(
+                    f"SELECT id, {column} FROM {table} "
+                    f"WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+            )
+        return values
+
+    def _matching(self, table: str, id_column: str, keys: list) -> set:
+        return {
+            row[0]
+            for row in self.connection.execute(
+                f"SELECT DISTINCT {id_column} FROM {table} "
+                f"WHERE key IN ({','.join('?' * len(keys))})",
+                keys,
+            )
+        }
+
+    def _structural(self, keys: list) -> bool:
+        """True when a key is also a folder or file name, or a key of the tree itself."""
+        if {"files", "subfolders"} & set(keys):
+            return True
+        placeholders = ",".join("?" * len(keys))
+        return (
+            self.connection.execute(
+                f"SELECT 1 FROM folders WHERE name IN ({placeholders}) "
+                f"UNION SELECT 1 FROM files WHERE name IN ({placeholders})",
+                keys + keys,
+            ).fetchone()
+            is not None
+        )
+
+    def project(self, scope: str, keys: list, crucial_keys: list):
+        """
+        Context of a README section: the module tree ("modules") or the root files
+        ("files") restricted to the given keys, without empty values. Same result as
+        filter_keys_recursively then remove_empty_values over the whole tree, but only
+        the folders and file analyses holding one of the keys are read. Results are
+        cached until the next write, so callers must not modify them.
+
+        Args:
+            scope (str): "modules" for info_modules_extended, "files" for
+                info_files_extended.
+            keys (list): The keys to retain.
+            crucial_keys (list): Retained keys whose values are copied without filtering.
+        """
+        cache_key = (scope, frozenset(keys), frozenset(crucial_keys))
+        if cache_key in self._projections:
+            return self._projections[cache_key]
+
+        keys = sorted(set(keys))
+        analysis_ids = self._matching("analysis_keys", "analysis_id", keys)
+        if scope == "files":
+            if self._structural(keys):
+                data = self.root_files(ROOT_FILES_LOW_LEVEL)
+            else:
+                data = self._root_analyses(analysis_ids)
+        elif self._structural(keys):
+            data = self.module_tree()
+        else:
+            data = self.module_tree(
+                folder_ids=self._matching("folder_keys", "folder_id", keys),
+                analysis_ids=analysis_ids,
+            )
+
+        self._projections[cache_key] = remove_empty_values(
+            filter_keys_recursively(data, keys, crucial_keys)
+        )
+        return self._projections[cache_key]
+
+    def _root_analyses(self, analysis_ids: set) -> dict:
+        rows = self.connection.execute(
+            "SELECT a.id, f.name, a.data FROM analyses AS a "
+            "JOIN files AS f ON f.id = a.file_id "
+            "JOIN folders AS fo ON fo.id = f.folder_id "
+            "WHERE fo.path = ? AND a.stage = ? ORDER BY f.id",
+            (ROOT_FOLDER, ROOT_FILES_LOW_LEVEL),
+        ).fetchall()
+        return {
+            row["name"]: json.loads(row["data"])
+            for row in rows
+            if row["id"] in analysis_ids
+        }
+
+    def export(self, folder: str, artifact_format: str = "json") -> list:
+        """
+        Writes the analyses as the info_*.json files of the former pipeline, or their
+        compact JSON lines version, in a folder.
+
+        Returns:
+            list: Paths of the files written.
+        """
+        artifacts = {
+            "info_modules.json": self.module_tree(extended=False),
+            "info_modules_extended.json": self.module_tree(),
+            "info_files.json": self.root_files(ROOT_FILES),
+            "info_files_extended.json": self.root_files(ROOT_FILES_LOW_LEVEL),
+        }
+        paths = []
+        for json_name, data in artifacts.items():
+            path = os.path.join(folder, artifact_name(json_name, artifact_format))
+            write_artifact(path, data)
+            paths.append(path)
+        _logger.info(f"Analyses of {self.db_path} exported to {folder}")
+        return paths
+
+    def import_artifacts(self, artifacts: dict):
+        """
+        Fills the store from the info_*.json analyses of a former run.
+
+        Args:
+            artifacts (dict): The loaded analyses, by info_*.json file name.
+        """
+        if "info_modules_extended.json" in artifacts:
+            tree = artifacts["info_modules_extended.json"]
+            self.put_module_tree(artifacts.get("info_modules.json", tree))
+            for folder_path, files in _iter_folder_files(tree):
+                self.put_folder_files(folder_path, files)
+        elif "info_modules.json" in artifacts:
+            self.put_module_tree(artifacts["info_modules.json"])
+        for json_name, stage in [
+            ("info_files.json", ROOT_FILES),
+            ("info_files_extended.json", ROOT_FILES_LOW_LEVEL),
+        ]:
+            if json_name in artifacts:
+                self.put_root_files(artifacts[json_name], stage)
+
+
+def export_analyses(db_path: str, folder: str, artifact_format: str = "json") -> list:
+    """Exports the analyses of a store file as info_* files, see AnalysisStore.export."""
+    store = AnalysisStore(db_path)
+    try:
+        return store.export(folder, artifact_format)
+    finally:
+        store.close()
+
+
+def _iter_folder_files(tree: dict):
+    pending = [tree]
+    while pending:
+        folder_dict = pending.pop()
+        if "current_folder" in folder_dict:
+            yield folder_dict["current_folder"], folder_dict.get("files", [])
+        pending += list(folder_dict.get("subfolders", {}).values())
@@ -0,0 +1,144 @@
+import os
+import json
+from typing import Iterator, Optional
+
+from readmate.utils.logger import set_logger
+
+_logger = set_logger()
+
+FORMATS = {"json": ".json", "jsonl": ".jsonl"}
+# Key of the children of a folder in the module trees, split into lines of their own
+CHILDREN_KEY = "subfolders"
+
+
+def artifact_name(json_name: str, artifact_format: str = "json") -> str:
+    """File name of an intermediate artefact, info_modules.json, in the given format."""
+    return os.path.splitext(json_name)[0] + FORMATS[artifact_format]
+
+
+def find_artifact(folder: str, json_name: str) -> Optional[str]:
+    """Path of the artefact in the folder whatever its format, None if there is none."""
+    for artifact_format in FORMATS:
+        path = os.path.join(folder, artifact_name(json_name, artifact_format))
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _iter_records(data: dict, path: tuple = ()):
+    children = data.get(CHILDREN_KEY)
+    # Anything but a non-empty mapping of folders stays in the line of its parent
+    if (
+        isinstance(children, dict)
+        and children
+        and all(isinstance(child, dict) for child in children.values())
+    ):
+        yield path, {key: value for key, value in data.items() if key != CHILDREN_KEY}
+        for name, child in children.items():
+            yield from _iter_records(child, path + (name,))
+    else:
+        yield path, data
+
+
+def write_artifact(output_path: str, data: dict):
+    """
+    Writes an analysis in the format given by the extension of the path: indented JSON,
+    or compact JSON lines, one line per folder of the tree with its key path first, so a
+    subtree can be read back without parsing the rest of the file (see CompactTree).
+    """
+    if output_path.endswith(FORMATS["jsonl"]):
+        with open(output_path, "w", encoding="utf-8") as file:
+            for path, node in _iter_records(data):
+                file.write(json.dumps(list(path), ensure_ascii=False))
+                # json.dumps escapes tabs and newlines, they only separate the fields
+                file.write("\t")
+                file.write(json.dumps(node, ensure_ascii=False, separators=(",", ":")))
+                file.write("\n")
+    else:
+        with open(output_path, "w") as json_file:
+            json.dump(data, json_file, indent=4, sort_keys=True)
+
+
+def load_artifact(file_path: str) -> dict:
+    """Loads a whole analysis written by write_artifact, in either format."""
+    if file_path.endswith(FORMATS["jsonl"]):
+        data = CompactTree(file_path).subtree()
+    else:
+        with open(file_path, "r") as file:
+            data = json.load(file)
+    _logger.info(f"Artefact loaded: {file_path}")
+    return data
+
+
+def export_json(file_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Exports a compact artefact as indented JSON, next to it by default.
+
+    Returns:
+        str: Path of the JSON file.
+    """
+    output_path = output_path or os.path.splitext(file_path)[0] + FORMATS["json"]
+    write_artifact(output_path, load_artifact(file_path))
+    _logger.info(f"{file_path} exported to {output_path}")
+    return output_path
+
+
+class CompactTree:
+    """
+    Lazy reader of a JSON lines artefact. Opening it only reads the key path at the
+    start of each line to index the line offsets; the folders are parsed when asked for,
+    alone (node) or with everything below them (subtree).
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.offsets: dict = {}
+        with open(file_path, "rb") as file:
+            offset = 0
+            for line in file:
+                path, _, _ = line.partition(b"\t")
+                self.offsets[tuple(json.loads(path))] = offset
+                offset += len(line)
+
+    def __contains__(self, path: tuple) -> bool:
+        return tuple(path) in self.offsets
+
+    def paths(self) -> Iterator[tuple]:
+        """Key paths of the folders, parents before their children."""
+        return iter(self.offsets)
+
+    def children(self, path: tuple = ()) -> list:
+        """Names of the subfolders of a folder."""
+        path = tuple(path)
+        return [
+            other[-1]
+            for other in self.offsets
+            if len(other) == len(path) + 1 and other[: len(path)] == path
+        ]
+
+    def _read(self, file, path: tuple) -> dict:
+        file.seek(self.offsets[path])
+        _, _, node = file.readline().partition(b"\t")
+        return json.loads(node)
+
+    def node(self, path: tuple = ()) -> dict:
+        """A folder without its subfolders."""
+        with open(self.file_path, "rb") as file:
+            return self._read(file, tuple(path))
+
+    def subtree(self, path: tuple = ()) -> dict:
+        """A folder with all its subfolders, as it was written."""
+        path = tuple(path)
+        if path not in self.offsets:
+            raise KeyError(path)
+        nodes = {}
+        with open(self.file_path, "rb") as file:
+            # Parents come first in the file, so each node finds its parent built
+            for other in self.offsets:
+                if other[: len(path)] != path:
+                    continue
+                node = nodes[other] = self._read(file, other)
+                if other != path:
+                    parent = nodes[other[:-1]]
+                    parent.setdefault(CHILDREN_KEY, {})[other[-1]] = node
+        return nodes[path]
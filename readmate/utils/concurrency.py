@@ -0,0 +1,67 @@
+import asyncio
+import weakref
+
+from readmate.utils.utils_tools import load_pipeline_config
+
+# One semaphore per event loop: asyncio primitives cannot be shared between loops
+_llm_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """
+    Returns the semaphore that limits the LLM calls in flight for the running event loop.
+    Every ChatMessageChain acquires it, so the limit is shared by all the stages.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _llm_semaphores:
+        _llm_semaphores[loop] = asyncio.Semaphore(
+            load_pipeline_config()["concurrency"]["max_llm_calls"]
+        )
+    return _llm_semaphores[loop]
+
+
+async def run_dag(nodes: dict) -> dict:
+    """
+    Runs a set of coroutines that depend on each other, starting each one as soon as
+    the nodes it depends on have finished instead of in a fixed sequence.
+
+    Args:
+        nodes (dict): Maps each node name to a tuple (coroutine_function, dependencies),
+            where dependencies is a list with the names of the nodes that must finish first.
+
+    Returns:
+        dict: The result of each node, by name.
+    """
+    for name, (_, dependencies) in nodes.items():
+        missing = [dep for dep in dependencies if dep not in nodes]
+        if missing:
+            raise ValueError(f"Node '{name}' depends on unknown nodes: {missing}")
+
+    # Kahn's algorithm: a cycle would leave its nodes waiting on each other forever
+    pending = {name: set(dependencies) for name, (_, dependencies) in nodes.items()}
+    while pending:
+        ready = [name for name, dependencies in pending.items() if not dependencies]
+        if not ready:
+            raise ValueError(f"Dependency cycle between nodes: {sorted(pending)}")
+        for name in ready:
+            del pending[name]
+        for dependencies in pending.values():
+            dependencies.difference_update(ready)
+
+    tasks = {}
+
+    async def run_node(name):
+        coroutine_function, dependencies = nodes[name]
+        await asyncio.gather(*(tasks[dep] for dep in dependencies))
+        return await coroutine_function()
+
+    for name in nodes:
+        tasks[name] = asyncio.ensure_future(run_node(name))
+
+    try:
+        results = await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return dict(zip(tasks.keys(), results))
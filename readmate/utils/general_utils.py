@@ -3,6 +3,8 @@ import tiktoken
 import shutil
 import zipfile
 
+from readmate.utils.artifact_store import find_artifact
+
 
 def num_tokens_from_string(string: str, encoding_name: str) -> int:
     """Returns the number of tokens in a text string."""
@@ -84,7 +86,8 @@ def is_zip_file(input_dir: str) -> bool:
 
 def check_required_files(input_folder: str, readmateagent) -> bool:
     """
-    Check if the input_folder contains the four required files.
+    Check if the input_folder contains the analysis store of a run, or the four required
+    files in either artefact format.
 
     Args:
         input_folder (str): The path to the input folder.
@@ -99,10 +102,11 @@ def check_required_files(input_folder: str, readmateagent) -> bool:
         readmateagent.INFO_MODULES_EXTENDED_JSON,
     ]
 
+    if os.path.isfile(os.path.join(input_folder, readmateagent.ANALYSIS_DB)):
+        return True
+
     # Check if all required files exist in the input_folder
-    return all(
-        os.path.isfile(os.path.join(input_folder, file)) for file in required_files
-    )
+    return all(find_artifact(input_folder, file) is not None for file in required_files)
 
 
 def clean_project(directory, logger):
@@ -0,0 +1,120 @@
+from readmate.utils.utils_tools import load_pipeline_config
+
+SCALARS = (str, int, float, bool, type(None))
+
+
+def json_to_minimal_text(data, indent=0):
+    text = ""
+    indent_str = " " * indent
+
+    if isinstance(data, dict):
+        for key, value in data.items():
+            text += f"{indent_str}{key}: "  # No newline after key
+            if isinstance(value, (dict, list)):
+                text += "\n" + json_to_minimal_text(value, indent + 2)
+            else:
+                text += f"{value}\n"
+    elif isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict):
+                text += json_to_minimal_text(item, indent)
+            else:
+                text += f"{indent_str}{item}\n"
+    else:
+        text += f"{indent_str}{data}\n"
+
+    return text.strip()
+
+
+def _cell(value) -> str:
+    if isinstance(value, list):
+        value = ", ".join(str(item) for item in value)
+    return str(value).replace("\n", " ").replace("|", "/")
+
+
+def _table_keys(records: list):
+    """Shared keys of a list of flat records, or None when they cannot form a table."""
+    if len(records) < 2 or not all(isinstance(record, dict) for record in records):
+        return None
+    keys = list(records[0])
+    for record in records:
+        if list(record) != keys:
+            return None
+        for value in record.values():
+            if not isinstance(value, SCALARS) and not (
+                isinstance(value, list) and all(isinstance(v, SCALARS) for v in value)
+            ):
+                return None
+    return keys
+
+
+def json_to_table_text(data, indent=0):
+    """
+    Same layout as json_to_minimal_text, but sibling records sharing the same keys are
+    factored into a header line and one row per record, so each key is written once,
+    and lists of plain values are written inline.
+    """
+    lines = []
+    indent_str = " " * indent
+
+    if isinstance(data, dict):
+        keys = _table_keys(list(data.values()))
+        if keys:
+            lines.append(f"{indent_str}name | " + " | ".join(keys))
+            for name, record in data.items():
+                cells = [_cell(record[key]) for key in keys]
+                lines.append(f"{indent_str}{name} | " + " | ".join(cells))
+        else:
+            for key, value in data.items():
+                if isinstance(value, list) and all(
+                    isinstance(item, SCALARS) for item in value
+                ):
+                    lines.append(f"{indent_str}{key}: {_cell(value)}")
+                elif isinstance(value, (dict, list)):
+                    lines.append(f"{indent_str}{key}:")
+                    lines.append(json_to_table_text(value, indent + 2))
+                else:
+                    lines.append(f"{indent_str}{key}: {value}")
+    elif isinstance(data, list):
+        keys = _table_keys(data)
+        if keys:
+            lines.append(indent_str + " | ".join(keys))
+            for record in data:
+                lines.append(indent_str + " | ".join(_cell(record[k]) for k in keys))
+        else:
+            for item in data:
+                if isinstance(item, (dict, list)):
+                    lines.append(json_to_table_text(item, indent))
+                else:
+                    lines.append(f"{indent_str}{item}")
+    else:
+        lines.append(f"{indent_str}{data}")
+
+    return "\n".join(line for line in lines if line)
+
+
+SERIALIZERS = {
+    "minimal": json_to_minimal_text,
+    "table": json_to_table_text,
+}
+
+
+def serialize_prompt_value(value, serialization_format: str = None):
+    """
+    Renders a structured prompt input (dict or list) as compact text. Strings and other
+    values are returned unchanged, as is everything when the format is "repr", which
+    keeps the Python representation PromptTemplate would produce.
+
+    Args:
+        value: The prompt input.
+        serialization_format (str, optional): "minimal", "table" or "repr". Defaults to
+            the format in the [serialization] table of pipeline.toml.
+    """
+    serialization_format = (
+        serialization_format or load_pipeline_config()["serialization"]["format"]
+    )
+    if serialization_format == "repr" or not isinstance(value, (dict, list)):
+        return value
+    if serialization_format not in SERIALIZERS:
+        raise ValueError(f"Unknown prompt serialization format: {serialization_format}")
+    return SERIALIZERS[serialization_format](value)
@@ -0,0 +1,171 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from readmate.utils.logger import set_logger
+from readmate.utils.utils_tools import load_pipeline_config
+
+_logger = set_logger()
+
+# Budget of the run the current task works for, inherited by the tasks and threads it
+# starts, so concurrent runs (batch, service) each spend their own budget
+_current_budget: ContextVar = ContextVar("run_budget", default=None)
+
+
+def current_budget() -> Optional["RunBudget"]:
+    return _current_budget.get()
+
+
+class RunBudget:
+    """
+    Token, dollar and wall time ceilings of a run. Every model call reserves its estimated
+    tokens first and is skipped if the reservation does not fit, so concurrent calls
+    cannot overshoot the budget together. As the remaining share of the tightest limit
+    goes down, the pipeline degrades step by step:
+
+    - SHALLOW: the files of low-rated modules are not read by the low-level analysis;
+    - DETERMINISTIC: README sections are written from the analyses, without the model;
+    - EXHAUSTED: no more model calls, the remaining steps use their default answers.
+    """
+
+    FULL, SHALLOW, DETERMINISTIC, EXHAUSTED = range(4)
+    LEVEL_NAMES = ["full", "shallow", "deterministic", "exhausted"]
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        max_seconds: Optional[float] = None,
+        shallow_below: float = 0.5,
+        deterministic_below: float = 0.15,
+        min_rating: int = 6,
+        output_tokens: int = 800,
+    ):
+        """
+        Args:
+            max_tokens (int, optional): Prompt and completion tokens of the run.
+            max_cost (float, optional): Dollars spent by the run.
+            max_seconds (float, optional): Wall time of the run, from its start.
+            shallow_below (float): Remaining share under which modules rated below
+                min_rating are not read.
+            deterministic_below (float): Remaining share under which the README sections
+                are written without the model.
+            min_rating (int): Lowest module rating still read in the SHALLOW level.
+            output_tokens (int): Completion tokens reserved for each call, on top of its
+                estimated prompt.
+        """
+        self.max_tokens = max_tokens or None
+        self.max_cost = max_cost or None
+        self.max_seconds = max_seconds or None
+        self.shallow_below = shallow_below
+        self.deterministic_below = deterministic_below
+        self.min_rating = min_rating
+        self.output_tokens = output_tokens
+
+        self.tokens = 0
+        self.cost = 0.0
+        self.reserved_tokens = 0
+        self.skipped_calls = 0
+        self.started = None
+        self._level = self.FULL
+        # Calls are charged from the event loop and from worker threads
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, **overrides) -> "RunBudget":
+        """Budget of pipeline.toml [budget], with the non-empty overrides applied."""
+        config = dict(load_pipeline_config()["budget"])
+        config.update({key: value for key, value in overrides.items() if value})
+        return cls(**config)
+
+    @property
+    def limited(self) -> bool:
+        return any([self.max_tokens, self.max_cost, self.max_seconds])
+
+    @contextmanager
+    def activate(self):
+        """Makes this the budget of the model calls made inside the block."""
+        if self.started is None:
+            self.started = time.monotonic()
+        token = _current_budget.set(self)
+        try:
+            yield self
+        finally:
+            _current_budget.reset(token)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started if self.started is not None else 0.0
+
+    def remaining_share(self) -> float:
+        """Remaining share of the tightest limit, 1.0 without limits."""
+        shares = [1.0]
+        if self.max_tokens:
+            spent = self.tokens + self.reserved_tokens
+            shares.append(1 - spent / self.max_tokens)
+        if self.max_cost:
+            shares.append(1 - self.cost / self.max_cost)
+        if self.max_seconds:
+            shares.append(1 - self.elapsed() / self.max_seconds)
+        return min(shares)
+
+    def level(self) -> int:
+        remaining = self.remaining_share()
+        if remaining <= 0:
+            level = self.EXHAUSTED
+        elif remaining < self.deterministic_below:
+            level = self.DETERMINISTIC
+        elif remaining < self.shallow_below:
+            level = self.SHALLOW
+        else:
+            level = self.FULL
+
+        # Degradation only goes one way, a finished call must not bring a level back
+        if level > self._level:
+            self._level = level
+            _logger.warning(
+                f"Run budget {self.LEVEL_NAMES[level]}: {self.report()}, "
+                f"{remaining:.0%} left"
+            )
+        return self._level
+
+    def _estimated_cost(self, tokens: int) -> float:
+        # Price per token of the calls made so far, nothing is known before the first one
+        return self.cost / self.tokens * tokens if self.tokens else 0.0
+
+    def reserve(self, tokens: int) -> bool:
+        """
+        Reserves the estimated tokens of a model call, False if the call does not fit in
+        the budget and must be skipped.
+        """
+        with self._lock:
+            fits = self.level() < self.EXHAUSTED
+            if fits and self.max_tokens:
+                fits = self.tokens + self.reserved_tokens + tokens <= self.max_tokens
+            if fits and self.max_cost:
+                fits = self.cost + self._estimated_cost(tokens) <= self.max_cost
+            if fits:
+                self.reserved_tokens += tokens
+            else:
+                self.skipped_calls += 1
+            return fits
+
+    def release(self, tokens: int):
+        """Frees the reservation of a finished call, its real usage is charged apart."""
+        with self._lock:
+            self.reserved_tokens -= tokens
+
+    def charge(self, tokens: int, cost: float):
+        with self._lock:
+            self.tokens += tokens
+            self.cost += cost
+
+    def report(self) -> dict:
+        return {
+            "tokens": self.tokens,
+            "cost": round(self.cost, 4),
+            "seconds": round(self.elapsed(), 1),
+            "skipped_calls": self.skipped_calls,
+            "level": self.LEVEL_NAMES[self._level],
+        }
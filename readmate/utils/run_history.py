@@ -0,0 +1,295 @@
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from readmate.utils.logger import set_logger
+
+_logger = set_logger()
+
+# Measurements of the run the current task works for, see RunStats.activate
+_current_stats: ContextVar = ContextVar("run_stats", default=None)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    project TEXT NOT NULL,
+    model TEXT,
+    status TEXT NOT NULL,
+    seconds REAL,
+    files INTEGER,
+    folders INTEGER,
+    bytes INTEGER,
+    calls INTEGER,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cost REAL
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prompts (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    prompt_type TEXT NOT NULL,
+    response_model TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    p50_seconds REAL,
+    p95_seconds REAL,
+    max_seconds REAL
+);
+CREATE TABLE IF NOT EXISTS caches (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    cache TEXT NOT NULL,
+    hits INTEGER NOT NULL,
+    misses INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_project ON runs (project, started);
+CREATE INDEX IF NOT EXISTS prompts_run ON prompts (run_id);
+CREATE INDEX IF NOT EXISTS stages_run ON stages (run_id);
+"""
+
+
+def current_stats() -> Optional["RunStats"]:
+    return _current_stats.get()
+
+
+def percentile(values: list, share: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+class RunStats:
+    """
+    Measurements of one run: every model call (prompt type, response schema, latency,
+    tokens), the duration of the stages and the hit rates of the caches.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.stages = {}
+        self.caches = {}
+        self._stage_started = {}
+        # Calls are recorded from the event loop and from worker threads
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """Makes this the recorder of the model calls made inside the block."""
+        token = _current_stats.set(self)
+        try:
+            yield self
+        finally:
+            _current_stats.reset(token)
+
+    def record_call(
+        self,
+        prompt_type: str,
+        response_model: str,
+        seconds: float,
+        input_tokens: int,
+        output_tokens: int,
+    ):
+        with self._lock:
+            self.calls.append(
+                (prompt_type, response_model, seconds, input_tokens, output_tokens)
+            )
+
+    def stage_event(self, stage: str, status: str):
+        """Times a stage from its progress events, started then completed."""
+        if status == "started":
+            self._stage_started[stage] = time.perf_counter()
+        elif status == "completed" and stage in self._stage_started:
+            self.stages[stage] = time.perf_counter() - self._stage_started.pop(stage)
+
+    def record_cache(self, name: str, hits: int, misses: int):
+        self.caches[name] = (hits, misses)
+
+    def count_cache(self, name: str, hit: bool):
+        """Counts one lookup of a cache whose hits are only known one at a time."""
+        with self._lock:
+            hits, misses = self.caches.get(name, (0, 0))
+            self.caches[name] = (hits + hit, misses + (not hit))
+
+    def prompt_summary(self) -> dict:
+        """Calls, tokens and latency percentiles by prompt type."""
+        grouped = {}
+        for prompt_type, response_model, seconds, input_tokens, output_tokens in list(
+            self.calls
+        ):
+            group = grouped.setdefault(
+                prompt_type,
+                {
+                    "response_model": response_model,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "latencies": [],
+                },
+            )
+            group["input_tokens"] += input_tokens
+            group["output_tokens"] += output_tokens
+            group["latencies"].append(seconds)
+
+        return {
+            prompt_type: {
+                "response_model": group["response_model"],
+                "calls": len(group["latencies"]),
+                "input_tokens": group["input_tokens"],
+                "output_tokens": group["output_tokens"],
+                "seconds": sum(group["latencies"]),
+                "p50_seconds": percentile(group["latencies"], 0.5),
+                "p95_seconds": percentile(group["latencies"], 0.95),
+                "max_seconds": max(group["latencies"]),
+            }
+            for prompt_type, group in grouped.items()
+        }
+
+
+class RunHistory:
+    """
+    Local SQLite history of the runs, one row per run with its stages, prompt types and
+    caches in side tables. It feeds the history command and calibrates the dry run
+    planner with the output tokens and latencies actually observed.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(db_path, timeout=60)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def record(self, run: dict, stats: RunStats) -> int:
+        """
+        Stores a run in a single transaction.
+
+        Args:
+            run (dict): Values of the runs table (project, model, status, seconds, repo
+                size metrics, cost...), started defaulting to now.
+            stats (RunStats): Measurements of the run.
+
+        Returns:
+            int: Id of the run.
+        """
+        prompts = stats.prompt_summary()
+        row = {
+            "started": time.time(),
+            "calls": sum(prompt["calls"] for prompt in prompts.values()),
+            "input_tokens": sum(prompt["input_tokens"] for prompt in prompts.values()),
+            "output_tokens": sum(
+                prompt["output_tokens"] for prompt in prompts.values()
+            ),
+            **run,
+        }
+        with self.connection:
+            run_id = self.connection.execute(
+                f"INSERT INTO runs ({', '.join(row)}) "
+                f"VALUES ({', '.join('?' * len(row))})",
+                list(row.values()),
+            ).lastrowid
+            self.connection.executemany(
+                "INSERT INTO stages (run_id, stage, seconds) VALUES (?, ?, ?)",
+                [(run_id, stage, seconds) for stage, seconds in stats.stages.items()],
+            )
+            self.connection.executemany(
+                "INSERT INTO prompts (run_id, prompt_type, response_model, calls, "
+                "input_tokens, output_tokens, seconds, p50_seconds, p95_seconds, "
+                "max_seconds) VALUES (:run_id, :prompt_type, :response_model, "
+                ":calls, :input_tokens, :output_tokens, :seconds, :p50_seconds, "
+                ":p95_seconds, :max_seconds)",
+                [
+                    {"run_id": run_id, "prompt_type": prompt_type, **prompt}
+                    for prompt_type, prompt in prompts.items()
+                ],
+            )
+            self.connection.executemany(
+                "INSERT INTO caches (run_id, cache, hits, misses) VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, cache, hits, misses)
+                    for cache, (hits, misses) in stats.caches.items()
+                ],
+            )
+        return run_id
+
+    def runs(self, project: Optional[str] = None, limit: int = 20) -> list:
+        """Latest runs, of one project if given, newest first."""
+        query = "SELECT * FROM runs"
+        params = []
+        if project:
+            query += " WHERE project = ?"
+            params.append(project)
+        query += " ORDER BY started DESC LIMIT ?"
+        rows = self.connection.execute(query, params + [limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def prompt_report(self, model: Optional[str] = None, last_runs: int = 50) -> list:
+        """
+        Averages by model and prompt type over the latest runs, to compare them before
+        and after a prompt or model change.
+        """
+        query = """
+            SELECT r.model, p.prompt_type, p.response_model, SUM(p.calls) AS calls,
+                SUM(p.input_tokens) * 1.0 / SUM(p.calls) AS input_tokens,
+                SUM(p.output_tokens) * 1.0 / SUM(p.calls) AS output_tokens,
+                SUM(p.seconds) / SUM(p.calls) AS seconds,
+                MAX(p.p95_seconds) AS p95_seconds
+            FROM prompts AS p JOIN runs AS r ON r.id = p.run_id
+            WHERE r.id IN (
+                SELECT id FROM runs WHERE (:model IS NULL OR model = :model)
+                ORDER BY started DESC LIMIT :last_runs
+            )
+            GROUP BY r.model, p.prompt_type, p.response_model
+            ORDER BY r.model, p.prompt_type
+        """
+        rows = self.connection.execute(
+            query, {"model": model, "last_runs": last_runs}
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def response_model_averages(
+        self, model: Optional[str] = None, last_runs: int = 50
+    ) -> dict:
+        """
+        Output tokens and latency of a call by response schema over the latest runs of a
+        model, as used by the planner.
+
+        Returns:
+            dict: Response schema -> {"output_tokens": ..., "seconds": ...}.
+        """
+        averages = {}
+        for row in self.prompt_report(model, last_runs):
+            group = averages.setdefault(
+                row["response_model"], {"calls": 0, "output_tokens": 0, "seconds": 0}
+            )
+            group["calls"] += row["calls"]
+            group["output_tokens"] += row["output_tokens"] * row["calls"]
+            group["seconds"] += row["seconds"] * row["calls"]
+        return {
+            response_model: {
+                "output_tokens": group["output_tokens"] / group["calls"],
+                "seconds": group["seconds"] / group["calls"],
+            }
+            for response_model, group in averages.items()
+        }
+
+    def stage_averages(self, project: Optional[str] = None) -> dict:
+        """Average duration of each stage, over the runs of a project if given."""
+        rows = self.connection.execute(
+            "SELECT s.stage, AVG(s.seconds) FROM stages AS s "
+            "JOIN runs AS r ON r.id = s.run_id "
+            "WHERE (:project IS NULL OR r.project = :project) GROUP BY s.stage",
+            {"project": project},
+        ).fetchall()
+        return {stage: seconds for stage, seconds in rows}
@@ -0,0 +1,82 @@
+import os
+import json
+import asyncio
+import threading
+from typing import Any, Optional
+
+from readmate.utils.logger import set_logger
+
+_logger = set_logger()
+
+
+class RunJournal:
+    """
+    Append-only journal of the units of work completed in a workspace (a file, a folder, a
+    stage...). Each unit is written to journal.jsonl with its result as soon as it finishes,
+    so a run that dies can be resumed on the same workspace, skipping what is already done.
+    """
+
+    JOURNAL_FILE = "journal.jsonl"
+
+    def __init__(self, workspace_path: str):
+        self.file_path = os.path.join(workspace_path, self.JOURNAL_FILE)
+        self.entries: dict = {}
+        # Units recorded from the worker threads of arecord are appended one at a time
+        self._write_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            lines = file.readlines()
+        if lines and not lines[-1].endswith("\n"):
+            # Terminate a line cut short by a crash, so the next record starts on its own
+            with open(self.file_path, "a", encoding="utf-8") as file:
+                file.write("\n")
+
+        for line_number, line in enumerate(lines, 1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # The last line can be cut short by a crash while it was written
+                _logger.warning(
+                    f"Skipping unreadable journal line {line_number} in {self.file_path}"
+                )
+                continue
+            self.entries[(record["stage"], record["unit"])] = record["result"]
+        if self.entries:
+            _logger.info(
+                f"Resuming from {self.file_path}: {len(self.entries)} completed units"
+            )
+
+    def done(self, stage: str, unit: str) -> bool:
+        return (stage, unit) in self.entries
+
+    def get(self, stage: str, unit: str, default: Any = None) -> Optional[Any]:
+        return self.entries.get((stage, unit), default)
+
+    def record(self, stage: str, unit: str, result: Any = True):
+        """Journals a completed unit of work with its (JSON serializable) result."""
+        self._append(self._entry(stage, unit, result))
+
+    async def arecord(self, stage: str, unit: str, result: Any = True):
+        """
+        record for the coroutines: the result is serialized right away, the write and
+        fsync of its line run in a worker thread instead of blocking the event loop.
+        """
+        await asyncio.to_thread(self._append, self._entry(stage, unit, result))
+
+    def _entry(self, stage: str, unit: str, result: Any) -> str:
+        self.entries[(stage, unit)] = result
+        return json.dumps({"stage": stage, "unit": unit, "result": result})
+
+    def _append(self, line: str):
+        with self._write_lock:
+            with open(self.file_path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+
+    def completed(self, stage: str) -> int:
+        return sum(1 for entry_stage, _ in self.entries if entry_stage == stage)
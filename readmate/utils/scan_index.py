@@ -0,0 +1,46 @@
+import os
+
+from readmate.utils.logger import set_logger
+
+_logger = set_logger()
+
+
+class ScanIndex:
+    """
+    Single walk over a project folder, shared by the stages that need its file list
+    (project inspector, project tree, preflight checks...) instead of each one walking
+    the tree again.
+    """
+
+    def __init__(self, root_path: str):
+        self.root_path = root_path
+        self.file_paths: list = []
+        self.dir_paths: list = []
+        self._sizes: dict = {}
+        self._scan()
+
+    def _scan(self):
+        for root, dirs, files in os.walk(self.root_path):
+            for directory in dirs:
+                self.dir_paths.append(os.path.join(root, directory))
+            for file in files:
+                self.file_paths.append(os.path.join(root, file))
+
+        _logger.info(
+            f"Scan index built for {self.root_path}: {len(self.file_paths)} files, {len(self.dir_paths)} folders"
+        )
+
+    def relative_path(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.root_path)
+
+    def size(self, file_path: str) -> int:
+        """Size in bytes of an indexed file, cached after the first lookup."""
+        if file_path not in self._sizes:
+            try:
+                self._sizes[file_path] = os.path.getsize(file_path)
+            except OSError:
+                self._sizes[file_path] = 0
+        return self._sizes[file_path]
+
+    def __len__(self):
+        return len(self.file_paths)
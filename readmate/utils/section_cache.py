@@ -0,0 +1,83 @@
+import os
+import copy
+import json
+import hashlib
+from typing import Optional
+
+from readmate.utils.logger import set_logger
+
+_logger = set_logger()
+
+SECTION_CACHE_FOLDER = "section_cache"
+
+
+class SectionCache:
+    """
+    Rendered README sections stored with a hash of their exact inputs (projected
+    context, prompts, model). On regeneration, a section whose inputs did not change is
+    spliced back from the previous run instead of prompting the model again.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.sections: dict = {}
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, "r", encoding="utf-8") as file:
+                    self.sections = json.load(file)
+            except (OSError, ValueError) as e:
+                _logger.warning(f"Section cache {file_path} ignored: {e}")
+
+    @staticmethod
+    def digest(*inputs) -> str:
+        """SHA-256 of the inputs serialized as canonical JSON."""
+        payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, section: str, digest: str) -> Optional[str]:
+        entry = self.sections.get(section)
+        if entry and entry["digest"] == digest:
+            self.hits += 1
+            _logger.info(f"Section '{section}' unchanged, reused from the previous run")
+            # A copy, so that the caller can not change the cached output
+            return copy.deepcopy(entry["output"])
+        self.misses += 1
+        return None
+
+    def put(self, section: str, digest: str, output):
+        self.sections[section] = {"digest": digest, "output": copy.deepcopy(output)}
+        # Written right away, so the sections survive a run interrupted halfway
+        self._write()
+
+    def _write(self):
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump(self.sections, file, indent=4, sort_keys=True)
+
+    def save(self):
+        self._write()
+        _logger.info(
+            f"Section cache saved to {self.file_path} ({self.hits} reused, {self.misses} generated)"
+        )
+
+
+def project_cache_path(output_dir: str, input_dir: str) -> str:
+    """
+    Section cache shared by the runs of a project in output_dir, whose workspaces are
+    new for each run: output_dir/section_cache/<project name>.json. Projects with the
+    same name only share entries when the inputs of a section are identical.
+
+    Args:
+        output_dir (str): Folder where the workspaces of the runs are created.
+        input_dir (str): Folder or zip file of the project.
+
+    Returns:
+        str: Path of the section cache of the project.
+    """
+    project_name = os.path.basename(os.path.normpath(input_dir))
+    if project_name.endswith(".zip"):
+        project_name = project_name[: -len(".zip")]
+    cache_folder = os.path.join(output_dir, SECTION_CACHE_FOLDER)
+    os.makedirs(cache_folder, exist_ok=True)
+    return os.path.join(cache_folder, f"{project_name}.json")
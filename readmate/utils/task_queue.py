@@ -0,0 +1,244 @@
+import json
+import time
+import sqlite3
+from typing import Any, Optional
+
+from readmate.utils.logger import set_logger
+
+_logger = set_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    UNIQUE (kind, unit)
+);
+CREATE TABLE IF NOT EXISTS task_deps (
+    task_id INTEGER NOT NULL REFERENCES tasks (id),
+    dep_id INTEGER NOT NULL REFERENCES tasks (id),
+    PRIMARY KEY (task_id, dep_id)
+);
+"""
+
+# Claimable: pending or with an expired lease, and every dependency done
+CLAIMABLE = """
+SELECT id, kind, unit, payload, attempts FROM tasks AS t
+WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < :now))
+    AND attempts < :max_attempts
+    AND NOT EXISTS (
+        SELECT 1 FROM task_deps AS d JOIN tasks AS p ON p.id = d.dep_id
+        WHERE d.task_id = t.id AND p.status != 'done'
+    )
+ORDER BY id LIMIT 1
+"""
+
+
+class Task:
+    def __init__(self, task_id: int, kind: str, unit: str, payload: Any, attempts: int):
+        self.id = task_id
+        self.kind = kind
+        self.unit = unit
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.kind}, {self.unit})"
+
+
+class TaskQueue:
+    """
+    Durable queue of units of work in a SQLite file, shared by worker processes on one
+    machine or on machines mounting the same filesystem. A worker claims a task with a
+    lease that it renews while working; when the lease expires (the worker died or hung)
+    the task can be claimed again. Results are only accepted from the current lease
+    owner, so a worker that lost its lease cannot overwrite the result of the next one.
+
+    The default rollback journal is kept rather than WAL, which does not work on network
+    filesystems; those still need working POSIX locks (NFS with lockd, for instance).
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        # Autocommit mode, transactions are opened explicitly
+        self.connection = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def _transaction(self):
+        """Write transaction taking the database lock up front, so claims never race."""
+        return _Transaction(self.connection)
+
+    def add(self, kind: str, unit: str, payload: Any = None, deps: list = ()) -> int:
+        """
+        Adds a task, once: adding the same (kind, unit) again returns the existing id.
+
+        Args:
+            kind (str): Type of work, selects the function running the task.
+            unit (str): Unit of work of that kind (a folder, a file, a section...).
+            payload (Any, optional): JSON serializable input of the task.
+            deps (list, optional): Ids of the tasks that must be done before this one.
+
+        Returns:
+            int: Id of the task.
+        """
+        with self._transaction():
+            row = self.connection.execute(
+                "SELECT id FROM tasks WHERE kind = ? AND unit = ?", (kind, unit)
+            ).fetchone()
+            if row:
+                return row[0]
+            task_id = self.connection.execute(
+                "INSERT INTO tasks (kind, unit, payload) VALUES (?, ?, ?)",
+                (kind, unit, json.dumps(payload)),
+            ).lastrowid
+            self.connection.executemany(
+                "INSERT INTO task_deps (task_id, dep_id) VALUES (?, ?)",
+                [(task_id, dep_id) for dep_id in deps],
+            )
+        return task_id
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[Task]:
+        """Leases the next task whose dependencies are done, None if there is none."""
+        now = time.time()
+        with self._transaction():
+            self._fail_exhausted(now)
+            row = self.connection.execute(
+                CLAIMABLE, {"now": now, "max_attempts": self.max_attempts}
+            ).fetchone()
+            if row is None:
+                return None
+            task_id, kind, unit, payload, attempts = row
+            self.connection.execute(
+                "UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (owner, now + lease_seconds, task_id),
+            )
+        return Task(task_id, kind, unit, json.loads(payload), attempts + 1)
+
+    def renew(self, task: Task, owner: str, lease_seconds: float) -> bool:
+        """Extends the lease of a task, False if the owner lost it."""
+        cursor = self.connection.execute(
+            "UPDATE tasks SET lease_expires = ? "
+            "WHERE id = ? AND owner = ? AND status = 'leased'",
+            (time.time() + lease_seconds, task.id, owner),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, task: Task, owner: str, result: Any = None) -> bool:
+        """Stores the result of a task, False if the owner lost its lease."""
+        cursor = self.connection.execute(
+            "UPDATE tasks SET status = 'done', result = ?, lease_expires = NULL "
+            "WHERE id = ? AND owner = ? AND status = 'leased'",
+            (json.dumps(result), task.id, owner),
+        )
+        if cursor.rowcount != 1:
+            _logger.warning(f"{task} finished after its lease was lost, result ignored")
+        return cursor.rowcount == 1
+
+    def fail(self, task: Task, owner: str, error: str):
+        """
+        Gives a failed task back to the queue, or marks it failed, along with every task
+        depending on it, once it used all its attempts.
+        """
+        with self._transaction():
+            cursor = self.connection.execute(
+                "UPDATE tasks SET status = 'pending', owner = NULL, "
+                "lease_expires = NULL, error = ? "
+                "WHERE id = ? AND owner = ? AND status = 'leased'",
+                (error, task.id, owner),
+            )
+            if cursor.rowcount == 1 and task.attempts >= self.max_attempts:
+                self._mark_failed([task.id])
+
+    def _fail_exhausted(self, now: float):
+        """Fails the tasks whose last attempt ran out of lease."""
+        rows = self.connection.execute(
+            "SELECT id FROM tasks WHERE status = 'leased' AND lease_expires < ? "
+            "AND attempts >= ?",
+            (now, self.max_attempts),
+        ).fetchall()
+        if rows:
+            self._mark_failed([row[0] for row in rows])
+
+    def _mark_failed(self, task_ids: list):
+        # Dependent tasks can never run, they fail too so workers do not wait for them
+        while task_ids:
+            self.connection.executemany(
+                "UPDATE tasks SET status = 'failed', owner = NULL, lease_expires = NULL "
+                "WHERE id = ?",
+                [(task_id,) for task_id in task_ids],
+            )
+            placeholders = ",".join("?" * len(task_ids))
+            task_ids = [
+                row[0]
+                for row in self.connection.execute(
+                    "SELECT DISTINCT d.task_id FROM task_deps AS d "
+                    "JOIN tasks AS t ON t.id = d.task_id "
+                    f"WHERE d.dep_id IN ({placeholders}) AND t.status != 'failed'",
+                    task_ids,
+                )
+            ]
+
+    def drained(self) -> bool:
+        """True when no task is waiting or running anymore."""
+        row = self.connection.execute(
+            "SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')"
+        ).fetchone()
+        return row[0] == 0
+
+    def _value(self, column: str, kind: str, unit: str) -> Any:
+        row = self.connection.execute(
+            f"SELECT {column} FROM tasks WHERE kind = ? AND unit = ?", (kind, unit)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No {kind} task for {unit}")
+        return json.loads(row[0]) if row[0] is not None else None
+
+    def payload(self, kind: str, unit: str) -> Any:
+        return self._value("payload", kind, unit)
+
+    def result(self, kind: str, unit: str) -> Any:
+        """Result of a task, None until it is done."""
+        return self._value("result", kind, unit)
+
+    def results(self, kind: str) -> dict:
+        """Results of the done tasks of a kind, by unit."""
+        return {
+            unit: json.loads(result)
+            for unit, result in self.connection.execute(
+                "SELECT unit, result FROM tasks WHERE kind = ? AND status = 'done'",
+                (kind,),
+            )
+        }
+
+    def counts(self) -> dict:
+        """Number of tasks by status."""
+        return dict(
+            self.connection.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            ).fetchall()
+        )
+
+
+class _Transaction:
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        return False
@@ -1,5 +1,12 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from readmate.utils.logger import set_logger
 
+# Name of the project the current task works for, inherited by the tasks and threads
+# it starts, so concurrent projects of a batch get their own token usage
+_usage_scope: ContextVar = ContextVar("usage_scope", default=None)
+
 
 class TokenUsageTracker:
     _instance = None
@@ -10,17 +17,71 @@ class TokenUsageTracker:
             # Place any initialization here
             cls._instance.token_usage = 0
             cls._instance.total_cost = 0
+            # prompt type -> [calls, tokens as Python repr, tokens once serialized]
+            cls._instance.serialization_savings = {}
+            # scope -> {"tokens": ..., "cost": ...}
+            cls._instance.scope_usage = {}
             cls._instance.logger = set_logger()
         return cls._instance
 
+    @contextmanager
+    def scope(self, name: str):
+        """Attributes the tokens and cost logged inside the block to `name`."""
+        self.scope_usage.setdefault(name, {"tokens": 0, "cost": 0})
+        token = _usage_scope.set(name)
+        try:
+            yield
+        finally:
+            _usage_scope.reset(token)
+
+    def get_scope_usage(self, name: str) -> dict:
+        return dict(self.scope_usage.get(name, {"tokens": 0, "cost": 0}))
+
+    def _log_scope_usage(self, key: str, value):
+        name = _usage_scope.get()
+        if name is not None:
+            self.scope_usage.setdefault(name, {"tokens": 0, "cost": 0})[key] += value
+
     def log_token_usage(self, tokens_used: int):
         self.token_usage += tokens_used
+        self._log_scope_usage("tokens", tokens_used)
         self.persist_token_usage()
 
     def log_cost(self, cost: float):
         self.total_cost += cost
+        self._log_scope_usage("cost", cost)
         self.persist_total_cost()
 
+    def log_serialization(
+        self, prompt_type: str, repr_tokens: int, compact_tokens: int
+    ):
+        savings = self.serialization_savings.setdefault(prompt_type, [0, 0, 0])
+        savings[0] += 1
+        savings[1] += repr_tokens
+        savings[2] += compact_tokens
+
+    def serialization_report(self) -> dict:
+        """Input tokens saved by the compact prompt serialization, by prompt type."""
+        return {
+            prompt_type: {
+                "calls": calls,
+                "repr_tokens": repr_tokens,
+                "compact_tokens": compact_tokens,
+                "saved": round(1 - compact_tokens / repr_tokens, 3),
+            }
+            for prompt_type, (calls, repr_tokens, compact_tokens) in sorted(
+                self.serialization_savings.items()
+            )
+        }
+
+    def log_serialization_report(self):
+        for prompt_type, report in self.serialization_report().items():
+            self.logger.info(
+                f"Prompt serialization [{prompt_type}]: {report['repr_tokens']} -> "
+                f"{report['compact_tokens']} input tokens in {report['calls']} calls "
+                f"({report['saved']:.0%} saved)"
+            )
+
     def get_total_usage(self):
         return self.token_usage
 
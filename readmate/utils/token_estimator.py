@@ -0,0 +1,295 @@
+import os
+import string
+from typing import Optional
+
+import tiktoken
+import toml
+
+from readmate.utils.logger import set_logger
+
+_logger = set_logger()
+
+CALIBRATION_PATH = "readmate/configs/token_estimator.toml"
+DEFAULT_KIND = "default"
+
+# Every byte is mapped to a class letter: L(etter), D(igit), S(pace), N(ewline, tab,
+# carriage return), P(unctuation) and U (part of a non ASCII character)
+_CLASSES = bytearray(b"U" * 256)
+for _byte in range(128):
+    _CLASSES[_byte] = ord("P")
+for _chars, _class in [
+    (string.ascii_letters + "_", "L"),
+    (string.digits, "D"),
+    (" ", "S"),
+    ("\n\t\r\x0b\x0c", "N"),
+]:
+    for _char in _chars:
+        _CLASSES[ord(_char)] = ord(_class)
+CLASS_TABLE = bytes(_CLASSES)
+
+
+def _runs_table(characters: str) -> bytes:
+    """Maps the given characters to 1 and the others to 0, b"01" then counts the runs."""
+    return bytes(ord("1" if chr(byte) in characters else "0") for byte in range(256))
+
+
+WORDS = _runs_table(string.ascii_letters + "_")
+SPACE_RUNS = _runs_table(" ")
+PUNCTUATION_RUNS = _runs_table(
+    "".join(chr(byte) for byte in range(128) if CLASS_TABLE[byte] == ord("P"))
+)
+DIGIT_RUNS = _runs_table(string.digits)
+NON_ASCII_RUNS = _runs_table("".join(chr(byte) for byte in range(128, 256)))
+UPPERCASE = _runs_table(string.ascii_uppercase)
+
+# Long texts are described by SAMPLE_WINDOWS windows of WINDOW_CHARS characters
+SAMPLE_WINDOWS = 8
+WINDOW_CHARS = 1024
+
+FEATURES = [
+    "letters",
+    "words",
+    "digits",
+    "spaces",
+    "space_runs",
+    "newlines",
+    "punctuation",
+    "non_ascii",
+    "punctuation_runs",
+    "digit_runs",
+    "non_ascii_runs",
+    "uppercase",
+]
+
+
+def _class_counts(data: bytes) -> list:
+    classes = data.translate(CLASS_TABLE)
+    return [
+        classes.count(b"L"),
+        (b"0" + data.translate(WORDS)).count(b"01"),
+        classes.count(b"D"),
+        classes.count(b"S"),
+        (b"0" + data.translate(SPACE_RUNS)).count(b"01"),
+        classes.count(b"N"),
+        classes.count(b"P"),
+        classes.count(b"U"),
+        (b"0" + data.translate(PUNCTUATION_RUNS)).count(b"01"),
+        (b"0" + data.translate(DIGIT_RUNS)).count(b"01"),
+        (b"0" + data.translate(NON_ASCII_RUNS)).count(b"01"),
+        data.translate(UPPERCASE).count(b"1"),
+    ]
+
+
+def text_features(text: str) -> list:
+    """
+    Counts the character classes of a text, in the order of FEATURES. Each count is a
+    pass of bytes.translate or bytes.count over the UTF-8 bytes, far cheaper than BPE.
+    Texts longer than SAMPLE_WINDOWS * WINDOW_CHARS characters are only counted on
+    evenly spaced windows, and the counts scaled to their length.
+
+    Args:
+        text (str): Text to describe.
+
+    Returns:
+        list: Counts of the character classes and of their runs.
+    """
+    length = len(text)
+    if length <= SAMPLE_WINDOWS * WINDOW_CHARS:
+        return _class_counts(text.encode("utf-8", errors="surrogatepass"))
+
+    step = (length - WINDOW_CHARS) / (SAMPLE_WINDOWS - 1)
+    counts = [0] * len(FEATURES)
+    for window in range(SAMPLE_WINDOWS):
+        start = int(window * step)
+        sample = text[start : start + WINDOW_CHARS]
+        window_counts = _class_counts(sample.encode("utf-8", errors="surrogatepass"))
+        counts = [total + count for total, count in zip(counts, window_counts)]
+    scale = length / (SAMPLE_WINDOWS * WINDOW_CHARS)
+    return [count * scale for count in counts]
+
+
+def _solve(matrix: list, vector: list) -> list:
+    """Solves a small linear system by Gauss-Jordan elimination with partial pivoting."""
+    size = len(vector)
+    rows = [list(row) + [value] for row, value in zip(matrix, vector)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(rows[row][column]))
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        if abs(rows[column][column]) < 1e-9:
+            # Feature absent from the samples, its coefficient stays 0
+            rows[column] = [0.0] * column + [1.0] + [0.0] * (size - column)
+            continue
+        for row in range(size):
+            if row != column:
+                factor = rows[row][column] / rows[column][column]
+                rows[row] = [a - factor * b for a, b in zip(rows[row], rows[column])]
+    return [rows[row][size] / rows[row][row] for row in range(size)]
+
+
+def calibrate(
+    samples: list, abs_error: int = 16, quantile: float = 0.995, margin: float = 1.1
+) -> dict:
+    """
+    Fits the coefficients of a file type on (text, exact tokens) samples, by least
+    squares weighted by 1 / tokens so that the relative error is minimized, and
+    measures the error bound of the fitted estimator on them.
+
+    Args:
+        samples (list): (text, exact token count) pairs.
+        abs_error (int, optional): Tokens of error tolerated on any text, which covers
+            the short texts where a relative bound means little.
+        quantile (float, optional): Share of the samples the bound must cover.
+        margin (float, optional): Factor applied to the relative error at quantile.
+
+    Returns:
+        dict: Coefficients, in the order of FEATURES, rel_error and abs_error. The
+            exact count of the quantile share of the samples is within
+            estimate * rel_error + abs_error of the estimate.
+    """
+    features = [text_features(text) for text, _ in samples]
+    weights = [1.0 / max(tokens, 1) for _, tokens in samples]
+    size = len(FEATURES)
+    # Normal equations, with a small ridge for the features absent from the samples
+    gram = [
+        [
+            sum(w * row[i] * row[j] for row, w in zip(features, weights))
+            + (1e-3 if i == j else 0.0)
+            for j in range(size)
+        ]
+        for i in range(size)
+    ]
+    moments = [
+        sum(
+            w * row[i] * tokens
+            for row, w, (_, tokens) in zip(features, weights, samples)
+        )
+        for i in range(size)
+    ]
+    coefficients = [round(value, 6) for value in _solve(gram, moments)]
+
+    errors = []
+    for row, (_, tokens) in zip(features, samples):
+        estimate = max(sum(c * f for c, f in zip(coefficients, row)), 1.0)
+        errors.append(max((abs(estimate - tokens) - abs_error) / estimate, 0.0))
+    errors.sort()
+    rel_error = errors[int(quantile * (len(errors) - 1))] * margin
+    return {
+        "coefficients": coefficients,
+        "rel_error": round(rel_error, 4),
+        "abs_error": abs_error,
+    }
+
+
+class TokenEstimator:
+    """
+    Token counts estimated from the character classes of a text, calibrated per file
+    type against tiktoken (readmate/configs/token_estimator.toml, refitted with
+    tests/benchmark_token_estimator.py). The exact count of a text is within
+    estimate * rel_error + abs_error of the estimate for 99.5% of the calibration
+    samples, so threshold decisions only encode the texts whose estimate falls in that
+    band. The rare texts outside it are decided as if they were at the band edge.
+    """
+
+    def __init__(
+        self,
+        calibration: Optional[dict] = None,
+        encoding_name: str = "cl100k_base",
+    ):
+        """
+        Args:
+            calibration (dict, optional): Content of token_estimator.toml, read on first
+                use if not provided.
+            encoding_name (str, optional): Encoding of the exact counts.
+        """
+        self._calibration = calibration
+        self.encoding_name = encoding_name
+        # Threshold decisions taken, and those that needed the exact encoding
+        self.decisions = 0
+        self.exact_counts = 0
+
+    @property
+    def calibration(self) -> dict:
+        if self._calibration is None:
+            with open(CALIBRATION_PATH, "r") as toml_file:
+                self._calibration = toml.load(toml_file)
+        return self._calibration
+
+    @property
+    def encoding(self):
+        return tiktoken.get_encoding(self.encoding_name)
+
+    def kind_of(self, file_path: str) -> str:
+        """File type calibration used for a file, from its extension."""
+        extension = os.path.splitext(file_path)[1][1:].lower()
+        return self.calibration["extensions"].get(extension, DEFAULT_KIND)
+
+    def _kind(self, kind: str) -> dict:
+        kinds = self.calibration["kinds"]
+        return kinds.get(kind, kinds[DEFAULT_KIND])
+
+    def estimate(self, text: str, kind: str = DEFAULT_KIND) -> int:
+        """Estimated tokens of a text."""
+        coefficients = self._kind(kind)["coefficients"]
+        features = text_features(text)
+        return max(round(sum(c * f for c, f in zip(coefficients, features))), 0)
+
+    def bounds(self, text: str, kind: str = DEFAULT_KIND) -> tuple:
+        """Lowest and highest token counts of a text allowed by the error bound."""
+        calibration = self._kind(kind)
+        estimate = self.estimate(text, kind)
+        error = estimate * calibration["rel_error"] + calibration["abs_error"]
+        return max(int(estimate - error), 0), int(estimate + error) + 1
+
+    def count(self, text: str) -> int:
+        """Exact tokens of a text."""
+        self.exact_counts += 1
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def exceeds(self, text: str, limit: int, kind: str = DEFAULT_KIND) -> bool:
+        """
+        Whether a text has more than limit tokens, encoded only when its estimate is
+        too close to the limit to decide.
+
+        Args:
+            text (str): Text to measure.
+            limit (int): Token limit.
+            kind (str, optional): File type calibration of the text.
+
+        Returns:
+            bool: True if the text has more than limit tokens.
+        """
+        self.decisions += 1
+        low, high = self.bounds(text, kind)
+        if low > limit:
+            return True
+        if high <= limit:
+            return False
+        return self.count(text) > limit
+
+    def capped_count(self, text: str, limit: int, kind: str = DEFAULT_KIND) -> int:
+        """Tokens of a text up to limit, encoded only when they may be under it."""
+        self.decisions += 1
+        if self.bounds(text, kind)[0] >= limit:
+            return limit
+        return min(self.count(text), limit)
+
+    def truncate(self, text: str, limit: int, kind: str = DEFAULT_KIND) -> str:
+        """
+        First limit tokens of a text. Texts that are surely within the limit are
+        returned as they are, without encoding them.
+        """
+        self.decisions += 1
+        if self.bounds(text, kind)[1] <= limit:
+            return text
+        self.exact_counts += 1
+        encoding = self.encoding
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= limit:
+            return text
+        return encoding.decode(tokens[:limit])
+
+    def stats(self) -> dict:
+        return {"decisions": self.decisions, "exact_counts": self.exact_counts}
+
+
+TOKEN_ESTIMATOR = TokenEstimator()
@@ -1,12 +1,13 @@
 import os
 import toml
 import json
-import tiktoken
+from functools import lru_cache
+from collections import deque
 from langchain_openai import AzureChatOpenAI, ChatOpenAI
 
 from readmate.utils.logger import set_logger
-from readmate.utils.general_utils import num_tokens_from_string
-from readmate.modules.python_analyzer import PythonFileAnalyzer
+from readmate.utils.token_estimator import TOKEN_ESTIMATOR
+from readmate.modules.python_analyzer import ANALYSIS_CACHE
 
 from typing import Optional
 
@@ -40,6 +41,17 @@ def load_toml(file_path):
     return toml_data
 
 
+@lru_cache(maxsize=None)
+def load_pipeline_config(file_path="readmate/configs/pipeline.toml"):
+    """
+    Load the pipeline settings (concurrency, ...) once per process.
+
+    :param file_path: The path to the pipeline TOML file.
+    :return: The loaded TOML data as a dictionary. It is shared, do not modify it.
+    """
+    return load_toml(file_path)
+
+
 # Define a condition for retry: return True (retry) if result is None
 def is_none(result):
     return result is None
@@ -112,18 +124,15 @@ def read_text_file(file_path: str, token_limit: int = 200) -> (str, bool):
 
     # Check if the file is a Python file and call another function if needed
     if file_path.endswith(".py"):
-        return PythonFileAnalyzer(file_path).analyze(), True
+        return ANALYSIS_CACHE.analyze(file_path), True
 
     # TODO: V2: Launch GeneralFileAnalyzer
     try:
         with open(file_path, "r", encoding="utf-8") as file:
             read_file = file.read()
-            token_counter = num_tokens_from_string(read_file, "cl100k_base")
-
-            if token_counter > token_limit:
-                encoding = tiktoken.get_encoding("cl100k_base")
-                return encoding.decode(encoding.encode(read_file)[:token_limit]), False
-            return read_file, False
+            # Only encoded when it may be over token_limit
+            kind = TOKEN_ESTIMATOR.kind_of(file_path)
+            return TOKEN_ESTIMATOR.truncate(read_file, token_limit, kind), False
     except FileNotFoundError:
         _logger.error(f"File not found: {file_path}")
         raise
@@ -217,3 +226,36 @@ def filter_keys_recursively(data, keys, crucial_keys):
     else:
         # Non-dictionary and non-list items get returned as is
         return data
+
+
+def remove_empty_values(data):
+    """
+    Recursively remove key-value pairs from a dictionary where the value is empty.
+    An empty value is defined as None, an empty string, list, or dictionary.
+    """
+    if isinstance(data, dict):
+        return {
+            key: remove_empty_values(value)
+            for key, value in data.items()
+            if value or isinstance(value, (int, float))
+        }
+    elif isinstance(data, list):
+        return [
+            remove_empty_values(item)
+            for item in data
+            if item or isinstance(item, (int, float))
+        ]
+    else:
+        return data
+
+
+def iter_folders(json_module_dict):
+    """
+    Yields every folder dict of a module tree exactly once, breadth first: the folders of
+    each level before those of the next one.
+    """
+    pending = deque([json_module_dict])
+    while pending:
+        folder_dict = pending.popleft()
+        yield folder_dict
+        pending.extend(folder_dict.get("subfolders", {}).values())
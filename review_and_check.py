@@ -1,7 +1,10 @@
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
 from tqdm import tqdm
-from readmate.utils.general_utils import num_tokens_from_string
-from readmate.utils.utils_tools import load_toml
+from readmate.utils.scan_index import ScanIndex
+from readmate.utils.token_estimator import TOKEN_ESTIMATOR
+from readmate.utils.utils_tools import load_pipeline_config, load_toml
 from readmate.utils.logger import set_logger
 
 
@@ -10,10 +13,26 @@ _logger = set_logger()
 TOKEN_LIMITER = 100000
 FILE_COUNTER = 400
 LANGUAGE_KEY_EXTENSION = "py"
+# Characters read per counted token: a prefix this long holds the token_read tokens of
+# any ordinary text, the rest of the file is only estimated from its size
+PREFIX_CHARS_PER_TOKEN = 16
 
 
 class Reviewandcheck:
-    def __init__(self, folder_path: str, project_extensions_path) -> None:
+    def __init__(
+        self,
+        folder_path: str,
+        project_extensions_path,
+        enforce_size_limits=True,
+        scan_index: Optional[ScanIndex] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        # Runs with a budget are held by it instead of being refused for their size
+        self.enforce_size_limits = enforce_size_limits
+        # Shared file list of the project, built here if not provided
+        self.scan_index = scan_index
+        # Files read at the same time, pipeline.toml [preflight] if not provided
+        self.workers = workers or load_pipeline_config()["preflight"]["workers"]
         self.project_extensions_path = project_extensions_path
         self.read_token_counter = 0
         self.total_token_counter = 0
@@ -23,7 +42,7 @@ class Reviewandcheck:
         self.python_flag = False
 
     def max_token_exception(self):
-        if self.read_token_counter > TOKEN_LIMITER:
+        if self.enforce_size_limits and self.read_token_counter > TOKEN_LIMITER:
             exception_message = "Max read token reached: {}".format(
                 self.read_token_counter
             )
@@ -37,7 +56,7 @@ class Reviewandcheck:
             return True, None
 
     def max_files_exception(self):
-        if self.file_counter > FILE_COUNTER:
+        if self.enforce_size_limits and self.file_counter > FILE_COUNTER:
             exception_message = "Max total files reached: {}".format(self.file_counter)
             return False, exception_message
         else:
@@ -46,68 +65,117 @@ class Reviewandcheck:
     def python_exception(self):
         pass
 
-    def list_all_files_recursively(self, folder_path):
-        """Generator that yields file paths in the given folder and its subfolders."""
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                yield os.path.join(root, file)
+    def measure_file(self, file_path):
+        """
+        Counts the tokens of a file toward the read budget from a bounded prefix of it,
+        and estimates its total tokens from its size.
+
+        Args:
+            file_path (str): Path of a supported file.
+
+        Returns:
+            tuple: Read tokens (exact, at most token_read) and total tokens (exact under
+                token_read, estimated otherwise), or None if the file can not be read.
+        """
+        kind = TOKEN_ESTIMATOR.kind_of(file_path)
+        prefix_chars = self.token_read * PREFIX_CHARS_PER_TOKEN
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                prefix = file.read(prefix_chars)
+                complete = len(prefix) < prefix_chars or not file.read(1)
+                # Only the prefixes that may be under token_read are encoded
+                tokens = TOKEN_ESTIMATOR.capped_count(prefix, self.token_read, kind)
+                if not complete and tokens < self.token_read:
+                    # Unusually long tokens (whitespace runs, minified data...)
+                    prefix += file.read()
+                    complete = True
+                    tokens = TOKEN_ESTIMATOR.capped_count(prefix, self.token_read, kind)
+            file_bytes = os.path.getsize(file_path)
+        except Exception as e:
+            _logger.info(f"Error reading file {file_path}: {e}")
+            return None
+
+        if tokens < self.token_read:
+            return tokens, tokens
+
+        # The rest of the file is assumed to have the bytes per token of its prefix
+        prefix_bytes = len(prefix.encode("utf-8"))
+        total_tokens = (
+            TOKEN_ESTIMATOR.estimate(prefix, kind) * file_bytes / prefix_bytes
+        )
+        return self.token_read, max(round(total_tokens), self.token_read)
+
+    def add_measure(self, read_tokens, total_tokens):
+        """Adds the tokens of a file to the counters and checks the limits."""
+        self.file_counter += 1
+        self.read_token_counter += read_tokens
+        self.total_token_counter += total_tokens
+
+        status_tokens, msg_exception_tokens = self.max_token_exception()
+        status_files, msg_exception_files = self.max_files_exception()
+
+        if not status_tokens or not status_files:
+            if msg_exception_tokens is not None:
+                msg_to_return = msg_exception_tokens
+            else:
+                msg_to_return = msg_exception_files
+
+            return False, msg_to_return
+        return True, None
 
     def read_file(self, file_path, supported_list_extensions):
-        """Reads and prints the content of the given file."""
+        """Counts the tokens of the given file if its extension is supported."""
         _, file_extension = os.path.splitext(file_path)
 
         if file_extension[1:] == LANGUAGE_KEY_EXTENSION:
             self.python_flag = True
 
         if file_extension[1:] in supported_list_extensions:
-            try:
-                with open(file_path, "r", encoding="utf-8") as file:
-                    tokens = num_tokens_from_string(
-                        file.read(), encoding_name="cl100k_base"
-                    )
-
-                    self.file_counter += 1
-                    # _logger.info(f"Tokens of {file_path}: {tokens}")
-
-                    if tokens < self.token_read:
-                        self.read_token_counter += tokens
-                    else:
-                        self.read_token_counter += self.token_read
-                    self.total_token_counter += tokens
-                    # _logger.info("--------------------------------------------------")
-
-                    status_tokens, msg_exception_tokens = self.max_token_exception()
-                    status_files, msg_exception_files = self.max_files_exception()
-
-                    if not status_tokens or not status_files:
-                        if msg_exception_tokens is not None:
-                            msg_to_return = msg_exception_tokens
-                        else:
-                            msg_to_return = msg_exception_files
-
-                        return (
-                            False,
-                            msg_to_return,
-                        )
-                    else:
-                        return True, _
-
-            except Exception as e:
-                _logger.info(f"Error reading file {file_path}: {e}")
-
-        return True, _
+            measure = self.measure_file(file_path)
+            if measure is not None:
+                return self.add_measure(*measure)
+
+        return True, None
 
     def read_all_files_in_folder(self):
+        """
+        Checks the project is small enough to be documented and contains python code.
+        The supported files are read by parallel workers, and the check stops as soon
+        as a limit is exceeded.
+
+        Returns:
+            tuple: Whether the project passed the checks, and the reason if not.
+        """
         extension_support = load_toml(self.project_extensions_path)
-
         supported_list_extensions = list(extension_support["extensions"].keys())
-        """Lists and then reads the content of all files in the specified folder."""
-        for file_path in tqdm(self.list_all_files_recursively(self.folder_path)):
-            status, msg_status = self.read_file(file_path, supported_list_extensions)
 
-            if not status:
-                _logger.error(msg_status)
-                return False, msg_status
+        scan_index = self.scan_index or ScanIndex(self.folder_path)
+        extensions = [
+            os.path.splitext(file_path)[1][1:] for file_path in scan_index.file_paths
+        ]
+        self.python_flag = LANGUAGE_KEY_EXTENSION in extensions
+        supported_files = [
+            file_path
+            for file_path, extension in zip(scan_index.file_paths, extensions)
+            if extension in supported_list_extensions
+        ]
+
+        # Every file is counted on its own, so the first exceeded limit ends the check
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(self.measure_file, file_path)
+                for file_path in supported_files
+            ]
+            for future in tqdm(as_completed(futures), total=len(futures)):
+                measure = future.result()
+                if measure is None:
+                    continue
+                status, msg_status = self.add_measure(*measure)
+                if not status:
+                    for pending in futures:
+                        pending.cancel()
+                    _logger.error(msg_status)
+                    return False, msg_status
 
         if not self.python_flag:
             msg_python_error = "This project does not contain any python code"
@@ -116,7 +184,7 @@ class Reviewandcheck:
 
         _logger.info("--------------------------------------------------")
         _logger.info(
-            f"Total Tokens of the project {self.folder_path}: {self.total_token_counter}"
+            f"Total Tokens of the project {self.folder_path} (estimated): {self.total_token_counter}"
         )
         _logger.info("--------------------------------------------------")
         _logger.info(
@@ -0,0 +1,280 @@
+import os
+import re
+import json
+import math
+import time
+import tempfile
+from typing import Any, List, Optional
+
+import tiktoken
+from langchain_community.callbacks.openai_info import (
+    get_openai_token_cost_for_model,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.pydantic_v1 import Field
+
+from batch_runner import prepare_project
+from readmate.readmate_agent import ReadMateAgent
+from readmate.utils.logger import set_logger
+from readmate.utils.run_budget import RunBudget
+from readmate.utils.run_history import RunHistory
+from readmate.utils.utils_tools import load_pipeline_config
+
+_logger = set_logger()
+
+PLAN_JSON = "plan.json"
+
+# Format instructions of the PydanticOutputParser: the JSON schema in a code block
+SCHEMA_BLOCK = re.compile(r"```\s*(\{.*\})\s*```", re.DOTALL)
+EMPTY_VALUES = {"string": "Planned", "array": [], "object": {}}
+# Tokens added by the chat format around each message
+MESSAGE_OVERHEAD = 4
+# Model calls on the longest dependency chain of each phase: a module, then its files;
+# the overview, then the features table
+CHAIN_DEPTH = {"analysis": 2, "readme": 2}
+
+
+class PlanningChatModel(BaseChatModel):
+    """
+    Chat model of the dry run. Records the rendered prompt of every call, with the
+    prompt type and response schema passed by ChatMessageChain, and answers at once
+    with an empty instance of the requested schema so the pipeline carries on.
+
+    Output tokens come from the run history averages of the response schema when there
+    are some (see load_calibration), from [planner.output_tokens] otherwise.
+    """
+
+    calls: List[dict] = Field(default_factory=list)
+    output_tokens: dict = Field(default_factory=dict)
+    calibration: dict = Field(default_factory=dict)
+    # Pipeline phase of the calls being made, "analysis" until the README starts
+    phase: str = "analysis"
+
+    @property
+    def _llm_type(self) -> str:
+        return "planning"
+
+    def _answer(self, messages: List[BaseMessage], run_manager) -> ChatResult:
+        metadata = run_manager.metadata if run_manager else {}
+        encoding = tiktoken.get_encoding(encoding_name="cl100k_base")
+        input_tokens = sum(
+            len(encoding.encode(message.content, disallowed_special=()))
+            + MESSAGE_OVERHEAD
+            for message in messages
+        )
+        response_model = metadata.get("response_model", "text")
+        call = {
+            "prompt_type": metadata.get("prompt_type", "unknown"),
+            "response_model": response_model,
+            "phase": self.phase,
+            "input_tokens": input_tokens,
+            "output_tokens": self.output_tokens.get(
+                response_model, self.output_tokens.get("default", 0)
+            ),
+        }
+        if response_model in self.calibration:
+            observed = self.calibration[response_model]
+            call["output_tokens"] = round(observed["output_tokens"])
+            call["seconds"] = observed["seconds"]
+        self.calls.append(call)
+
+        match = SCHEMA_BLOCK.search(messages[0].content)
+        if match:
+            properties = json.loads(match.group(1)).get("properties", {})
+            content = json.dumps(
+                {
+                    name: EMPTY_VALUES.get(details.get("type"), "")
+                    for name, details in properties.items()
+                }
+            )
+        else:
+            content = "Planned"
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=content))]
+        )
+
+    def _generate(
+        self,
+        messages,
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ):
+        return self._answer(messages, run_manager)
+
+    async def _agenerate(
+        self,
+        messages,
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ):
+        return self._answer(messages, run_manager)
+
+    def track_progress(self, event: dict):
+        """Progress callback of the planned run, switches phase when the README starts."""
+        if event["stage"] == "readme" and event["status"] == "started":
+            self.phase = "readme"
+
+
+def call_seconds(call: dict, config: dict) -> float:
+    """
+    Predicted latency of a call: the mean latency observed in the run history for its
+    response schema, or the [planner] latency model.
+    """
+    if "seconds" in call:
+        return call["seconds"]
+    return (
+        config["seconds_per_call"]
+        + call["input_tokens"] / config["input_tokens_per_second"]
+        + call["output_tokens"] / config["output_tokens_per_second"]
+    )
+
+
+def phase_seconds(calls: list, phase: str, concurrency: int, config: dict) -> float:
+    """
+    Predicted wall time of the model calls of a phase: the longest of the work spread
+    over the concurrent slots, the dependency chain of the phase and the time the rate
+    limits need to let every call through.
+    """
+    if not calls:
+        return 0.0
+    latencies = [call_seconds(call, config) for call in calls]
+    bounds = [
+        sum(latencies) / concurrency,
+        CHAIN_DEPTH[phase] * max(latencies),
+    ]
+    if config["requests_per_minute"]:
+        bounds.append(len(calls) / config["requests_per_minute"] * 60)
+    if config["tokens_per_minute"]:
+        tokens = sum(call["input_tokens"] + call["output_tokens"] for call in calls)
+        bounds.append(tokens / config["tokens_per_minute"] * 60)
+    return max(bounds)
+
+
+def estimate_cost(model_name: str, input_tokens: int, output_tokens: int):
+    """Dollar cost at the OpenAI prices known to langchain, None for unknown models."""
+    try:
+        input_cost = get_openai_token_cost_for_model(model_name, input_tokens)
+        output_cost = get_openai_token_cost_for_model(
+            model_name, output_tokens, is_completion=True
+        )
+    except ValueError:
+        return None
+    return input_cost + output_cost
+
+
+def summarize_plan(
+    calls: list, local_seconds: float, model_name: str, config: Optional[dict] = None
+) -> dict:
+    """
+    Args:
+        calls (list): Calls recorded by the PlanningChatModel.
+        local_seconds (float): Duration of the dry run itself, the local work (copy,
+            scan, AST pass) without any model latency.
+        model_name (str): Model whose prices are used for the cost.
+        config (dict, optional): [planner] settings, from pipeline.toml if not provided.
+
+    Returns:
+        dict: Calls and tokens by prompt type and by phase, totals, cost and wall time.
+    """
+    config = config or load_pipeline_config()["planner"]
+    concurrency = load_pipeline_config()["concurrency"]["max_llm_calls"]
+
+    prompt_types, phases = {}, {}
+    for call in calls:
+        for groups, key in [
+            (prompt_types, call["prompt_type"]),
+            (phases, call["phase"]),
+        ]:
+            group = groups.setdefault(
+                key, {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+            )
+            group["calls"] += 1
+            group["input_tokens"] += call["input_tokens"]
+            group["output_tokens"] += call["output_tokens"]
+
+    for phase, group in phases.items():
+        phase_calls = [call for call in calls if call["phase"] == phase]
+        group["seconds"] = round(
+            phase_seconds(phase_calls, phase, concurrency, config), 1
+        )
+
+    input_tokens = sum(call["input_tokens"] for call in calls)
+    output_tokens = sum(call["output_tokens"] for call in calls)
+    cost = estimate_cost(model_name, input_tokens, output_tokens)
+    return {
+        "model": model_name,
+        "concurrency": concurrency,
+        "calls": len(calls),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost": round(cost, 4) if cost is not None else None,
+        "local_seconds": round(local_seconds, 1),
+        "seconds": math.ceil(
+            local_seconds + sum(group["seconds"] for group in phases.values())
+        ),
+        "phases": phases,
+        "prompt_types": dict(sorted(prompt_types.items())),
+    }
+
+
+def load_calibration(model_name: str) -> dict:
+    """
+    Output tokens and latency observed by response schema in the latest runs of the
+    model, {} when there is no run history.
+    """
+    history_config = load_pipeline_config()["history"]
+    if not history_config["path"] or not os.path.isfile(history_config["path"]):
+        return {}
+    history = RunHistory(history_config["path"])
+    try:
+        return history.response_model_averages(
+            model_name or None, history_config["calibration_runs"]
+        )
+    finally:
+        history.close()
+
+
+def plan_project(input_dir: str, workspace_folder: str) -> dict:
+    """
+    Dry run of the pipeline: the project is copied, scanned and parsed as in a real run,
+    in a scratch workspace, and every model call is recorded instead of being sent.
+
+    Args:
+        input_dir (str): Folder or zip file of the project.
+        workspace_folder (str): Folder where plan.json is written.
+
+    Returns:
+        dict: The plan, see summarize_plan, with the result of the review checks.
+    """
+    model_name = os.environ.get("MODEL", "")
+    model = PlanningChatModel(
+        output_tokens=dict(load_pipeline_config()["planner"]["output_tokens"]),
+        calibration=load_calibration(model_name),
+    )
+    started = time.perf_counter()
+    # The placeholder analyses must not be resumed or reused, they stay in scratch
+    with tempfile.TemporaryDirectory() as scratch_folder:
+        os.makedirs(os.path.join(scratch_folder, "logs"))
+        final_dst, status, journal = prepare_project(input_dir, scratch_folder)
+        ReadMateAgent(
+            input_path=final_dst,
+            workspace_path=scratch_folder,
+            output_path=scratch_folder,
+            llm_selection=model,
+            journal=journal,
+            progress_callback=model.track_progress,
+            # The whole pipeline is planned, whatever budget the real run gets
+            budget=RunBudget(),
+        ).run()
+
+    plan = summarize_plan(model.calls, time.perf_counter() - started, model_name)
+    plan["review_checks"] = status
+    plan["calibrated"] = sorted(model.calibration)
+    with open(os.path.join(workspace_folder, PLAN_JSON), "w") as file:
+        json.dump(plan, file, indent=4)
+    _logger.info(f"Run plan of {input_dir}: {plan['calls']} calls")
+    return plan
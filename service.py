@@ -0,0 +1,139 @@
+import os
+import json
+import asyncio
+import zipfile
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+
+from job_manager import JobManager
+from readmate.readmate_agent import ReadMateAgent
+from readmate.utils.analysis_store import export_analyses
+from readmate.utils.artifact_store import FORMATS
+from readmate.utils.logger import setup_logs_folder, set_logger
+from readmate.utils.setup_env import load_environment_variables
+from readmate.utils.utils_tools import load_pipeline_config
+
+load_environment_variables()
+
+OUTPUT_DIR = os.environ.get("READMATE_OUTPUT_DIR", "readmate/json_output")
+
+job_manager = JobManager(
+    output_dir=OUTPUT_DIR, history_path=load_pipeline_config()["history"]["path"]
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logs_folder(unique_dir=os.path.join(OUTPUT_DIR, "service"))
+    set_logger()
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+
+
+app = FastAPI(title="ReadMate", lifespan=lifespan)
+
+
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: Request, filename: str = "project.zip"):
+    """
+    Queues the documentation of a project. The request body is the zip file of the
+    project, the filename query parameter names the project.
+    """
+    if job_manager.is_full():
+        raise HTTPException(status_code=503, detail="Too many jobs queued, retry later")
+
+    max_bytes = load_pipeline_config()["service"]["max_upload_mb"] * 1024 * 1024
+    job = job_manager.create_job(filename)
+    try:
+        # The upload is written to disk as it arrives instead of being held in memory
+        size = 0
+        with open(job.upload_path, "wb") as file:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail="Zip file too large")
+                file.write(chunk)
+
+        if not zipfile.is_zipfile(job.upload_path):
+            raise HTTPException(
+                status_code=400, detail="The request body is not a zip file"
+            )
+
+        try:
+            job_manager.submit(job)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=503, detail="Too many jobs queued, retry later"
+            )
+    except Exception:
+        job_manager.discard(job)
+        raise
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    return get_job(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Progress of the job as server-sent events, ending when the job finishes."""
+    job = get_job(job_id)
+
+    async def event_stream():
+        async for event in job.iter_events():
+            yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+        yield f"event: end\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.get("/jobs/{job_id}/artifacts/{name}")
+async def job_artifact(job_id: str, name: str):
+    """
+    README (readme.md), analysis store (analysis.db) or analysis (info_*.json or
+    info_*.jsonl) of the job. The analyses are exported from the store on the first
+    request.
+    """
+    job = get_job(job_id)
+    artifacts = job.artifacts()
+    artifact_format = next(
+        (fmt for fmt, extension in FORMATS.items() if name.endswith(extension)), None
+    )
+    if (
+        name not in artifacts
+        and name.startswith("info_")
+        and artifact_format
+        and ReadMateAgent.ANALYSIS_DB in artifacts
+    ):
+        await asyncio.to_thread(
+            export_analyses,
+            artifacts[ReadMateAgent.ANALYSIS_DB],
+            job.workspace_folder,
+            artifact_format,
+        )
+        artifacts = job.artifacts()
+    if name not in artifacts:
+        raise HTTPException(status_code=404, detail=f"No {name} for job {job_id}")
+    return FileResponse(artifacts[name])
+
+
+if __name__ == "__main__":
+    # A single process: the workers, the queue and the caches live in its event loop
+    uvicorn.run(
+        app,
+        host=os.environ.get("READMATE_HOST", "127.0.0.1"),
+        port=int(os.environ.get("READMATE_PORT", "8000")),
+    )
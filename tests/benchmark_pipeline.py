@@ -0,0 +1,155 @@
+"""
+Wall-time benchmark of the ReadMateAgent pipeline with a fake chat model.
+
+Compares the stages run one after the other, each in its own event loop, with
+ReadMateAgent.arun(), which runs them in a single loop and overlaps the independent
+ones. Run from the repository root:
+
+    python -m tests.benchmark_pipeline --latency 0.2 --modules 6
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from readmate.readmate_agent import ReadMateAgent
+
+SCHEMA_BLOCK = re.compile(r"```\s*(\{.*\})\s*```", re.DOTALL)
+EMPTY_VALUES = {"string": "Generated text", "array": [], "object": {}}
+
+
+class LatencyChatModel(BaseChatModel):
+    """Fake chat model that waits `latency` seconds and answers with a valid JSON object
+    for the schema found in the format instructions, or with plain text otherwise.
+    Each answer reports `tokens_per_call` tokens of usage, priced as gpt-3.5-turbo."""
+
+    latency: float = 0.2
+    calls: int = 0
+    tokens_per_call: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "latency-fake"
+
+    def _answer(self, messages: List[BaseMessage]) -> ChatResult:
+        self.calls += 1
+        match = SCHEMA_BLOCK.search(messages[0].content)
+        if match:
+            properties = json.loads(match.group(1)).get("properties", {})
+            content = json.dumps(
+                {
+                    name: EMPTY_VALUES.get(details.get("type"), "")
+                    for name, details in properties.items()
+                }
+            )
+        else:
+            content = "Generated text"
+        usage = {
+            "prompt_tokens": self.tokens_per_call,
+            "completion_tokens": 0,
+            "total_tokens": self.tokens_per_call,
+        }
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=content))],
+            llm_output={"token_usage": usage, "model_name": "gpt-3.5-turbo"},
+        )
+
+    def _generate(
+        self,
+        messages,
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ):
+        time.sleep(self.latency)
+        return self._answer(messages)
+
+    async def _agenerate(
+        self,
+        messages,
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ):
+        await asyncio.sleep(self.latency)
+        return self._answer(messages)
+
+
+def create_project(root: str, modules: int, files_per_module: int):
+    for name in ["setup.py", "main.py", "config.yaml"]:
+        with open(os.path.join(root, name), "w") as file:
+            file.write(
+                "def main():\n    return 1\n" if name.endswith(".py") else "a: 1\n"
+            )
+    for module in range(modules):
+        # Every module has a nested submodule, so the tree has more than one level
+        for folder in [f"package_{module}", f"package_{module}/core"]:
+            folder = os.path.join(root, folder)
+            os.makedirs(folder)
+            create_module_files(folder, files_per_module)
+
+
+def create_module_files(folder: str, files_per_module: int):
+    for index in range(files_per_module):
+        with open(os.path.join(folder, f"file_{index}.py"), "w") as file:
+            file.write(
+                f"class Model{index}:\n    def run(self, x):\n        return x\n"
+            )
+
+
+def run_sequential(agent: ReadMateAgent):
+    """The stages in sequence, one event loop each, as the pipeline used to run."""
+    agent.main_folder_file_analysis()
+    agent.top_level_analysis_modules()
+    agent.low_level_analysis_files()
+    agent.low_level_analysis_modules()
+    agent.readme_generator()
+
+
+def benchmark(latency: float, modules: int, files_per_module: int) -> dict:
+    results = {}
+    for mode in ["sequential", "arun"]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            project = os.path.join(tmp_dir, "project")
+            workspace = os.path.join(tmp_dir, "workspace")
+            os.makedirs(project)
+            os.makedirs(os.path.join(workspace, "logs"))
+            create_project(project, modules, files_per_module)
+
+            llm = LatencyChatModel(latency=latency)
+            agent = ReadMateAgent(project, workspace, workspace, llm_selection=llm)
+
+            start = time.perf_counter()
+            if mode == "sequential":
+                run_sequential(agent)
+            else:
+                asyncio.run(agent.arun())
+            results[mode] = {
+                "seconds": round(time.perf_counter() - start, 2),
+                "llm_calls": llm.calls,
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--modules", type=int, default=6)
+    parser.add_argument("--files-per-module", type=int, default=4)
+    args = parser.parse_args()
+
+    results = benchmark(args.latency, args.modules, args.files_per_module)
+    for mode, result in results.items():
+        print(f"{mode:>10}: {result['seconds']}s, {result['llm_calls']} LLM calls")
+    print(
+        f"   speedup: {results['sequential']['seconds'] / results['arun']['seconds']:.2f}x"
+    )
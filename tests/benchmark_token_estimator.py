@@ -0,0 +1,192 @@
+"""
+Accuracy and speed of the TokenEstimator against the exact tiktoken encoding.
+
+Samples chunks of the files of a corpus, fits the file type calibrations on half of
+them and measures the error, the error bound coverage and the speed on the other half.
+With --write the calibrations are saved to readmate/configs/token_estimator.toml. Run
+from the repository root (the default corpus is the Python standard library and the
+installed packages):
+
+    python -m tests.benchmark_token_estimator --write
+"""
+
+import os
+import time
+import random
+import argparse
+import textwrap
+
+import tiktoken
+import toml
+
+from readmate.utils.token_estimator import (
+    CALIBRATION_PATH,
+    DEFAULT_KIND,
+    FEATURES,
+    TokenEstimator,
+    calibrate,
+)
+
+CALIBRATION_HEADER = """# token_estimator.toml
+# Calibrations of readmate/utils/token_estimator.py, written by
+# `python -m tests.benchmark_token_estimator --write`. A text is estimated at
+# sum(coefficients * character class counts) tokens, the class counts being in the order
+{features}
+# The exact cl100k_base count of 99.5% of the calibration samples is within
+# estimate * rel_error + abs_error tokens of the estimate. File types without enough
+# samples use the default calibration.
+
+"""
+
+# Text lengths (characters) of the speed measures
+SIZES = [("under 1k", 0, 1000), ("1k-10k", 1000, 10000), ("over 10k", 10000, 10**9)]
+
+
+def collect_samples(corpus: str, extensions: dict, files_per_kind: int, seed: int):
+    """
+    Chunks of random length (100 to 50000 characters) and offset of the corpus files,
+    grouped by file type.
+
+    Returns:
+        dict: File type -> list of (text, exact tokens) pairs.
+    """
+    paths = {}
+    for root, _, files in os.walk(corpus):
+        for name in files:
+            kind = extensions.get(os.path.splitext(name)[1][1:].lower())
+            if kind:
+                paths.setdefault(kind, []).append(os.path.join(root, name))
+
+    rng = random.Random(seed)
+    encoding = tiktoken.get_encoding("cl100k_base")
+    samples = {}
+    for kind, kind_paths in sorted(paths.items()):
+        rng.shuffle(kind_paths)
+        for path in kind_paths[:files_per_kind]:
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    text = file.read()
+            except (OSError, UnicodeDecodeError):
+                continue
+            if not text:
+                continue
+            length = int(10 ** rng.uniform(2, 4.7))
+            start = rng.randrange(max(len(text) - length, 0) + 1)
+            chunk = text[start : start + length]
+            samples.setdefault(kind, []).append(
+                (chunk, len(encoding.encode(chunk, disallowed_special=())))
+            )
+    samples[DEFAULT_KIND] = [
+        sample for kind in list(samples) for sample in samples[kind]
+    ]
+    return samples
+
+
+def speedup(estimator: TokenEstimator, kind: str, texts: list) -> float:
+    """Time of the exact encoding of the texts divided by the time of their estimate."""
+    encoding = tiktoken.get_encoding("cl100k_base")
+    started = time.perf_counter()
+    for text in texts:
+        estimator.estimate(text, kind)
+    estimate_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for text in texts:
+        encoding.encode(text, disallowed_special=())
+    return (time.perf_counter() - started) / max(estimate_seconds, 1e-9)
+
+
+def measure(estimator: TokenEstimator, kind: str, samples: list) -> dict:
+    texts = [text for text, _ in samples]
+    errors = sorted(
+        abs(estimator.estimate(text, kind) - tokens) / max(tokens, 1)
+        for text, tokens in samples
+    )
+    covered = 0
+    for text, tokens in samples:
+        low, high = estimator.bounds(text, kind)
+        covered += low <= tokens <= high
+
+    speedups = {}
+    for name, low, high in SIZES:
+        sized = [text for text in texts if low <= len(text) < high]
+        if sized:
+            speedups[name] = speedup(estimator, kind, sized)
+
+    # Share of the threshold decisions that need the exact encoding
+    decisions = {}
+    for limit in [200, 10000]:
+        estimator.decisions = estimator.exact_counts = 0
+        for text in texts:
+            estimator.exceeds(text, limit, kind)
+        decisions[limit] = estimator.exact_counts / len(texts)
+
+    return {
+        "samples": len(samples),
+        "mean_error": sum(errors) / len(errors),
+        "p95_error": errors[int(0.95 * (len(errors) - 1))],
+        "max_error": errors[-1],
+        "coverage": covered / len(samples),
+        "speedups": speedups,
+        "exact_share": decisions,
+    }
+
+
+def write_calibration(calibration: dict, path: str = CALIBRATION_PATH):
+    with open(path, "w") as file:
+        features = textwrap.fill(
+            ", ".join(FEATURES) + ".",
+            width=88,
+            initial_indent="# ",
+            subsequent_indent="# ",
+        )
+        file.write(CALIBRATION_HEADER.format(features=features))
+        file.write(toml.dumps(calibration))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=os.path.dirname(os.__file__))
+    parser.add_argument("--files-per-kind", type=int, default=4000)
+    parser.add_argument("--min-samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--write", action="store_true")
+    args = parser.parse_args()
+
+    extensions = TokenEstimator().calibration["extensions"]
+    samples = collect_samples(args.corpus, extensions, args.files_per_kind, args.seed)
+
+    kinds = {}
+    held_out = {}
+    for kind, kind_samples in samples.items():
+        if len(kind_samples[::2]) < args.min_samples and kind != DEFAULT_KIND:
+            print(f"{kind:>8}: {len(kind_samples)} samples, uses the default")
+            continue
+        kinds[kind] = calibrate(kind_samples[::2])
+        held_out[kind] = kind_samples[1::2]
+    calibration = {"extensions": extensions, "kinds": kinds}
+    estimator = TokenEstimator(calibration)
+
+    for kind, kind_samples in held_out.items():
+        result = measure(estimator, kind, kind_samples)
+        print(
+            f"{kind:>8}: {result['samples']} samples, relative error mean "
+            f"{result['mean_error']:.1%} p95 {result['p95_error']:.1%} max "
+            f"{result['max_error']:.1%}, bound {kinds[kind]['rel_error']:.1%} + "
+            f"{kinds[kind]['abs_error']} covers {result['coverage']:.1%}"
+        )
+        print(
+            f"{'':>10}estimated "
+            + ", ".join(
+                f"{speed:.1f}x faster {name}"
+                for name, speed in result["speedups"].items()
+            )
+            + " than encoded, exact encoding needed for "
+            + ", ".join(
+                f"{share:.1%} at {limit}"
+                for limit, share in result["exact_share"].items()
+            )
+        )
+
+    if args.write:
+        write_calibration(calibration)
+        print(f"Calibrations written to {CALIBRATION_PATH}")
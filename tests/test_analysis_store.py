@@ -0,0 +1,236 @@
+import os
+import json
+import copy
+import tempfile
+import unittest
+from unittest import mock
+from readmate.readmate_agent import ReadMateAgent
+from readmate.toolkit import low_level_analysis
+from readmate.utils.analysis_store import (
+    ROOT_FILES,
+    ROOT_FILES_LOW_LEVEL,
+    AnalysisStore,
+)
+from readmate.utils.utils_tools import (
+    filter_keys_recursively,
+    load_json_from_path,
+    remove_empty_values,
+)
+from tests.benchmark_pipeline import LatencyChatModel, create_project
+
+MODULES = {
+    "current_folder": ".",
+    "Description": "Root",
+    "files": ["setup.py", "README.txt"],
+    "subfolders": {
+        "docs": {
+            "current_folder": "docs",
+            "Rating": "3/10",
+            "files": ["guide.md"],
+            "subfolders": {},
+        },
+        "core": {
+            "current_folder": "core",
+            "files": ["engine.py", "notes.txt"],
+            "Description": "Engine",
+            "Technologies": ["asyncio"],
+            "subfolders": {
+                "io": {
+                    "current_folder": "core/io",
+                    "Description": "",
+                    "files": ["reader.py"],
+                    "subfolders": {},
+                }
+            },
+        },
+    },
+}
+CORE_FILES = {
+    "engine.py": {
+        "Description": ["Runs the engine"],
+        "CodeExtractions": {"Engine.run": {"Description": "Main loop"}},
+        "Imports": ["asyncio"],
+    },
+    "notes.txt": {"Description": "", "Technologies": []},
+}
+IO_FILES = {"reader.py": {"Functions": {"read": {"Description": "Reads"}}}}
+ROOT_ANALYSES = {
+    "setup.py": {"Description": "Packaging", "filename": "setup.py"},
+    "README.txt": {"Description": "", "filename": "README.txt"},
+}
+
+
+def filtered(data: dict, keys: list, crucial_keys: list) -> dict:
+    # The context the README sections were given before the analyses were stored
+    return remove_empty_values(filter_keys_recursively(data, keys, crucial_keys))
+
+
+def extended_tree() -> dict:
+    tree = copy.deepcopy(MODULES)
+    tree["subfolders"]["core"]["files"] = CORE_FILES
+    tree["subfolders"]["core"]["subfolders"]["io"]["files"] = IO_FILES
+    return tree
+
+
+class TestAnalysisStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = AnalysisStore(os.path.join(self.tmp_dir.name, "analysis.db"))
+        # The low-level analysis of a folder can be stored before the module tree
+        self.store.put_folder_files("core", CORE_FILES)
+        self.store.put_module_tree(MODULES)
+        self.store.put_folder_files("core/io", IO_FILES)
+        self.store.put_folder_files("docs", ["guide.md"])
+        self.store.put_root_files(ROOT_ANALYSES, ROOT_FILES_LOW_LEVEL)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_trees(self):
+        # Same keys in the same order, which the prompts and section digests depend on
+        for stored, expected in [
+            (self.store.module_tree(extended=False), MODULES),
+            (self.store.module_tree(), extended_tree()),
+            (self.store.root_files(ROOT_FILES_LOW_LEVEL), ROOT_ANALYSES),
+        ]:
+            self.assertEqual(json.dumps(stored), json.dumps(expected))
+        self.assertEqual(self.store.root_files(ROOT_FILES), {})
+        self.assertEqual(
+            [folder["current_folder"] for folder in self.store.folders()],
+            [".", "docs", "core", "core/io"],
+        )
+
+    def test_same_context_as_filter(self):
+        crucial_keys = ["CodeExtractions", "Functions", "Classes"]
+        for keys in [
+            ["Description"],
+            ["Description", "Technologies"],
+            ["Functions", "Classes", "CodeExtractions"],
+            ["current_folder", "Rating"],
+            ["Imports"],
+            ["Missing"],
+            # Also the name of a folder and of a file
+            ["core", "setup.py"],
+        ]:
+            self.assertEqual(
+                self.store.project("modules", keys, crucial_keys),
+                filtered(extended_tree(), keys, crucial_keys),
+            )
+            self.assertEqual(
+                self.store.project("files", keys, crucial_keys),
+                filtered(ROOT_ANALYSES, keys, crucial_keys),
+            )
+
+    def test_rewrites(self):
+        context = self.store.project("modules", ["Description"], [])
+        self.store.put_folder_files("core", {"engine.py": {"Description": ["New"]}})
+        self.assertNotEqual(self.store.project("modules", ["Description"], []), context)
+        self.assertEqual(
+            self.store.module_tree()["subfolders"]["core"]["files"],
+            {"engine.py": {"Description": ["New"]}},
+        )
+        self.assertEqual(self.store.find_symbol("Engine.run"), [])
+
+    def test_symbols(self):
+        self.assertEqual(
+            self.store.find_symbol("Engine.run"),
+            [("core", "engine.py", "CodeExtractions")],
+        )
+        self.assertEqual(
+            self.store.find_symbol("read"), [("core/io", "reader.py", "Functions")]
+        )
+        self.assertEqual(
+            [kind for _, _, kind in self.store.find_symbol("asyncio")], ["Imports"]
+        )
+
+
+class TestStoredRun(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp_dir.name, "project")
+        os.makedirs(self.project)
+        create_project(self.project, 3, 2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def build_agent(self, name: str) -> ReadMateAgent:
+        workspace = os.path.join(self.tmp_dir.name, name)
+        os.makedirs(os.path.join(workspace, "logs"), exist_ok=True)
+        return ReadMateAgent(
+            self.project,
+            workspace,
+            workspace,
+            llm_selection=LatencyChatModel(latency=0),
+        )
+
+    def test_section_contexts(self):
+        agent = self.build_agent("run")
+        agent.run()
+        store = agent.store
+        self.assertEqual(
+            os.listdir(agent.workspace_path).count(ReadMateAgent.ANALYSIS_DB), 1
+        )
+        self.assertTrue(store.stage_done("modules_low_level"))
+        self.assertIn("features", store.sections())
+
+        modules = store.module_tree()
+        files = store.root_files(ROOT_FILES_LOW_LEVEL)
+        crucial_keys = ["CodeExtractions", "Functions", "Classes"]
+        sections = load_json_from_path(
+            "readmate/configs/readme_section_completion.json"
+        )
+        for details in sections.values():
+            self.assertEqual(
+                store.project("modules", details["desc_keys_modules"], crucial_keys),
+                filtered(modules, details["desc_keys_modules"], crucial_keys),
+            )
+            self.assertEqual(
+                store.project("files", details["desc_keys_files"], crucial_keys),
+                filtered(files, details["desc_keys_files"], crucial_keys),
+            )
+
+    def test_failed_folder_not_recorded(self):
+        analyze_folder = low_level_analysis.analyze_folder
+
+        async def failing_folder(folder_dict, *args):
+            if folder_dict["current_folder"] == "package_1":
+                raise OSError("unreadable folder")
+            await analyze_folder(folder_dict, *args)
+
+        agent = self.build_agent("run")
+        with mock.patch.object(low_level_analysis, "analyze_folder", failing_folder):
+            agent.run()
+        self.assertFalse(agent.store.stage_done("modules_low_level"))
+        self.assertFalse(agent.journal.done("modules_low_level", "package_1"))
+
+        # The resumed run reads the folder again
+        resumed = self.build_agent("run")
+        resumed.run()
+        self.assertTrue(resumed.store.stage_done("modules_low_level"))
+        self.assertTrue(resumed.journal.done("modules_low_level", "package_1"))
+
+    def test_readme_only_import(self):
+        agent = self.build_agent("run")
+        agent.run()
+        exported = os.path.join(self.tmp_dir.name, "exported")
+        os.makedirs(exported)
+        agent.store.export(exported)
+
+        # The info files of a former run are imported into the store of the new one
+        readme_only = self.build_agent("readme_only")
+        readme_only.copy_info_files_to_new_workspace(exported)
+        self.assertEqual(readme_only.store.module_tree(), agent.store.module_tree())
+        self.assertEqual(
+            readme_only.store.module_tree(extended=False),
+            agent.store.module_tree(extended=False),
+        )
+        self.assertEqual(
+            readme_only.store.root_files(ROOT_FILES),
+            agent.store.root_files(ROOT_FILES),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
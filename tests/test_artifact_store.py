@@ -0,0 +1,111 @@
+import os
+import json
+import tempfile
+import unittest
+from readmate.readmate_agent import ReadMateAgent
+from readmate.utils.artifact_store import (
+    CompactTree,
+    export_json,
+    load_artifact,
+    write_artifact,
+)
+from tests.benchmark_pipeline import LatencyChatModel, create_project
+
+MODULE_TREE = {
+    "current_folder": "project",
+    "files": ["setup.py"],
+    "subfolders": {
+        "core": {
+            "current_folder": "core",
+            "files": ["engine.py"],
+            "subfolders": {
+                "io\tutils": {
+                    "current_folder": "io\tutils",
+                    "files": ["reader.py"],
+                    "subfolders": {},
+                }
+            },
+        },
+        "docs": {"current_folder": "docs", "files": ["guide.md"], "subfolders": {}},
+    },
+}
+
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        for name in ["info_modules.json", "info_modules.jsonl"]:
+            path = os.path.join(self.tmp_dir.name, name)
+            write_artifact(path, MODULE_TREE)
+            self.assertEqual(load_artifact(path), MODULE_TREE)
+
+    def test_lazy_subtree(self):
+        path = os.path.join(self.tmp_dir.name, "info_modules.jsonl")
+        write_artifact(path, MODULE_TREE)
+        with open(path, encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 4)
+
+        tree = CompactTree(path)
+        self.assertEqual(tree.children(), ["core", "docs"])
+        self.assertEqual(tree.node(("core",))["files"], ["engine.py"])
+        self.assertNotIn("subfolders", tree.node(("core",)))
+        self.assertEqual(tree.subtree(("core",)), MODULE_TREE["subfolders"]["core"])
+        self.assertIn(("core", "io\tutils"), tree)
+
+    def test_export(self):
+        path = os.path.join(self.tmp_dir.name, "info_modules.jsonl")
+        write_artifact(path, MODULE_TREE)
+        exported = export_json(path)
+        self.assertEqual(exported, os.path.join(self.tmp_dir.name, "info_modules.json"))
+        with open(exported) as file:
+            self.assertEqual(json.load(file), MODULE_TREE)
+
+
+class TestCompactRun(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp_dir.name, "project")
+        os.makedirs(self.project)
+        create_project(self.project, 3, 2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_same_analyses(self):
+        workspace = os.path.join(self.tmp_dir.name, "workspace")
+        os.makedirs(os.path.join(workspace, "logs"))
+        agent = ReadMateAgent(
+            self.project,
+            workspace,
+            workspace,
+            llm_selection=LatencyChatModel(latency=0),
+            artifact_format="jsonl",
+        )
+        agent.run()
+
+        compact = agent.export_artifacts()
+        readable = agent.store.export(self.tmp_dir.name, "json")
+        self.assertTrue(all(path.endswith(".jsonl") for path in compact))
+        for compact_path, readable_path in zip(compact, readable):
+            self.assertEqual(load_artifact(compact_path), load_artifact(readable_path))
+
+        # The logs reference the analyses instead of copying them
+        logs_folder = os.path.join(workspace, "logs")
+        self.assertEqual(os.listdir(logs_folder), [ReadMateAgent.ARTIFACTS_JSON])
+        with open(os.path.join(logs_folder, ReadMateAgent.ARTIFACTS_JSON)) as file:
+            references = json.load(file)
+        self.assertEqual(
+            os.path.normpath(
+                os.path.join(logs_folder, references[ReadMateAgent.ANALYSIS_DB])
+            ),
+            os.path.normpath(agent.analysis_db),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
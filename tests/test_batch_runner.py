@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+from batch_runner import BatchRunner, collect_projects
+from readmate.modules.python_analyzer import AnalysisCache
+from readmate.utils.token_callback_tracker import TokenUsageTracker
+from tests.benchmark_pipeline import LatencyChatModel, create_project
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, "repos")
+        os.makedirs(os.path.join(self.source, "alpha"))
+        create_project(os.path.join(self.source, "alpha"), 2, 2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_collect_projects(self):
+        open(os.path.join(self.source, "beta.zip"), "w").close()
+        open(os.path.join(self.source, "notes.txt"), "w").close()
+        manifest_path = os.path.join(self.tmp_dir.name, "manifest.txt")
+        with open(manifest_path, "w") as file:
+            file.write("# weekly batch\nrepos/alpha\n\nrepos/beta.zip\n")
+
+        expected = [
+            os.path.join(self.source, "alpha"),
+            os.path.join(self.source, "beta.zip"),
+        ]
+        self.assertEqual(collect_projects(self.source), expected)
+        self.assertEqual(collect_projects(manifest_path), expected)
+
+    def test_python_analysis_by_content(self):
+        cache = AnalysisCache()
+        module_path = os.path.join(self.source, "alpha", "package_0", "file_0.py")
+        copy_path = os.path.join(self.tmp_dir.name, "copy.py")
+        shutil.copy(module_path, copy_path)
+
+        analysis = cache.analyze(module_path)
+        analysis["classes"].clear()
+
+        self.assertIn("Model0", cache.analyze(copy_path)["classes"])
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_token_usage_by_scope(self):
+        tracker = TokenUsageTracker()
+        with tracker.scope("alpha"):
+            tracker.log_token_usage(120)
+        tracker.log_token_usage(30)
+
+        self.assertEqual(tracker.get_scope_usage("alpha")["tokens"], 120)
+
+    def test_batch_summary(self):
+        shutil.copytree(
+            os.path.join(self.source, "alpha"), os.path.join(self.source, "beta")
+        )
+        projects = collect_projects(self.source) + [
+            os.path.join(self.tmp_dir.name, "missing")
+        ]
+        llm = LatencyChatModel(latency=0)
+
+        summary = BatchRunner(
+            projects,
+            os.path.join(self.tmp_dir.name, "output"),
+            max_projects=1,
+            llm_selection=llm,
+        ).run()
+
+        self.assertEqual(
+            [project["status"] for project in summary["projects"]],
+            ["completed", "completed", "failed"],
+        )
+        self.assertTrue(os.path.isfile(summary["projects"][1]["readme"]))
+        self.assertTrue(
+            os.path.isfile(os.path.join(summary["batch_folder"], "batch_summary.json"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
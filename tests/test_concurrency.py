@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+from readmate.utils.concurrency import run_dag
+
+
+class TestRunDag(unittest.TestCase):
+    def test_independent_nodes_overlap(self):
+        # Arrange
+        in_flight = []
+        max_in_flight = []
+        started_after = {}
+
+        def node(name, delay):
+            async def run():
+                started_after[name] = list(in_flight)
+                in_flight.append(name)
+                max_in_flight.append(len(in_flight))
+                await asyncio.sleep(delay)
+                in_flight.remove(name)
+                return name
+
+            return run
+
+        nodes = {
+            "overview": (node("overview", 0.01), []),
+            "features": (node("features", 0.01), ["overview"]),
+            "tree": (node("tree", 0.05), []),
+            "inspector": (node("inspector", 0.05), []),
+        }
+
+        # Act
+        results = asyncio.run(run_dag(nodes))
+
+        # Assert: the three independent nodes run together, features waits for overview
+        self.assertEqual(max(max_in_flight), 3)
+        self.assertEqual(results["features"], "features")
+        self.assertNotIn("overview", started_after["features"])
+
+    def test_cycle_is_rejected(self):
+        async def noop():
+            return None
+
+        nodes = {"a": (noop, ["b"]), "b": (noop, ["a"])}
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run_dag(nodes))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from readmate.modules.general_file_analyzer import get_deployment_analyzer
+
+
+class TestDeploymentAnalyzers(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_file(self, name, content):
+        file_path = os.path.join(self.tmp_dir.name, name)
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return file_path
+
+    def test_dockerfile(self):
+        file_path = self.write_file(
+            "Dockerfile",
+            "FROM --platform=linux/amd64 python:3.11-slim AS base\n"
+            "RUN pip install \\\n    poetry\n"
+            "EXPOSE 8000 9000\n"
+            'CMD ["python", "app.py"]\n',
+        )
+
+        analysis = get_deployment_analyzer(file_path).analyze()
+
+        self.assertEqual(analysis["base_images"], ["python:3.11-slim"])
+        self.assertEqual(analysis["RUN"], ["RUN pip install poetry"])
+        self.assertEqual(analysis["exposed_ports"], ["8000", "9000"])
+        self.assertEqual(analysis["cmd"], ['["python", "app.py"]'])
+
+    def test_compose(self):
+        file_path = self.write_file(
+            "docker-compose.yml",
+            "services:\n  api:\n    build: .\n    ports: ['8000:8000']\n"
+            "  db:\n    image: postgres:16\n",
+        )
+
+        services = get_deployment_analyzer(file_path).analyze()["services"]
+
+        self.assertEqual(services["api"]["ports"], ["8000:8000"])
+        self.assertEqual(services["db"]["image"], "postgres:16")
+
+    def test_kubernetes_manifest(self):
+        file_path = self.write_file(
+            "Deployment.yaml",
+            "kind: Deployment\nmetadata: {name: api}\nspec:\n  replicas: 3\n"
+            "  template:\n    spec:\n      containers:\n"
+            "        - image: org/api:1.0\n          ports: [{containerPort: 8000}]\n"
+            "---\nkind: Service\nmetadata: {name: api}\n"
+            "spec: {type: ClusterIP, ports: [{port: 80}]}\n",
+        )
+
+        resources = get_deployment_analyzer(file_path).analyze()["resources"]
+
+        self.assertEqual(
+            [(r["kind"], r["replicas"]) for r in resources],
+            [("Deployment", 3), ("Service", None)],
+        )
+        self.assertEqual(resources[0]["images"], ["org/api:1.0"])
+        self.assertEqual(resources[1]["service_type"], "ClusterIP")
+
+
+if __name__ == "__main__":
+    unittest.main()
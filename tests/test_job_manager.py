@@ -0,0 +1,82 @@
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+import unittest
+from job_manager import JobManager
+from tests.benchmark_pipeline import LatencyChatModel, create_project
+
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        project_path = os.path.join(self.tmp_dir.name, "alpha")
+        os.makedirs(project_path)
+        create_project(project_path, 2, 2)
+        self.zip_path = shutil.make_archive(project_path, "zip", project_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def run_jobs(self, uploads: list):
+        manager = JobManager(
+            os.path.join(self.tmp_dir.name, "output"),
+            workers=2,
+            llm_selection=LatencyChatModel(latency=0),
+        )
+        await manager.start()
+        try:
+            jobs = []
+            for filename, upload_path in uploads:
+                job = manager.create_job(filename)
+                shutil.copy(upload_path, job.upload_path)
+                manager.submit(job)
+                jobs.append(job)
+            events = [[event async for event in job.iter_events()] for job in jobs]
+        finally:
+            await manager.stop()
+        return jobs, events
+
+    def test_progress_and_artifacts(self):
+        broken_path = os.path.join(self.tmp_dir.name, "broken.zip")
+        with open(broken_path, "w") as file:
+            file.write("not a zip file")
+
+        jobs, events = asyncio.run(
+            self.run_jobs([("alpha.zip", self.zip_path), ("broken.zip", broken_path)])
+        )
+
+        self.assertEqual([job.status for job in jobs], ["completed", "failed"])
+        stages = [(event["stage"], event["status"]) for event in events[0]]
+        self.assertEqual(stages[:2], [("job", "queued"), ("job", "running")])
+        self.assertIn(("modules_low_level", "progress"), stages)
+        self.assertLess(
+            stages.index(("readme", "started")), stages.index(("readme", "completed"))
+        )
+        self.assertEqual(stages[-1], ("job", "completed"))
+        self.assertIn("readme.md", jobs[0].artifacts())
+        self.assertIn("analysis.db", jobs[0].to_dict()["artifacts"])
+
+    def test_finished_jobs_evicted(self):
+        manager = JobManager(
+            os.path.join(self.tmp_dir.name, "output"),
+            job_retention_seconds=60,
+            max_finished_jobs=1,
+            llm_selection=LatencyChatModel(latency=0),
+        )
+        jobs = [manager.create_job(f"project_{index}.zip") for index in range(4)]
+        for index, job in enumerate(jobs[:3]):
+            job.set_status("completed")
+            job.finished_at = time.time() - 10 * (3 - index)
+        jobs[0].finished_at -= 60
+
+        # Expired, then beyond the finished jobs kept. Running jobs are never dropped
+        new_job = manager.create_job("project_4.zip")
+        self.assertEqual(list(manager.jobs), [jobs[2].id, jobs[3].id, new_job.id])
+        self.assertFalse(os.path.exists(jobs[1].workspace_folder))
+        self.assertTrue(os.path.exists(jobs[2].workspace_folder))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from readmate.modules.license_analyzer import identify_license, license_badge_key
+
+BSD_2_CLAUSE = """
+BSD 2-Clause License
+
+Copyright (c) 2024, Example Authors
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this
+   list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice,
+   this list of conditions and the following disclaimer in the documentation
+   and/or other materials provided with the distribution.
+"""
+
+BSD_3_CLAUSE = (
+    BSD_2_CLAUSE
+    + """
+3. Neither the name of the copyright holder nor the names of its
+   contributors may be used to endorse or promote products derived from
+   this software without specific prior written permission.
+"""
+)
+
+
+class TestLicenseAnalyzer(unittest.TestCase):
+    def test_mit(self):
+        with open("LICENSE.txt", "r", encoding="utf-8") as file:
+            license_info = identify_license(file.read())
+
+        self.assertEqual(license_info["spdx"], "MIT")
+        self.assertEqual(license_badge_key(license_info["spdx"]), "MIT")
+
+    def test_bsd_variants(self):
+        self.assertEqual(identify_license(BSD_2_CLAUSE)["spdx"], "BSD-2-Clause")
+        self.assertEqual(identify_license(BSD_3_CLAUSE)["spdx"], "BSD-3-Clause")
+
+    def test_spdx_identifier(self):
+        license_info = identify_license("SPDX-License-Identifier: GPL-3.0-or-later")
+
+        self.assertEqual(license_info["spdx"], "GPL-3.0")
+        self.assertEqual(license_badge_key(license_info["spdx"]), "GPL_3_0")
+
+    def test_spdx_identifier_exact(self):
+        self.assertEqual(
+            identify_license("SPDX-License-Identifier: LGPL-3.0-only")["spdx"],
+            "LGPL-3.0",
+        )
+        # Licenses without a fingerprint are not mistaken for one sharing a prefix
+        self.assertIsNone(identify_license("SPDX-License-Identifier: MIT-0"))
+        self.assertIsNone(
+            identify_license("SPDX-License-Identifier: BSD-3-Clause-Clear")
+        )
+
+    def test_unknown_license(self):
+        self.assertIsNone(identify_license("All rights reserved. Internal use only."))
+
+
+if __name__ == "__main__":
+    unittest.main()
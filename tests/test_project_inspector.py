@@ -1,6 +1,10 @@
+import os
+import asyncio
+import tempfile
 import unittest
 from unittest.mock import patch
-from readmate.modules.project_inspector import ProjectInspector
+from readmate.modules.project_inspector import FileClassifier, ProjectInspector
+from tests.benchmark_pipeline import LatencyChatModel
 
 
 class TestProjectInspector(unittest.TestCase):
@@ -11,7 +15,9 @@ class TestProjectInspector(unittest.TestCase):
             ("/path/to/project", ("dir1",), ("requirements.txt", "other_file.py")),
             ("/path/to/project/dir1", (), ("Pipfile",)),
         ]
-        inspector = ProjectInspector("/path/to/project")
+        inspector = ProjectInspector(
+            "/path/to/project", llm_selection=LatencyChatModel(latency=0)
+        )
 
         # Act
         requirements = inspector.detect_requirements_files()
@@ -23,6 +29,86 @@ class TestProjectInspector(unittest.TestCase):
         }
         self.assertEqual(requirements, expected_requirements)
 
+    @patch("readmate.modules.project_inspector.os.walk")
+    def test_detection_single_pass(self, mock_walk):
+        # Arrange
+        mock_walk.return_value = [
+            ("/path/to/project", ("k8s",), ("LICENSE", "README.md", "Dockerfile")),
+            ("/path/to/project/k8s", (), ("Deployment.yaml", "test_k8s.py")),
+        ]
+        inspector = ProjectInspector(
+            "/path/to/project", llm_selection=LatencyChatModel(latency=0)
+        )
+
+        # Act
+        asyncio.run(inspector.detection_phase())
+
+        # Assert
+        self.assertEqual(mock_walk.call_count, 1)
+        self.assertEqual(
+            inspector.deployments,
+            {
+                "docker": ["/path/to/project/Dockerfile"],
+                "kubernetes": ["/path/to/project/k8s/Deployment.yaml"],
+            },
+        )
+        self.assertEqual(
+            inspector.license_file, {"project_license": ["/path/to/project/LICENSE"]}
+        )
+        self.assertEqual(
+            inspector.readme_file, {"main_readme": ["/path/to/project/README.md"]}
+        )
+        self.assertEqual(inspector.detect_testing_files(), {"/path/to/project/k8s": 1})
+
+    def test_license_and_testing_rules(self):
+        classification = FileClassifier().classify(
+            ["/project/COPYING", "/project/tests/license_test.py"]
+        )
+
+        self.assertEqual(classification["license"], ["/project/COPYING"])
+        self.assertEqual(classification["testing"], {"/project/tests": 1})
+        classification = FileClassifier().classify(["/project/license_test.py"])
+        self.assertEqual(classification["license"], ["/project/license_test.py"])
+        self.assertEqual(classification["testing"], {"/project": 1})
+
+    def test_process_dict_of_files_concurrently(self):
+        # Arrange
+        in_flight = []
+        max_in_flight = []
+
+        async def slow_completion(file_info, prompt, expert_mode):
+            in_flight.append(file_info)
+            max_in_flight.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.remove(file_info)
+            return file_info
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_paths = []
+            for name in ["Dockerfile", "docker-compose.yml"]:
+                file_paths.append(os.path.join(tmp_dir, name))
+                with open(file_paths[-1], "w", encoding="utf-8") as file:
+                    file.write(name * 10000)
+
+            inspector = ProjectInspector(
+                tmp_dir, llm_selection=LatencyChatModel(latency=0)
+            )
+            inspector.max_file_tokens = 10
+            inspector.complete_information = slow_completion
+
+            # Act
+            result = asyncio.run(
+                inspector.process_dict_of_files({"docker": file_paths}, "{file_info}")
+            )
+
+        # Assert
+        self.assertEqual(max(max_in_flight), 2)
+        self.assertEqual(
+            [list(item) for item in result["docker"]],
+            [["dockerfile"], ["docker-compose.yml"]],
+        )
+        self.assertEqual(len(result["docker"][0]["dockerfile"]), 80)
+
 
 if __name__ == "__main__":
     unittest.main()
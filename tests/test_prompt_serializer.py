@@ -0,0 +1,56 @@
+import unittest
+import tiktoken
+from readmate.utils.prompt_serializer import serialize_prompt_value
+
+MODULE_TREE = {
+    "readmate": {
+        "Description": "Generates README files from the analysis of a project",
+        "Technologies": ["python", "langchain"],
+        "utils_tools.py": {
+            "Description": "Helpers to load configs and initialize the model",
+            "Functions": {
+                "load_toml": {
+                    "Description": "Loads a TOML file",
+                    "Parameters": ["file_path"],
+                    "Returns": "dict",
+                },
+                "load_json_from_path": {
+                    "Description": "Loads a JSON file",
+                    "Parameters": ["file_path", "kwargs"],
+                    "Returns": "dict",
+                },
+                "model_initialization": {
+                    "Description": "Creates the chat model selected in the environment",
+                    "Parameters": [],
+                    "Returns": "ChatOpenAI",
+                },
+            },
+        },
+    }
+}
+
+
+class TestPromptSerializer(unittest.TestCase):
+    def test_table_factors_shared_keys(self):
+        text = serialize_prompt_value(MODULE_TREE, "table")
+
+        self.assertIn("  Technologies: python, langchain", text)
+        self.assertIn("name | Description | Parameters | Returns", text)
+        self.assertIn("load_toml | Loads a TOML file | file_path | dict", text)
+        self.assertEqual(text.count("Returns"), 1)
+
+    def test_fewer_tokens_than_repr(self):
+        encoding = tiktoken.get_encoding("cl100k_base")
+        repr_tokens = len(encoding.encode(str(MODULE_TREE)))
+
+        for serialization_format in ["minimal", "table"]:
+            compact = serialize_prompt_value(MODULE_TREE, serialization_format)
+            self.assertLess(len(encoding.encode(compact)), repr_tokens)
+
+    def test_plain_values_unchanged(self):
+        self.assertEqual(serialize_prompt_value("text", "table"), "text")
+        self.assertIs(serialize_prompt_value(MODULE_TREE, "repr"), MODULE_TREE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from readmate.modules.requirements_analyzer import (
+    get_requirements_analyzer,
+    generate_requirements_badges,
+    clean_version,
+    requirements_to_markdown,
+)
+
+
+class TestRequirementsAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_file(self, name, content):
+        file_path = os.path.join(self.tmp_dir.name, name)
+        with open(file_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return file_path
+
+    def test_pyproject_poetry(self):
+        file_path = self.write_file(
+            "pyproject.toml",
+            '[tool.poetry.dependencies]\npython = "^3.9"\nlangchain = "^0.1.11"\n'
+            'uvicorn = { version = "^0.28.0", extras = ["standard"] }\n',
+        )
+
+        analysis = get_requirements_analyzer(file_path).analyze()
+
+        self.assertEqual(analysis["manager"], "poetry")
+        self.assertEqual(analysis["python_version"], "^3.9")
+        self.assertEqual(
+            analysis["dependencies"],
+            [
+                {"name": "langchain", "version": "^0.1.11"},
+                {"name": "uvicorn", "version": "^0.28.0"},
+            ],
+        )
+
+    def test_pyproject_pep621(self):
+        file_path = self.write_file(
+            "pyproject.toml",
+            '[project]\nrequires-python = ">=3.10"\ndependencies = ["httpx>=0.27"]\n'
+            "[tool.black]\nline-length = 88\n",
+        )
+
+        analysis = get_requirements_analyzer(file_path).analyze()
+
+        self.assertEqual(analysis["manager"], "pip")
+        self.assertEqual(analysis["python_version"], ">=3.10")
+        self.assertEqual(
+            analysis["dependencies"], [{"name": "httpx", "version": ">=0.27"}]
+        )
+        self.assertIn("pip install .", requirements_to_markdown(analysis))
+
+    def test_requirements_txt(self):
+        file_path = self.write_file(
+            "requirements.txt",
+            "# comment\n-r base.txt\nrequests[socks]==2.31.0 ; python_version > '3.8'\n"
+            "numpy>=1.24,<2\nrich\n",
+        )
+
+        analysis = get_requirements_analyzer(file_path).analyze()
+
+        self.assertEqual(
+            analysis["dependencies"],
+            [
+                {"name": "requests", "version": "==2.31.0"},
+                {"name": "numpy", "version": ">=1.24,<2"},
+                {"name": "rich", "version": ""},
+            ],
+        )
+
+    def test_conda_environment(self):
+        file_path = self.write_file(
+            "environment.yml",
+            "name: env\ndependencies:\n  - python=3.10\n  - numpy=1.26\n"
+            "  - pip:\n    - fastapi==0.110.0\n",
+        )
+
+        analysis = get_requirements_analyzer(file_path).analyze()
+
+        self.assertEqual(analysis["python_version"], "3.10")
+        self.assertEqual(
+            [dep["name"] for dep in analysis["dependencies"]], ["numpy", "fastapi"]
+        )
+
+    def test_badges(self):
+        analyses = [
+            {
+                "manager": "poetry",
+                "python_version": "^3.9",
+                "dependencies": [
+                    {"name": "python-dotenv", "version": "^1.0.1"},
+                    {"name": "rich", "version": ""},
+                ],
+            }
+        ]
+
+        badges = generate_requirements_badges(analyses)
+
+        self.assertEqual(
+            badges[0], "![Python](https://img.shields.io/badge/Python-3.9%2B-blue.svg)"
+        )
+        self.assertTrue(
+            badges[1].startswith(
+                "![python-dotenv](https://img.shields.io/badge/python--dotenv-1.0.1%2B-"
+            )
+        )
+        self.assertEqual(len(badges), 3)
+        self.assertEqual(badges, generate_requirements_badges(analyses))
+
+    def test_clean_version(self):
+        self.assertEqual(clean_version("==0.1.11"), "0.1.11")
+        self.assertEqual(clean_version(">=3.8,<4"), "3.8+")
+        self.assertEqual(clean_version("*"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
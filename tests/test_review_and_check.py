@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from readmate.utils.general_utils import num_tokens_from_string
+from readmate.utils.token_estimator import DEFAULT_KIND, TOKEN_ESTIMATOR
+from review_and_check import Reviewandcheck
+from tests.benchmark_pipeline import create_project
+
+EXTENSIONS_PATH = "readmate/configs/include_extensions.toml"
+
+
+class TestReviewandcheck(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project = self.tmp_dir.name
+        create_project(self.project, 3, 2)
+        with open(os.path.join(self.project, "notes.txt"), "w") as file:
+            file.write("Release notes of the project.\n" * 2000)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def full_counts(self):
+        read_tokens, total_tokens = 0, 0
+        for root, _, files in os.walk(self.project):
+            for name in files:
+                if os.path.splitext(name)[1] in (".py", ".txt"):
+                    with open(os.path.join(root, name), encoding="utf-8") as file:
+                        tokens = num_tokens_from_string(file.read(), "cl100k_base")
+                    read_tokens += min(tokens, 200)
+                    total_tokens += tokens
+        return read_tokens, total_tokens
+
+    def test_counters(self):
+        rac = Reviewandcheck(self.project, EXTENSIONS_PATH, workers=4)
+        self.assertEqual(rac.read_all_files_in_folder(), (True, None))
+
+        read_tokens, total_tokens = self.full_counts()
+        self.assertEqual(rac.read_token_counter, read_tokens)
+        # The total of the files over the prefix is extrapolated from the estimate of
+        # their prefix, whose error bound is the one of the estimator for the file type
+        rel_error = TOKEN_ESTIMATOR.calibration["kinds"][DEFAULT_KIND]["rel_error"]
+        self.assertAlmostEqual(
+            rac.total_token_counter / total_tokens, 1, delta=rel_error
+        )
+
+    def test_total_extrapolation(self):
+        # With exact prefix counts, only the extrapolation from the file sizes is left
+        with mock.patch.object(
+            TOKEN_ESTIMATOR,
+            "estimate",
+            lambda text, kind=DEFAULT_KIND: num_tokens_from_string(text, "cl100k_base"),
+        ):
+            rac = Reviewandcheck(self.project, EXTENSIONS_PATH, workers=4)
+            self.assertEqual(rac.read_all_files_in_folder(), (True, None))
+
+        read_tokens, total_tokens = self.full_counts()
+        self.assertEqual(rac.read_token_counter, read_tokens)
+        self.assertAlmostEqual(rac.total_token_counter / total_tokens, 1, delta=0.1)
+
+    def test_early_exit(self):
+        rac = Reviewandcheck(self.project, EXTENSIONS_PATH, workers=1)
+        with mock.patch("review_and_check.TOKEN_LIMITER", 300):
+            status, message = rac.read_all_files_in_folder()
+
+        self.assertFalse(status)
+        self.assertTrue(message.startswith("Max read token reached"))
+        self.assertLessEqual(rac.read_token_counter, 500)
+
+        # Runs with a budget are not refused for their size
+        rac = Reviewandcheck(
+            self.project, EXTENSIONS_PATH, enforce_size_limits=False, workers=1
+        )
+        with mock.patch("review_and_check.TOKEN_LIMITER", 300):
+            self.assertEqual(rac.read_all_files_in_folder(), (True, None))
+
+    def test_python_required(self):
+        for root, _, files in os.walk(self.project):
+            for name in files:
+                if name.endswith(".py"):
+                    os.remove(os.path.join(root, name))
+        rac = Reviewandcheck(self.project, EXTENSIONS_PATH)
+        self.assertEqual(
+            rac.read_all_files_in_folder(),
+            (False, "This project does not contain any python code"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
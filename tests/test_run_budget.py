@@ -0,0 +1,111 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from readmate.readmate_agent import ReadMateAgent
+from readmate.toolkit.low_level_analysis import module_rating
+from readmate.utils.run_budget import RunBudget, current_budget
+from readmate.utils.run_journal import RunJournal
+from readmate.utils.section_cache import SectionCache
+from tests.benchmark_pipeline import LatencyChatModel, create_project
+
+
+class TestRunBudget(unittest.TestCase):
+    def test_levels(self):
+        budget = RunBudget(max_tokens=1000)
+        budget.charge(tokens=400, cost=0)
+        self.assertEqual(budget.level(), RunBudget.FULL)
+        budget.charge(tokens=200, cost=0)
+        self.assertEqual(budget.level(), RunBudget.SHALLOW)
+        budget.charge(tokens=300, cost=0)
+        self.assertEqual(budget.level(), RunBudget.DETERMINISTIC)
+        budget.charge(tokens=100, cost=0)
+        self.assertEqual(budget.level(), RunBudget.EXHAUSTED)
+        self.assertFalse(budget.reserve(1))
+
+    def test_reservations(self):
+        budget = RunBudget(max_tokens=1000)
+        self.assertTrue(budget.reserve(600))
+        # A call in flight holds its tokens until it finishes
+        self.assertFalse(budget.reserve(600))
+        budget.release(600)
+        self.assertTrue(budget.reserve(600))
+        self.assertEqual(budget.skipped_calls, 1)
+
+    def test_cost_estimate(self):
+        budget = RunBudget(max_cost=1.0)
+        budget.charge(tokens=1000, cost=0.5)
+        self.assertTrue(budget.reserve(1000))
+        budget.release(1000)
+        budget.charge(tokens=1000, cost=0.2)
+        self.assertFalse(budget.reserve(1000))
+
+    def test_activate(self):
+        budget = RunBudget()
+        with budget.activate():
+            self.assertIs(current_budget(), budget)
+        self.assertIsNone(current_budget())
+        self.assertFalse(budget.limited)
+
+    def test_module_rating(self):
+        self.assertEqual(module_rating({"Rating": "7/10"}), 7)
+        self.assertEqual(module_rating({"Rating": ""}), 0)
+        self.assertEqual(module_rating({}), 0)
+
+
+class TestBudgetedRun(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp_dir.name, "project")
+        os.makedirs(self.project)
+        create_project(self.project, 3, 2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_pipeline(self, name: str, budget: RunBudget):
+        workspace = os.path.join(self.tmp_dir.name, name)
+        os.makedirs(os.path.join(workspace, "logs"), exist_ok=True)
+        model = LatencyChatModel(latency=0, tokens_per_call=500)
+        agent = ReadMateAgent(
+            self.project, workspace, workspace, llm_selection=model, budget=budget
+        )
+        # As the batch runner and the service do, without the run() wrapper
+        readme_path = asyncio.run(agent.arun())
+        return model, readme_path
+
+    def test_readme_within_budget(self):
+        full_model, _ = self.run_pipeline("full", RunBudget())
+
+        budget = RunBudget(max_tokens=3000)
+        model, readme_path = self.run_pipeline("budget", budget)
+
+        self.assertLessEqual(budget.tokens, 3000)
+        self.assertLess(model.calls, full_model.calls)
+        self.assertGreater(budget.skipped_calls, 0)
+        with open(readme_path, "r", encoding="utf-8") as file:
+            readme = file.read()
+        self.assertIn("Features", readme)
+        self.assertIn("Project Tree", readme)
+
+        # Sections written without the model are not cached for the next run
+        section_cache = SectionCache(
+            os.path.join(os.path.dirname(readme_path), "readme_sections.json")
+        )
+        self.assertNotIn("main_modules", section_cache.sections)
+
+    def test_resume_makes_skipped_calls(self):
+        self.run_pipeline("run", RunBudget(max_tokens=3000))
+        stages = ["root_files", "root_files_low_level", "modules", "modules_low_level"]
+        journal = RunJournal(os.path.join(self.tmp_dir.name, "run"))
+        # The units answered with the default response are not journaled
+        self.assertFalse(all(journal.done("stages", stage) for stage in stages))
+
+        model, _ = self.run_pipeline("run", RunBudget())
+        journal = RunJournal(os.path.join(self.tmp_dir.name, "run"))
+        self.assertGreater(model.calls, 0)
+        self.assertTrue(all(journal.done("stages", stage) for stage in stages))
+
+
+if __name__ == "__main__":
+    unittest.main()
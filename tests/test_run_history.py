@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+from langchain.globals import get_llm_cache, set_llm_cache
+from langchain_core.caches import InMemoryCache
+from readmate.readmate_agent import ReadMateAgent
+from readmate.utils.run_history import RunHistory, RunStats, percentile
+from tests.benchmark_pipeline import LatencyChatModel, create_project
+
+
+class TestRunHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history_path = os.path.join(self.tmp_dir.name, "history.db")
+        self.project = os.path.join(self.tmp_dir.name, "project")
+        os.makedirs(self.project)
+        create_project(self.project, 2, 2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_percentile(self):
+        latencies = [0.1 * n for n in range(1, 21)]
+        self.assertAlmostEqual(percentile(latencies, 0.5), 1.1)
+        self.assertAlmostEqual(percentile(latencies, 0.95), 2.0)
+        self.assertEqual(percentile([3.0], 0.95), 3.0)
+
+    def test_response_model_averages(self):
+        stats = RunStats()
+        stats.record_call("overview", "text", 2.0, 1000, 300)
+        stats.record_call("features", "text", 4.0, 1200, 500)
+        stats.record_call("module", "ModuleAnalysis", 1.0, 400, 100)
+        history = RunHistory(self.history_path)
+        history.record({"project": "alpha", "model": "m", "status": "completed"}, stats)
+
+        averages = history.response_model_averages("m")
+        self.assertEqual(averages["text"], {"output_tokens": 400, "seconds": 3.0})
+        self.assertEqual(history.response_model_averages("other"), {})
+        self.assertEqual(history.runs()[0]["calls"], 3)
+        history.close()
+
+    def run_pipeline(self, name: str, events: list):
+        workspace = os.path.join(self.tmp_dir.name, name)
+        os.makedirs(os.path.join(workspace, "logs"))
+        model = LatencyChatModel(latency=0, tokens_per_call=100)
+        ReadMateAgent(
+            self.project,
+            workspace,
+            workspace,
+            llm_selection=model,
+            progress_callback=events.append,
+            history_path=self.history_path,
+        ).run()
+        return model
+
+    def test_runs_recorded(self):
+        first_events, second_events = [], []
+        model = self.run_pipeline("first", first_events)
+        self.run_pipeline("second", second_events)
+
+        history = RunHistory(self.history_path)
+        runs = history.runs(project="project")
+        self.assertEqual([run["status"] for run in runs], ["completed", "completed"])
+        self.assertEqual(runs[0]["calls"], model.calls)
+        self.assertEqual(runs[0]["input_tokens"], 100 * model.calls)
+        self.assertGreater(runs[0]["files"], 0)
+        self.assertIn("readme", history.stage_averages("project"))
+
+        caches = history.connection.execute(
+            "SELECT cache, hits, misses FROM caches WHERE run_id = ?", (runs[0]["id"],)
+        ).fetchall()
+        self.assertIn("sections", [row["cache"] for row in caches])
+        history.close()
+
+        # The second run announces how long its stages took in the first one
+        self.assertNotIn("expected_seconds", first_events[0])
+        started = [event for event in second_events if event["status"] == "started"]
+        self.assertTrue(all("expected_seconds" in event for event in started))
+
+    def test_response_cache_hits_not_recorded_as_calls(self):
+        previous_cache = get_llm_cache()
+        set_llm_cache(InMemoryCache())
+        try:
+            model = self.run_pipeline("first", [])
+            self.run_pipeline("second", [])
+        finally:
+            set_llm_cache(previous_cache)
+
+        history = RunHistory(self.history_path)
+        second, first = history.runs(project="project")
+        self.assertEqual(first["calls"], model.calls)
+        # Every call of the second run is answered by the response cache
+        self.assertEqual(second["calls"], 0)
+        first_hits, first_misses = self.response_cache(history, first["id"])
+        self.assertEqual(first_misses, model.calls)
+        self.assertEqual(
+            self.response_cache(history, second["id"]),
+            (first_hits + first_misses, 0),
+        )
+        history.close()
+
+    @staticmethod
+    def response_cache(history: RunHistory, run_id: int) -> tuple:
+        row = history.connection.execute(
+            "SELECT hits, misses FROM caches WHERE run_id = ? AND cache = 'responses'",
+            (run_id,),
+        ).fetchone()
+        return row["hits"], row["misses"]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import asyncio
+import tempfile
+import unittest
+from readmate.utils.run_journal import RunJournal
+
+
+class TestRunJournal(unittest.TestCase):
+    def test_resume_completed_units(self):
+        with tempfile.TemporaryDirectory() as workspace:
+            journal = RunJournal(workspace)
+            journal.record("modules", "readmate/utils", {"Rating": "8"})
+            journal.record("stages", "root_files")
+
+            resumed = RunJournal(workspace)
+
+            self.assertTrue(resumed.done("stages", "root_files"))
+            self.assertEqual(resumed.get("modules", "readmate/utils"), {"Rating": "8"})
+            self.assertFalse(resumed.done("modules", "readmate/toolkit"))
+
+    def test_line_cut_by_a_crash(self):
+        with tempfile.TemporaryDirectory() as workspace:
+            journal = RunJournal(workspace)
+            journal.record("root_files", "setup.py", {"Rating": "5"})
+            with open(journal.file_path, "a", encoding="utf-8") as file:
+                file.write('{"stage": "root_files", "unit": "cli.py", "res')
+
+            resumed = RunJournal(workspace)
+            resumed.record("root_files", "cli.py", {"Rating": "7"})
+
+            self.assertEqual(RunJournal(workspace).completed("root_files"), 2)
+
+    def test_record_from_coroutines(self):
+        with tempfile.TemporaryDirectory() as workspace:
+            journal = RunJournal(workspace)
+
+            async def record_files():
+                await asyncio.gather(
+                    *[
+                        journal.arecord("root_files", f"file_{index}.py", index)
+                        for index in range(20)
+                    ]
+                )
+
+            asyncio.run(record_files())
+
+            resumed = RunJournal(workspace)
+            self.assertEqual(resumed.completed("root_files"), 20)
+            self.assertEqual(resumed.get("root_files", "file_7.py"), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from readmate.readmate_agent import ReadMateAgent
+from run_planner import PLAN_JSON, phase_seconds, plan_project, summarize_plan
+from tests.benchmark_pipeline import LatencyChatModel, create_project
+
+PLANNER_CONFIG = {
+    "seconds_per_call": 1.0,
+    "input_tokens_per_second": 1000,
+    "output_tokens_per_second": 100,
+    "requests_per_minute": 0,
+    "tokens_per_minute": 0,
+}
+
+
+class TestRunPlanner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project = os.path.join(self.tmp_dir.name, "project")
+        os.makedirs(self.project)
+        create_project(self.project, 3, 2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_phase_seconds(self):
+        calls = [{"input_tokens": 1000, "output_tokens": 100}] * 8
+        # 8 calls of 3 seconds on 4 slots
+        self.assertEqual(phase_seconds(calls, "analysis", 4, PLANNER_CONFIG), 6.0)
+        # Two calls in a row on the longest dependency chain
+        self.assertEqual(phase_seconds(calls[:2], "readme", 4, PLANNER_CONFIG), 6.0)
+
+        limited = dict(PLANNER_CONFIG, requests_per_minute=60)
+        self.assertEqual(phase_seconds(calls, "analysis", 4, limited), 8.0)
+
+    def test_summary(self):
+        calls = [
+            {
+                "prompt_type": "overview",
+                "response_model": "text",
+                "phase": "readme",
+                "input_tokens": 1000,
+                "output_tokens": 100,
+            }
+        ]
+        plan = summarize_plan(calls, 1.5, "gpt-3.5-turbo", PLANNER_CONFIG)
+        self.assertEqual(plan["prompt_types"]["overview"]["calls"], 1)
+        self.assertEqual(plan["seconds"], 8)
+        self.assertGreater(plan["cost"], 0)
+        self.assertIsNone(summarize_plan(calls, 0, "unknown-model")["cost"])
+
+    def test_plan_matches_run(self):
+        workspace = os.path.join(self.tmp_dir.name, "plan")
+        os.makedirs(workspace)
+        plan = plan_project(self.project, workspace)
+
+        # Only the plan is written, the placeholder analyses stay in scratch
+        self.assertEqual(os.listdir(workspace), [PLAN_JSON])
+        self.assertTrue(plan["review_checks"])
+        self.assertEqual(set(plan["phases"]), {"analysis", "readme"})
+
+        run_workspace = os.path.join(self.tmp_dir.name, "run")
+        os.makedirs(os.path.join(run_workspace, "logs"))
+        model = LatencyChatModel(latency=0)
+        ReadMateAgent(
+            self.project, run_workspace, run_workspace, llm_selection=model
+        ).run()
+        self.assertEqual(plan["calls"], model.calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
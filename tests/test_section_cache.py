@@ -0,0 +1,84 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+from readmate.generators.markdown import ReadmeGenerator
+from readmate.modules.project_inspector import ProjectInspector
+from readmate.utils.analysis_store import AnalysisStore
+from readmate.utils.section_cache import SectionCache, project_cache_path
+from tests.benchmark_pipeline import LatencyChatModel
+
+EXTENDED_SECTIONS = {
+    "requirements": "- langchain",
+    "deployment": "",
+    "license": "MIT License",
+    "license_id": "MIT",
+    "badges": [],
+}
+
+
+class TestSectionCache(unittest.TestCase):
+    def test_reuse_only_unchanged_inputs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = os.path.join(tmp_dir, "readme_sections.json")
+            context = {"file_descriptions": {"a.py": {"Functions": ["f"]}}}
+            digest = SectionCache.digest(context, "PROMPT", {"model": "gpt"})
+
+            cache = SectionCache(cache_path)
+            self.assertIsNone(cache.get("main_modules", digest))
+            cache.put("main_modules", digest, "Main modules text")
+            cache.save()
+
+            # A new run loads the previous sections from disk
+            cache = SectionCache(cache_path)
+            changed = SectionCache.digest(
+                {"file_descriptions": {"a.py": {"Functions": ["g"]}}},
+                "PROMPT",
+                {"model": "gpt"},
+            )
+
+            self.assertEqual(cache.get("main_modules", digest), "Main modules text")
+            self.assertIsNone(cache.get("main_modules", changed))
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_digest_ignores_key_order(self):
+        self.assertEqual(
+            SectionCache.digest({"a": 1, "b": 2}), SectionCache.digest({"b": 2, "a": 1})
+        )
+
+    def test_project_cache_path(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertEqual(
+                project_cache_path(tmp_dir, "/projects/engine.zip"),
+                project_cache_path(tmp_dir, "/projects/engine/"),
+            )
+            self.assertTrue(os.path.isdir(os.path.join(tmp_dir, "section_cache")))
+
+    @patch.object(ProjectInspector, "run")
+    def test_license_badge_added_once(self, inspector_run):
+        inspector_run.return_value = EXTENDED_SECTIONS
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = AnalysisStore(os.path.join(tmp_dir, "analysis.db"))
+            badges = []
+            # The second run reuses the badges of the first one from the cache file
+            for _ in range(2):
+                generator = ReadmeGenerator(
+                    "project",
+                    "",
+                    store,
+                    tmp_dir,
+                    llm_selection=LatencyChatModel(latency=0),
+                )
+                asyncio.run(generator.inspect_and_complete_project())
+                generator.section_cache.save()
+                badges.append(generator.sections["badges"])
+            store.close()
+
+        self.assertEqual(generator.section_cache.hits, 1)
+        self.assertEqual(badges[0], badges[1])
+        self.assertEqual(badges[1].count("License-MIT"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
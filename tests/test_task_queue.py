@@ -0,0 +1,122 @@
+import os
+import asyncio
+import tempfile
+import unittest
+import multiprocessing
+from distributed_runner import enqueue_project, open_task_queue, run_worker
+from readmate.readmate_agent import ReadMateAgent
+from readmate.utils.task_queue import TaskQueue
+from readmate.utils.analysis_store import ROOT_FILES_LOW_LEVEL, AnalysisStore
+from tests.benchmark_pipeline import LatencyChatModel, create_project
+
+
+def worker_process(workspace_folder: str, worker_id: str):
+    asyncio.run(
+        run_worker(
+            workspace_folder,
+            worker_id=worker_id,
+            concurrency=4,
+            llm_selection=LatencyChatModel(latency=0.01),
+        )
+    )
+
+
+class TestTaskQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.queue = TaskQueue(os.path.join(self.tmp_dir.name, "tasks.db"))
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp_dir.cleanup()
+
+    def test_dependencies(self):
+        module_id = self.queue.add("module", "src", {"is_root": False})
+        self.queue.add("folder_files", "src", deps=[module_id])
+
+        task = self.queue.claim("worker-1", lease_seconds=60)
+        self.assertEqual((task.kind, task.payload), ("module", {"is_root": False}))
+        self.assertIsNone(self.queue.claim("worker-2", lease_seconds=60))
+
+        self.queue.complete(task, "worker-1", {"Rating": "8"})
+        self.assertEqual(
+            self.queue.claim("worker-2", lease_seconds=60).kind, "folder_files"
+        )
+        self.assertEqual(self.queue.result("module", "src"), {"Rating": "8"})
+
+    def test_expired_lease(self):
+        self.queue.add("module", "src")
+        lost_task = self.queue.claim("worker-1", lease_seconds=-1)
+
+        task = self.queue.claim("worker-2", lease_seconds=60)
+
+        self.assertEqual(task.attempts, 2)
+        self.assertFalse(self.queue.complete(lost_task, "worker-1", "stale"))
+        self.assertTrue(self.queue.complete(task, "worker-2", "fresh"))
+        self.assertEqual(self.queue.results("module"), {"src": "fresh"})
+        self.assertTrue(self.queue.drained())
+
+    def test_failures_cascade(self):
+        queue = TaskQueue(self.queue.db_path, max_attempts=1)
+        module_id = queue.add("module", "src")
+        queue.add("folder_files", "src", deps=[module_id])
+
+        task = queue.claim("worker-1", lease_seconds=60)
+        queue.fail(task, "worker-1", "model unavailable")
+
+        self.assertEqual(queue.counts(), {"failed": 2})
+        self.assertTrue(queue.drained())
+        queue.close()
+
+
+class TestDistributedRun(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.project_path = os.path.join(self.tmp_dir.name, "project")
+        os.makedirs(self.project_path)
+        create_project(self.project_path, 3, 2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_worker_processes(self):
+        workspace_folder = enqueue_project(
+            self.project_path, os.path.join(self.tmp_dir.name, "distributed")
+        )
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=worker_process, args=(workspace_folder, f"w{i}"))
+            for i in range(3)
+        ]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join(timeout=120)
+        self.assertEqual([process.exitcode for process in workers], [0, 0, 0])
+
+        queue = open_task_queue(workspace_folder)
+        self.assertEqual(list(queue.counts()), ["done"])
+        queue.close()
+        self.assertTrue(os.path.isfile(os.path.join(workspace_folder, "readme.md")))
+
+        single_workspace = os.path.join(self.tmp_dir.name, "single")
+        os.makedirs(os.path.join(single_workspace, "logs"))
+        ReadMateAgent(
+            os.path.join(workspace_folder, "project"),
+            single_workspace,
+            single_workspace,
+            llm_selection=LatencyChatModel(latency=0),
+        ).run()
+        distributed = AnalysisStore(os.path.join(workspace_folder, "analysis.db"))
+        single = AnalysisStore(os.path.join(single_workspace, "analysis.db"))
+        self.assertEqual(distributed.module_tree(), single.module_tree())
+        self.assertEqual(
+            distributed.root_files(ROOT_FILES_LOW_LEVEL),
+            single.root_files(ROOT_FILES_LOW_LEVEL),
+        )
+        distributed.close()
+        single.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import glob
+import unittest
+import tiktoken
+from readmate.utils.token_estimator import (
+    DEFAULT_KIND,
+    FEATURES,
+    TokenEstimator,
+    calibrate,
+    text_features,
+)
+
+
+def repository_texts() -> list:
+    texts = []
+    for path in sorted(glob.glob("readmate/**/*.py", recursive=True)):
+        with open(path, encoding="utf-8") as file:
+            texts.append(file.read())
+    return [text for text in texts if text]
+
+
+class TestTokenEstimator(unittest.TestCase):
+    def setUp(self):
+        self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.estimator = TokenEstimator()
+
+    def exact(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def test_features(self):
+        self.assertEqual(
+            text_features("Hello World_x  12345 é!!= \n"),
+            [12, 2, 5, 5, 4, 1, 3, 2, 1, 1, 1, 2],
+        )
+        # Long texts are counted on windows and scaled to their length
+        long_text = "word, " * 10000
+        letters = text_features(long_text)[FEATURES.index("letters")]
+        self.assertAlmostEqual(letters / 40000, 1, delta=0.01)
+
+    def test_error_bound(self):
+        texts = repository_texts()
+        covered = 0
+        for text in texts:
+            low, high = self.estimator.bounds(text, "python")
+            covered += low <= self.exact(text) <= high
+        self.assertGreaterEqual(covered / len(texts), 0.95)
+
+    def test_decisions(self):
+        # Bounds so wide that the decisions close to the limit need the exact count
+        calibration = calibrate(
+            [(text, self.exact(text)) for text in repository_texts()]
+        )
+        calibration["rel_error"] = 10
+        estimator = TokenEstimator(
+            {"extensions": {}, "kinds": {DEFAULT_KIND: calibration}}
+        )
+        for text in repository_texts()[:10]:
+            tokens = self.exact(text)
+            for limit in [tokens - 1, tokens, 200]:
+                self.assertEqual(estimator.exceeds(text, limit), tokens > limit)
+                self.assertEqual(
+                    estimator.capped_count(text, limit), min(tokens, limit)
+                )
+                self.assertEqual(
+                    estimator.truncate(text, limit),
+                    self.encoding.decode(self.encoding.encode(text)[:limit]),
+                )
+
+    def test_clear_decisions_skip_encoding(self):
+        short_text = "Release notes."
+        long_text = "def run(self):\n    return self.engine.start()\n" * 2000
+
+        self.assertEqual(self.estimator.truncate(short_text, 200), short_text)
+        self.assertFalse(self.estimator.exceeds(short_text, 10000))
+        self.assertTrue(self.estimator.exceeds(long_text, 10000, "python"))
+        self.assertEqual(self.estimator.capped_count(long_text, 200, "python"), 200)
+        self.assertEqual(self.estimator.stats(), {"decisions": 4, "exact_counts": 0})
+
+    def test_kinds(self):
+        self.assertEqual(self.estimator.kind_of("package/module.py"), "python")
+        self.assertEqual(self.estimator.kind_of("Dockerfile"), DEFAULT_KIND)
+        # File types without their own calibration use the default one
+        self.assertEqual(
+            self.estimator.estimate("Some notes", "text"),
+            self.estimator.estimate("Some notes", DEFAULT_KIND),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import asyncio
+import unittest
+from collections import Counter
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from readmate.toolkit.top_level_analysis import generate_module_descriptions_and_ratings
+
+MODULE_ANALYSIS = json.dumps(
+    {"Description": "Module", "Technologies": ["python"], "Rating": "5"}
+)
+
+
+def folder(name, subfolders=None):
+    return {
+        "current_folder": name,
+        "subfolders": subfolders or {},
+        "num_files": 1,
+        "file_extensions": {".py": 1},
+        "num_lines": 10,
+        "files": ["a.py"],
+    }
+
+
+class TestModuleDescriptions(unittest.TestCase):
+    def test_every_folder_visited_once(self):
+        # Arrange: siblings with their own subtrees, which used to be skipped
+        tree = folder(
+            ".",
+            {
+                "api": folder("api", {"routes": folder("api/routes")}),
+                "core": folder(
+                    "core",
+                    {"models": folder("core/models", {"v1": folder("core/models/v1")})},
+                ),
+                "docs": folder("docs"),
+            },
+        )
+        visited = []
+
+        async def on_folder_done(folder_info):
+            visited.append(folder_info["current_folder"])
+
+        # Act
+        result = asyncio.run(
+            generate_module_descriptions_and_ratings(
+                tree,
+                llm_selection=FakeListChatModel(responses=[MODULE_ANALYSIS]),
+                on_folder_done=on_folder_done,
+            )
+        )
+
+        # Assert
+        self.assertEqual(
+            Counter(visited),
+            Counter(
+                [".", "api", "core", "docs", "api/routes", "core/models"]
+                + ["core/models/v1"]
+            ),
+        )
+        self.assertEqual(
+            result["subfolders"]["core"]["subfolders"]["models"]["subfolders"]["v1"][
+                "Rating"
+            ],
+            "5",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from readmate.generators.tree import IgnoreRules, TreeGenerator
+from readmate.utils.scan_index import ScanIndex
+
+
+class TestTreeGenerator(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp_dir.name, "project")
+        for relative_path in [
+            "setup.py",
+            "pkg/__init__.py",
+            "pkg/core.py",
+            "pkg/sub/deep.py",
+            "data/a.csv",
+            "data/b.csv",
+            "data/c.csv",
+            ".git/HEAD",
+            "pkg/__pycache__/core.cpython-311.pyc",
+        ]:
+            file_path = os.path.join(self.root, relative_path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            open(file_path, "w").close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_tree_from_scan_index(self):
+        tree = TreeGenerator(
+            self.root, max_depth=2, max_children=2, scan_index=ScanIndex(self.root)
+        ).tree()
+
+        self.assertEqual(
+            tree.splitlines(),
+            [
+                "└── project",
+                "    ├── data",
+                "    │   ├── a.csv",
+                "    │   ├── b.csv",
+                "    │   └── … 1 more file",
+                "    ├── pkg",
+                "    │   ├── __init__.py",
+                "    │   ├── core.py",
+                "    │   └── … 1 more folder",
+                "    └── … 1 more file",
+            ],
+        )
+
+    def test_scan_index_matches_filesystem(self):
+        from_index = TreeGenerator(
+            self.root, max_depth=3, scan_index=ScanIndex(self.root)
+        ).tree()
+        from_filesystem = TreeGenerator(self.root, max_depth=3).tree()
+
+        self.assertEqual(from_index, from_filesystem)
+
+    def test_ignore_rules_and_streaming(self):
+        os.makedirs(os.path.join(self.root, "build", "lib"))
+        open(os.path.join(self.root, "build", "lib", "pkg.py"), "w").close()
+        with open(os.path.join(self.root, ".gitignore"), "w") as file:
+            file.write("# build output\nbuild/\n*.csv\n")
+
+        generator = TreeGenerator(
+            self.root,
+            max_depth=3,
+            ignore_rules=IgnoreRules.from_gitignore(self.root),
+        )
+        lines = list(generator.iter_lines())
+
+        self.assertEqual(
+            lines,
+            [
+                "└── project",
+                "    ├── .gitignore",
+                "    ├── pkg",
+                "    │   ├── __init__.py",
+                "    │   ├── core.py",
+                "    │   └── sub",
+                "    │       └── deep.py",
+                "    └── setup.py",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()